@@ -0,0 +1,74 @@
+"""Uygulamanın açılış süresini ölçer; gerilemeleri görünür kılmak için JSON rapor üretir.
+
+Her tur temiz bir süreçte çalışır ve şunları ölçer:
+  - ice_aktarma_ms: servis_takip modülünün içe aktarılma süresi
+  - ilk_kare_ms: pencere oluşturulmaya başlandıktan ilk çizime (Expose) kadar geçen süre
+  - ilk_liste_ms: ilk kayıt sayfasının listede görünmesine kadar geçen süre
+  - toplam_ms: süreç başlangıcından (içe aktarma dahil) ilk listeye kadar
+
+    python baslangic_olcumu.py --tur 5
+    python baslangic_olcumu.py --tur 5 --cikti baslangic.json
+
+Grafik ortam (DISPLAY) gerektirir.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+OLCUM_ZAMAN_ASIMI_MS = 30000
+
+
+def tek_olcum():
+    baslangic = time.perf_counter()
+    import servis_takip
+    ice_aktarma_ms = (time.perf_counter() - baslangic) * 1000
+    servis_takip.load_settings()
+    servis_takip.configure_logging()
+    app = servis_takip.ServisTakipUygulamasi()
+
+    def bekle():
+        gecen_ms = (time.perf_counter() - app.acilis_baslangici) * 1000
+        if app.ilk_liste_ms is None and gecen_ms < OLCUM_ZAMAN_ASIMI_MS:
+            app.root.after(5, bekle)
+            return
+        print(json.dumps({
+            "ice_aktarma_ms": ice_aktarma_ms,
+            "ilk_kare_ms": app.ilk_kare_ms,
+            "ilk_liste_ms": app.ilk_liste_ms,
+            "toplam_ms": (time.perf_counter() - baslangic) * 1000,
+        }))
+        app.kapat()
+
+    app.root.after(5, bekle)
+    app.root.mainloop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Açılış süresi ölçümü")
+    parser.add_argument("--tur", type=int, default=5)
+    parser.add_argument("--cikti", help="raporun yazılacağı JSON dosyası")
+    parser.add_argument("--tek", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.tek:
+        tek_olcum()
+        return
+
+    turlar = []
+    for _ in range(args.tur):
+        cikti = subprocess.run([sys.executable, __file__, "--tek"], capture_output=True, text=True, check=True).stdout
+        turlar.append(json.loads(cikti.strip().splitlines()[-1]))
+    rapor = {"tur": args.tur, "turlar": turlar,
+             "medyan": {anahtar: statistics.median(t[anahtar] for t in turlar if t[anahtar] is not None)
+                        for anahtar in turlar[0]}}
+    metin = json.dumps(rapor, indent=2)
+    print(metin)
+    if args.cikti:
+        with open(args.cikti, "w") as f:
+            f.write(metin + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Performans ölçümleri için tekrarlanabilir sentetik veri üretici.
+
+Aynı tohum (seed) ile her çalıştırmada aynı kayıtlar üretilir. Kayıtlar formdaki gerçek cihaz tipi ve durum
+listelerini, Türkçe ad/soyad ve bölge adlarını kullanır; kayıtların bir kısmı aynı barkodla tekrar servise
+gelmiş cihazlardır. Her kayda 0-4 belge bağlanır (belgeler/blobler tabloları); belge dosyaları diske yazılmaz,
+yalnızca veritabanı satırları oluşturulur.
+
+    python ornek_veri.py --kayit 100000 --db olcum.db
+    python ornek_veri.py --kayit 1000000 --db buyuk.db --tohum 7
+"""
+import argparse
+import datetime
+import hashlib
+import os
+import random
+import time
+
+import servis_core
+from servis_core import BELGE_KLASORU, CIHAZ_DURUMLARI, CIHAZ_TIPLERI, ICE_AKTARMA_PARTISI
+
+ADLAR = ["Ahmet", "Mehmet", "Mustafa", "Ali", "Hüseyin", "Hasan", "İbrahim", "İsmail", "Osman", "Yusuf", "Murat",
+         "Ömer", "Ramazan", "Emre", "Burak", "Çağlar", "Şükrü", "Gökhan", "Ayşe", "Fatma", "Emine", "Hatice",
+         "Zeynep", "Elif", "Meryem", "Şerife", "Zehra", "Sultan", "Hülya", "Özlem", "Gülşen", "Büşra", "İrem"]
+SOYADLAR = ["Yılmaz", "Kaya", "Demir", "Çelik", "Şahin", "Yıldız", "Yıldırım", "Öztürk", "Aydın", "Özdemir",
+            "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara", "Koç", "Kurt", "Özkan", "Şimşek", "Polat", "Korkmaz",
+            "Erdoğan", "Güneş", "Aksoy", "Uçar", "Işık", "Bulut", "Türkmen", "Ünal"]
+BOLGELER = ["İstanbul Avrupa", "İstanbul Anadolu", "Ankara", "İzmir", "Bursa", "Antalya", "Konya", "Adana",
+            "Gaziantep", "Kayseri", "Eskişehir", "Samsun", "Trabzon", "Diyarbakır", "Erzurum", "Muğla", "Çanakkale",
+            "Şanlıurfa", "Kocaeli", "Sakarya"]
+SERI_ONEKLERI = {"Laptop": "NB", "SIM Kart": "89", "Tablet": "TB", "El Terminali": "HT", "Masaüstü Bilgisayar": "PC",
+                 "PC Monitör": "MN", "Mobil Yazıcı": "MP", "PC Yazıcı": "PR", "UPS": "UP"}
+ARIZALAR = ["Ekran kırık", "Açılmıyor", "Batarya şişmiş", "Şarj olmuyor", "Klavye tuşları basmıyor",
+            "Dokunmatik çalışmıyor", "Yazıcı kafası arızalı", "Kağıt sıkıştırıyor", "Aşırı ısınma",
+            "Sıvı teması", "Fan sesi yüksek", "Menteşe kırık", "Okuyucu barkod okumuyor", "SIM tanınmıyor",
+            "Güç kaynağı arızalı", "İşletim sistemi açılmıyor", "Düşürülmüş, kasa çatlak", ""]
+BELGE_TURLERI = [("servis_formu", ".pdf"), ("fatura", ".pdf"), ("teslim_tutanagi", ".pdf"), ("ariza_fotografi", ".jpg"),
+                 ("garanti_belgesi", ".pdf"), ("teklif", ".xlsx")]
+ILK_TARIH = datetime.date(2019, 1, 1)
+TARIH_ARALIGI_GUN = 6 * 365
+TEKRAR_SERVIS_ORANI = 0.05  # kayıtların bu kadarı daha önce gelmiş bir barkodla tekrar açılır
+ORTAK_BELGE_ORANI = 0.1  # belgelerin bu kadarı başka bir kayıtla aynı içeriği paylaşır (tekilleştirme)
+
+
+def ornek_kayitlar(rnd, adet, baslangic=0):
+    """(kayıt, belgeler) çiftlerini üretir; belgeler (dosya_adi, blob_anahtar, boyut) üçlüleridir."""
+    barkodlar = []
+    ortak_bloblar = []
+    for i in range(baslangic, baslangic + adet):
+        if barkodlar and rnd.random() < TEKRAR_SERVIS_ORANI:
+            barkod, cihaz_tipi, seri_no = rnd.choice(barkodlar)
+        else:
+            cihaz_tipi = rnd.choice(CIHAZ_TIPLERI)
+            barkod = f"BRK{i:08d}"
+            seri_no = f"{SERI_ONEKLERI[cihaz_tipi]}{rnd.randrange(16 ** 8):08X}"
+            if len(barkodlar) < 10000:
+                barkodlar.append((barkod, cihaz_tipi, seri_no))
+            else:
+                barkodlar[rnd.randrange(len(barkodlar))] = (barkod, cihaz_tipi, seri_no)
+        durum = rnd.choice(CIHAZ_DURUMLARI)
+        gonderim = ILK_TARIH + datetime.timedelta(days=rnd.randrange(TARIH_ARALIGI_GUN))
+        gelme = "" if durum in ("Serviste", "Servise Gönderildi") else \
+            (gonderim + datetime.timedelta(days=rnd.randint(2, 60))).isoformat()
+        kayit = {
+            "barkod_no": barkod,
+            "bolge": rnd.choice(BOLGELER),
+            "personel_ad_soyad": f"{rnd.choice(ADLAR)} {rnd.choice(SOYADLAR)}",
+            "personel_sicil_no": str(rnd.randint(10000, 9999999)),
+            "cihaz_tipi": cihaz_tipi,
+            "cihaz_seri_no": seri_no,
+            "servis_gonderim_tarihi": gonderim.isoformat(),
+            "servis_gelme_tarihi": gelme,
+            "cihaz_durumu": durum,
+            "aciklama": rnd.choice(ARIZALAR),
+        }
+        belgeler = []
+        for j in range(rnd.choice((0, 0, 1, 1, 1, 2, 2, 3, 4))):
+            ad, uzanti = rnd.choice(BELGE_TURLERI)
+            if ortak_bloblar and rnd.random() < ORTAK_BELGE_ORANI:
+                anahtar, boyut = rnd.choice(ortak_bloblar)
+            else:
+                anahtar = hashlib.sha256(f"{i}-{j}-{rnd.random()}".encode()).hexdigest() + uzanti
+                boyut = rnd.randint(20 * 1024, 3 * 1024 * 1024)
+                if len(ortak_bloblar) < 1000:
+                    ortak_bloblar.append((anahtar, boyut))
+            belgeler.append((f"{ad}_{barkod}{uzanti}", anahtar, boyut))
+        yield kayit, belgeler
+
+
+def veri_uret(db, adet, tohum=42, parti=ICE_AKTARMA_PARTISI, ilerleme=None):
+    """db'ye adet kadar kayıt ve belgelerini ekler; (kayıt, belge) sayılarını döndürür."""
+    rnd = random.Random(tohum)
+    uretici = ornek_kayitlar(rnd, adet)
+    eklenen = belge_sayisi = 0
+    while eklenen < adet:
+        grup = [next(uretici) for _ in range(min(parti, adet - eklenen))]
+        db.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM cihazlar")
+        son_id = db.cursor.fetchone()[0]
+        db.insert_cihazlar_toplu([kayit for kayit, _ in grup])
+        belgeler = [(son_id + n + 1, ad, anahtar, boyut) for n, (_, kayit_belgeleri) in enumerate(grup)
+                    for ad, anahtar, boyut in kayit_belgeleri]
+
+        def belgeleri_yaz():
+            db.cursor.executemany("INSERT OR IGNORE INTO blobler (anahtar, boyut) VALUES (?, ?)",
+                                  [(anahtar, boyut) for _, _, anahtar, boyut in belgeler])
+            db.cursor.executemany("INSERT INTO belgeler (cihaz_id, dosya_yolu, blob_anahtar, dosya_adi) VALUES (?, ?, ?, ?)",
+                                  [(cihaz_id, os.path.join(BELGE_KLASORU, anahtar[:2], anahtar), anahtar, ad)
+                                   for cihaz_id, ad, anahtar, _ in belgeler])
+
+        db._yazma_islemi(belgeleri_yaz)
+        eklenen += len(grup)
+        belge_sayisi += len(belgeler)
+        if ilerleme:
+            ilerleme(eklenen, adet)
+    return eklenen, belge_sayisi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik servis kaydı üretici")
+    parser.add_argument("--kayit", type=int, default=10000)
+    parser.add_argument("--db", required=True, help="doldurulacak veritabanı (yoksa oluşturulur)")
+    parser.add_argument("--tohum", type=int, default=42)
+    args = parser.parse_args()
+    servis_core.load_settings()
+
+    db = servis_core.DatabaseManager(args.db)
+    baslangic = time.perf_counter()
+    kayit, belge = veri_uret(db, args.kayit, args.tohum,
+                             ilerleme=lambda n, toplam: print(f"\r{n}/{toplam}", end="", flush=True))
+    db.close()
+    sure = time.perf_counter() - baslangic
+    print(f"\n{kayit} kayıt, {belge} belge, {sure:.1f} sn ({kayit / max(sure, 1e-6):.0f} kayıt/sn)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Veritabanı işlemleri için ölçüm takımı; sonuçlar bir temel (baseline) ile karşılaştırılabilir JSON'dur.
+
+Her boyut için ornek_veri ile üretilmiş veritabanı önbellek dizininde bir kez oluşturulur ve sonraki
+çalıştırmalarda yeniden kullanılır; ölçümler bu dosyanın bir kopyası üzerinde yapılır. Her işlem en az
+--min-tekrar kez ve toplamda yaklaşık --sure saniye boyunca tekrarlanır; medyan, p95 ve en kısa süreler
+milisaniye cinsinden raporlanır.
+
+    python performans_olcumu.py --boyut 10000 100000 --cikti sonuc.json
+    python performans_olcumu.py --boyut 10000 100000 --temel sonuc.json     # gerileme varsa çıkış kodu 1
+    python performans_olcumu.py --boyut 1000000 --islem fetch_all advanced_search
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import servis_core
+from servis_core import CIHAZ_DURUMLARI, SIRALAMA_SUTUNLARI, DatabaseManager, disa_aktar
+from ornek_veri import ornek_kayitlar, veri_uret
+from servis_analiz import analiz_raporu
+
+VARSAYILAN_BOYUTLAR = [10000, 100000]
+ONBELLEK_KLASORU = os.path.join(tempfile.gettempdir(), "servis_takip_olcum")
+GERILEME_ESIGI = 1.25  # medyan süre temeldekinin bu katını aşarsa gerileme sayılır
+
+
+def _islemler(db, rnd, calisma_klasoru):
+    db.cursor.execute("SELECT MAX(id) FROM cihazlar")
+    son_id = db.cursor.fetchone()[0]
+    yeni_kayitlar = ornek_kayitlar(rnd, 10 ** 9, baslangic=son_id + 1)
+
+    def rastgele_kayit():
+        db.cursor.execute(f"SELECT {servis_core.CIHAZ_SECIMI} FROM cihazlar WHERE id = ?", (rnd.randint(1, son_id),))
+        return db.cursor.fetchone()
+
+    def insert_cihaz():
+        kayit, _ = next(yeni_kayitlar)
+        db.insert_cihaz(kayit)
+
+    def update_cihaz():
+        satir = rastgele_kayit()
+        veriler = dict(zip(servis_core.KAYIT_ALANLARI, satir[1:11]))
+        veriler["cihaz_durumu"] = rnd.choice(CIHAZ_DURUMLARI)
+        db.update_cihaz(veriler, satir[0])
+
+    def fetch_cihazlar_by_barkod():
+        db.fetch_cihazlar_by_barkod(rastgele_kayit()[1])
+
+    # Başlık tıklaması: rastgele sütun ve yönde ilk sayfa ile onu izleyen sayfa
+    def fetch_page_sirali(filtreler=None):
+        siralama = (rnd.choice(list(SIRALAMA_SUTUNLARI)), rnd.random() < 0.5)
+        _, son = db.fetch_page(filtreler=filtreler, siralama=siralama)
+        if son:
+            db.fetch_page(son, filtreler=filtreler, siralama=siralama)
+
+    def excel_export():
+        disa_aktar(db, os.path.join(calisma_klasoru, "olcum.xlsx"))
+
+    # (ad, işlev, ağır mı) — ağır işlemler tek tekrarla ölçülür
+    return [
+        ("insert_cihaz", insert_cihaz, False),
+        ("update_cihaz", update_cihaz, False),
+        ("fetch_cihazlar_by_barkod", fetch_cihazlar_by_barkod, False),
+        ("fetch_page", lambda: db.fetch_page(), False),
+        ("fetch_page_filtreli", lambda: db.fetch_page(filtre="ayşe yıl"), False),
+        ("fetch_all", lambda: db.fetch_all(), False),
+        ("fetch_all_filtreli", lambda: db.fetch_all("ayşe yıl"), False),
+        ("advanced_search_durum", lambda: db.advanced_search({"cihaz_durumu": rnd.choice(CIHAZ_DURUMLARI)}), False),
+        ("advanced_search_barkod", lambda: db.advanced_search({"barkod_no": f"{rnd.randint(0, 99):02d}7"}), False),
+        ("fetch_page_tarih_araligi", lambda: db.fetch_page(filtreler={"gonderim_baslangic": "2023-01-01",
+                                                                       "gonderim_bitis": "2023-01-31"}), False),
+        ("fetch_page_acik_gun", lambda: db.fetch_page(filtreler={"acik_gun_ustu": 30}), False),
+        ("fetch_page_sirali", fetch_page_sirali, False),
+        ("fetch_page_sirali_durum", lambda: fetch_page_sirali({"cihaz_durumu": rnd.choice(CIHAZ_DURUMLARI)}), False),
+        ("excel_export", excel_export, True),
+        ("analiz_raporu", lambda: analiz_raporu(db), True),
+    ]
+
+
+def _olc(islev, min_tekrar, sure):
+    sureler = []
+    bitis = time.perf_counter() + sure
+    while len(sureler) < min_tekrar or time.perf_counter() < bitis:
+        t0 = time.perf_counter()
+        islev()
+        sureler.append((time.perf_counter() - t0) * 1000)
+    sureler.sort()
+    return {"tekrar": len(sureler), "medyan_ms": statistics.median(sureler),
+            "p95_ms": sureler[min(len(sureler) - 1, int(len(sureler) * 0.95))], "min_ms": sureler[0]}
+
+
+def veritabani_hazirla(boyut, tohum):
+    os.makedirs(ONBELLEK_KLASORU, exist_ok=True)
+    yol = os.path.join(ONBELLEK_KLASORU, f"olcum_{boyut}_{tohum}_v{len(servis_core.MIGRATIONS)}.db")
+    if not os.path.exists(yol):
+        gecici = yol + ".hazirlaniyor"
+        for ek in ("", "-wal", "-shm"):
+            if os.path.exists(gecici + ek):
+                os.remove(gecici + ek)
+        print(f"{boyut} kayıtlık veritabanı üretiliyor...", file=sys.stderr)
+        db = DatabaseManager(gecici)
+        veri_uret(db, boyut, tohum)
+        db.close()
+        os.replace(gecici, yol)
+    return yol
+
+
+def boyutu_olc(boyut, tohum, secilen, min_tekrar, sure):
+    kaynak = veritabani_hazirla(boyut, tohum)
+    with tempfile.TemporaryDirectory() as calisma_klasoru:
+        yol = os.path.join(calisma_klasoru, "olcum.db")
+        shutil.copyfile(kaynak, yol)
+        db = DatabaseManager(yol)
+        rnd = random.Random(tohum)
+        sonuclar = {}
+        for ad, islev, agir in _islemler(db, rnd, calisma_klasoru):
+            if secilen and ad not in secilen:
+                continue
+            sonuclar[ad] = _olc(islev, 1 if agir else min_tekrar, 0 if agir else sure)
+            print(f"{boyut:>8} {ad:<26} {sonuclar[ad]['medyan_ms']:10.2f} ms", file=sys.stderr)
+        db.close()
+    return sonuclar
+
+
+def karsilastir(rapor, temel, esik):
+    gerilemeler = []
+    for boyut, islemler in rapor["sonuclar"].items():
+        for ad, olcum in islemler.items():
+            onceki = temel.get("sonuclar", {}).get(boyut, {}).get(ad)
+            if not onceki:
+                continue
+            oran = olcum["medyan_ms"] / max(onceki["medyan_ms"], 1e-6)
+            isaret = "  GERİLEME" if oran > esik else ""
+            print(f"{boyut:>8} {ad:<26} {onceki['medyan_ms']:10.2f} -> {olcum['medyan_ms']:10.2f} ms  x{oran:.2f}{isaret}")
+            if oran > esik:
+                gerilemeler.append((boyut, ad, oran))
+    return gerilemeler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servis Takip veritabanı ölçüm takımı")
+    parser.add_argument("--boyut", type=int, nargs="+", default=VARSAYILAN_BOYUTLAR)
+    parser.add_argument("--islem", nargs="+", help="yalnızca bu işlemleri ölç")
+    parser.add_argument("--tohum", type=int, default=42)
+    parser.add_argument("--min-tekrar", type=int, default=5)
+    parser.add_argument("--sure", type=float, default=1.0, help="işlem başına en az ölçüm süresi (sn)")
+    parser.add_argument("--cikti", help="JSON raporun yazılacağı dosya (varsayılan: stdout)")
+    parser.add_argument("--temel", help="karşılaştırılacak önceki JSON rapor")
+    parser.add_argument("--esik", type=float, default=GERILEME_ESIGI)
+    args = parser.parse_args()
+    servis_core.load_settings()
+
+    rapor = {
+        "tarih": datetime.datetime.now().isoformat(timespec="seconds"),
+        "ortam": {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                  "platform": platform.platform(), "islemci": platform.processor() or platform.machine()},
+        "tohum": args.tohum,
+        "sonuclar": {str(boyut): boyutu_olc(boyut, args.tohum, args.islem, args.min_tekrar, args.sure)
+                     for boyut in args.boyut},
+    }
+    metin = json.dumps(rapor, indent=2, ensure_ascii=False)
+    if args.cikti:
+        with open(args.cikti, "w", encoding="utf-8") as f:
+            f.write(metin + "\n")
+    else:
+        print(metin)
+
+    if args.temel:
+        with open(args.temel, encoding="utf-8") as f:
+            temel = json.load(f)
+        if karsilastir(rapor, temel, args.esik):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Servis dönüş süresi ve filo analizi.
+
+Metrikler SQL toplamalarıyla (GROUP BY) veritabanında hesaplanır; Python'a yalnızca küçük özet tablolar gelir.
+Dönüş süresi yüzdelikleri gün bazındaki dağılımdan (gün -> kayıt sayısı) çıkarılır, bu yüzden kayıt sayısı
+arttıkça bellek kullanımı büyümez. Tüm metrikler ana listeyle aynı filtreleri (tam metin arama ve
+_filtre_kosullari anahtarları) kabul eder.
+
+    rapor = analiz_raporu(db)                       # JSON'a yazılabilir sözlük
+    excel_raporu_yaz(rapor, "analiz.xlsx")
+"""
+import datetime
+import math
+import time
+
+from servis_core import ACIK_KAYIT, fts_sorgusu
+
+TAMIR_DURUMU = "Tamir edildi"
+TAMIR_OLMUYOR_DURUMU = "Tamir olmuyor"
+HURDA_DURUMU = "Hurda"
+YUZDELIKLER = (0.5, 0.9, 0.95)
+BEKLEME_ESIGI_GUN = 30  # bölge özetinde "uzun süredir serviste" sayılan gün
+TEKRAR_ESIGI = 2  # aynı barkodla en az bu kadar servis kaydı olan cihaz tekrar arızalı sayılır
+TEKRAR_LISTESI = 100  # raporda ayrıntısı verilen en çok servise giden cihaz sayısı
+
+
+def _kosul(db, filtre="", filtreler=None):
+    kosullar, params = db._filtre_kosullari(filtreler or {})
+    eslesme = fts_sorgusu(filtre) if filtre else ""
+    if eslesme:
+        kosullar.insert(0, "id IN (SELECT rowid FROM cihazlar_fts WHERE cihazlar_fts MATCH ?)")
+        params.insert(0, eslesme)
+    return " AND ".join(["1=1"] + kosullar), params
+
+
+# Gün dağılımından özet: kayıt sayısı, ortalama, en kısa/uzun ve en yakın sıra (nearest-rank) yüzdelikleri
+def _dagilim_ozeti(dagilim):
+    toplam = sum(dagilim.values())
+    if not toplam:
+        return {"kayit": 0}
+    gunler = sorted(dagilim)
+    ozet = {"kayit": toplam, "ortalama_gun": round(sum(g * n for g, n in dagilim.items()) / toplam, 2),
+            "en_kisa_gun": gunler[0], "en_uzun_gun": gunler[-1]}
+    birikimli, i = 0, 0
+    for oran in YUZDELIKLER:
+        sira = max(1, math.ceil(oran * toplam))
+        while birikimli + dagilim[gunler[i]] < sira:
+            birikimli += dagilim[gunler[i]]
+            i += 1
+        ozet[f"p{round(oran * 100)}_gun"] = gunler[i]
+    return ozet
+
+
+def _oran(pay, payda):
+    return round(pay / payda, 4) if payda else None
+
+
+# Tek tarama: cihaz tipi x durum x dönüş günü sayıları. Dönüş süresi ve tamir/hurda oranları buradan çıkar.
+def _tip_ozetleri(db, kosul, params):
+    db.cursor.execute(f'''
+        SELECT cihaz_tipi, cihaz_durumu,
+               CAST(julianday(NULLIF(servis_gelme_tarihi, '')) - julianday(NULLIF(servis_gonderim_tarihi, '')) AS INTEGER),
+               COUNT(*)
+        FROM cihazlar WHERE {kosul}
+        GROUP BY 1, 2, 3
+    ''', params)
+    genel, tip_dagilimi, tipler = {}, {}, {}
+    for tip, durum, gun, sayi in db.cursor.fetchall():
+        tip = tip or ""
+        ozet = tipler.setdefault(tip, {"toplam": 0, "tamir": 0, "tamir_olmuyor": 0, "hurda": 0})
+        ozet["toplam"] += sayi
+        if durum == TAMIR_DURUMU:
+            ozet["tamir"] += sayi
+        elif durum == TAMIR_OLMUYOR_DURUMU:
+            ozet["tamir_olmuyor"] += sayi
+        elif durum == HURDA_DURUMU:
+            ozet["hurda"] += sayi
+        if gun is not None and gun >= 0:
+            genel[gun] = genel.get(gun, 0) + sayi
+            dagilim = tip_dagilimi.setdefault(tip, {})
+            dagilim[gun] = dagilim.get(gun, 0) + sayi
+    for ozet in tipler.values():
+        sonuclanan = ozet["tamir"] + ozet["tamir_olmuyor"] + ozet["hurda"]
+        ozet["tamir_orani"] = _oran(ozet["tamir"], sonuclanan)
+        ozet["hurda_orani"] = _oran(ozet["hurda"], sonuclanan)
+        ozet["tamir_olmuyor_orani"] = _oran(ozet["tamir_olmuyor"], sonuclanan)
+    donus = {"genel": _dagilim_ozeti(genel),
+             "cihaz_tipi": {tip: _dagilim_ozeti(d) for tip, d in sorted(tip_dagilimi.items())}}
+    return donus, dict(sorted(tipler.items()))
+
+
+# Bölge başına açık (henüz gelmemiş) kayıtlar. Açık kayıtlar tablonun büyük bir kısmı olabildiğinden
+# (gelme, gönderim) indeksinden satır satır okumak yerine tablo taranır (tekli + indeksi devre dışı bırakır)
+def _bolge_bekleyenleri(db, kosul, params, bugun):
+    esik = (bugun - datetime.timedelta(days=BEKLEME_ESIGI_GUN)).isoformat()
+    db.cursor.execute(f'''
+        SELECT bolge, COUNT(*), MIN(NULLIF(servis_gonderim_tarihi, '')),
+               AVG(julianday(?) - julianday(NULLIF(servis_gonderim_tarihi, ''))),
+               SUM(servis_gonderim_tarihi > '' AND servis_gonderim_tarihi < ?)
+        FROM cihazlar WHERE {kosul} AND +{ACIK_KAYIT}
+        GROUP BY bolge ORDER BY COUNT(*) DESC
+    ''', [bugun.isoformat(), esik] + params)
+    return {bolge or "": {"acik": acik, "en_eski": en_eski or "",
+                          "ortalama_gun": round(ortalama, 1) if ortalama is not None else None,
+                          f"gun_{BEKLEME_ESIGI_GUN}_ustu": uzun}
+            for bolge, acik, en_eski, ortalama, uzun in db.cursor.fetchall()}
+
+
+# Barkod başına kayıt sayısı filtresiz durumda barkod indeksinden (kapsayan indeks) sayılır; sayımlar ve en
+# çok servise giden cihazlar SQL'de toplanır, Python'a yalnızca ilk `sinir` cihaz gelir
+def _tekrarlayan_arizalar(db, kosul, params, esik=TEKRAR_ESIGI, sinir=TEKRAR_LISTESI):
+    gruplar = f"SELECT barkod_no, COUNT(*) AS sayi FROM cihazlar WHERE {kosul} GROUP BY barkod_no"
+    db.cursor.execute(f"SELECT COUNT(*), SUM(sayi >= ?), SUM(CASE WHEN sayi >= ? THEN sayi END) FROM ({gruplar})",
+                      [esik, esik] + params)
+    cihaz, tekrarlayan, tekrar_kaydi = db.cursor.fetchone()
+    db.cursor.execute(f"{gruplar} HAVING sayi >= ? ORDER BY sayi DESC, barkod_no LIMIT ?", params + [esik, sinir])
+    enler = [(sayi, barkod) for barkod, sayi in db.cursor.fetchall()]
+    ayrintilar = {}
+    if enler:
+        db.cursor.execute(f'''
+            SELECT barkod_no, MIN(NULLIF(servis_gonderim_tarihi, '')), MAX(servis_gonderim_tarihi),
+                   GROUP_CONCAT(DISTINCT cihaz_tipi)
+            FROM cihazlar WHERE {kosul} AND barkod_no IN ({", ".join("?" * len(enler))})
+            GROUP BY barkod_no
+        ''', params + [barkod for _, barkod in enler])
+        ayrintilar = {barkod: (ilk, son, tipler) for barkod, ilk, son, tipler in db.cursor.fetchall()}
+    return {
+        "cihaz": cihaz, "tekrarlayan_cihaz": tekrarlayan or 0, "tekrarlayan_orani": _oran(tekrarlayan or 0, cihaz),
+        "tekrar_kaydi": tekrar_kaydi or 0,
+        "enler": [{"barkod_no": barkod, "servis_sayisi": sayi, "ilk_gonderim": ayrintilar[barkod][0] or "",
+                   "son_gonderim": ayrintilar[barkod][1] or "", "cihaz_tipi": ayrintilar[barkod][2] or ""}
+                  for sayi, barkod in enler],
+    }
+
+
+def analiz_raporu(db, filtre="", filtreler=None, gorev=None, bugun=None):
+    """Dönüş süresi, tamir/hurda oranı, bölge bekleyenleri ve tekrarlayan arızalar; JSON'a yazılabilir sözlük."""
+    baslangic = time.perf_counter()
+    bugun = bugun or datetime.date.today()
+    kosul, params = _kosul(db, filtre, filtreler)
+
+    def adim(oran, mesaj):
+        if gorev:
+            gorev.iptal_kontrol()
+            gorev.ilerleme(oran, mesaj)
+
+    rapor = {"tarih": bugun.isoformat(), "filtre": filtre,
+             "filtreler": {k: v for k, v in (filtreler or {}).items() if v is not None and v != ""}}
+    adim(0.0, "Dönüş süreleri hesaplanıyor")
+    rapor["donus_suresi"], rapor["cihaz_tipi"] = _tip_ozetleri(db, kosul, params)
+    adim(0.5, "Bölge bekleyenleri hesaplanıyor")
+    rapor["bolge_bekleyen"] = _bolge_bekleyenleri(db, kosul, params, bugun)
+    adim(0.6, "Tekrarlayan arızalar hesaplanıyor")
+    rapor["tekrarlayan"] = _tekrarlayan_arizalar(db, kosul, params)
+    rapor["kayit"] = sum(ozet["toplam"] for ozet in rapor["cihaz_tipi"].values())
+    rapor["sure"] = round(time.perf_counter() - baslangic, 3)
+    return rapor
+
+
+# Raporun tabloları: (sayfa adı, başlıklar, satırlar). Pencere ve Excel çıktısı aynı tabloları gösterir.
+def rapor_tablolari(rapor):
+    yuzdelik_basliklari = [f"P{round(o * 100)} (gün)" for o in YUZDELIKLER]
+    yuzdelik_anahtarlari = [f"p{round(o * 100)}_gun" for o in YUZDELIKLER]
+
+    def donus_satiri(ad, ozet):
+        return [ad, ozet["kayit"], ozet.get("ortalama_gun")] + [ozet.get(a) for a in yuzdelik_anahtarlari] + \
+               [ozet.get("en_kisa_gun"), ozet.get("en_uzun_gun")]
+
+    donus = rapor["donus_suresi"]
+    bekleme = f"gun_{BEKLEME_ESIGI_GUN}_ustu"
+    return [
+        ("Dönüş Süresi", ["Cihaz Tipi", "Kayıt", "Ortalama (gün)"] + yuzdelik_basliklari + ["En Kısa", "En Uzun"],
+         [donus_satiri("Tümü", donus["genel"])] + [donus_satiri(t, o) for t, o in donus["cihaz_tipi"].items()]),
+        ("Tamir-Hurda", ["Cihaz Tipi", "Toplam", "Tamir Edildi", "Tamir Olmuyor", "Hurda", "Tamir Oranı", "Hurda Oranı"],
+         [[t, o["toplam"], o["tamir"], o["tamir_olmuyor"], o["hurda"], o["tamir_orani"], o["hurda_orani"]]
+          for t, o in rapor["cihaz_tipi"].items()]),
+        ("Bölge Bekleyen", ["Bölge", "Açık Kayıt", "En Eski Gönderim", "Ortalama Bekleme (gün)",
+                            f"{BEKLEME_ESIGI_GUN} Günden Uzun"],
+         [[b, o["acik"], o["en_eski"], o["ortalama_gun"], o[bekleme]] for b, o in rapor["bolge_bekleyen"].items()]),
+        ("Tekrarlayan Arızalar", ["Barkod No", "Servis Sayısı", "İlk Gönderim", "Son Gönderim", "Cihaz Tipi"],
+         [[e["barkod_no"], e["servis_sayisi"], e["ilk_gonderim"], e["son_gonderim"], e["cihaz_tipi"]]
+          for e in rapor["tekrarlayan"]["enler"]]),
+    ]
+
+
+# Açık bir write_only çalışma kitabına analiz sayfalarını ekler (disa_aktar'ın ek_sayfalar kancası için)
+def excel_sayfalari(kitap, rapor):
+    tekrar = rapor["tekrarlayan"]
+    ozet = kitap.create_sheet("Analiz Özeti")
+    for satir in [["Rapor Tarihi", rapor["tarih"]], ["Kayıt", rapor["kayit"]],
+                  ["Tekrar Servise Gelen Cihaz", tekrar["tekrarlayan_cihaz"]],
+                  ["Tekrar Oranı", tekrar["tekrarlayan_orani"]]]:
+        ozet.append(satir)
+    for ad, basliklar, satirlar in rapor_tablolari(rapor):
+        sayfa = kitap.create_sheet(ad)
+        sayfa.append(basliklar)
+        for satir in satirlar:
+            sayfa.append(satir)
+
+
+def excel_raporu_yaz(rapor, dosya_yolu):
+    from openpyxl import Workbook
+    kitap = Workbook(write_only=True)
+    excel_sayfalari(kitap, rapor)
+    kitap.save(dosya_yolu)
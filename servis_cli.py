@@ -0,0 +1,342 @@
+"""Servis Takip Sistemi komut satırı aracı.
+
+Arayüz olmadan (ör. zamanlanmış görevlerden) veritabanını sorgulamak ve bakımını yapmak için kullanılır.
+Yalnızca servis_core ve servis_analiz'i içe aktarır; tkinter veya tkcalendar yüklenmez. Çıktı stdout'a JSON olarak yazılır,
+hatalar stderr'e {"hata": ...} biçiminde yazılır ve çıkış kodu 1 olur.
+
+    python servis_cli.py list --limit 50 --durum "Serviste"
+    python servis_cli.py list --acik-gun 30 --gonderim-baslangic 2024-01-01
+    python servis_cli.py list --durum "Serviste" --sirala servis_gonderim_tarihi --azalan
+    python servis_cli.py list --sorgu '{"ve": [{"alan": "bolge", "islem": "onek", "deger": "Kuzey"}, {"alan": "belge_sayisi", "islem": "dolu"}]}'
+    python servis_cli.py sorgu-kaydet kuzey_hurda --durum Hurda --sorgu sorgu.json --sirala bolge
+    python servis_cli.py export kuzey_hurda.xlsx --kayitli kuzey_hurda --analiz
+    python servis_cli.py search ahmet yazıcı --jsonl
+    python servis_cli.py import yeni_kayitlar.xlsx --dry-run
+    python servis_cli.py export rapor.csv --filtre merkez
+    python servis_cli.py export rapor.xlsx --analiz
+    python servis_cli.py analiz --acik-gun 30 --excel analiz.xlsx
+    python servis_cli.py stats
+    python servis_cli.py vacuum
+    python servis_cli.py plan-denetle                          # indeks kullanmayan sorgu varsa çıkış kodu 1
+    python servis_cli.py arsiv --gun 365 --lzma                # eski belgeleri sıkıştırılmış paketlere taşı
+    python servis_cli.py arsiv-dogrula
+    python servis_cli.py yedek                                 # çalışan uygulamayı durdurmadan artımlı yedek
+    python servis_cli.py yedek-dogrula
+    python servis_cli.py geri-yukle yedekler/20240131_120000_000
+    python servis_cli.py tara --derin --rapor tarama.json --bagla --karantina
+    python servis_cli.py --olcum olcum.json search ahmet      # süre dağılımları ve yavaş sorgular
+"""
+import argparse
+import json
+import os
+import sys
+
+import servis_core
+from servis_core import (ARSIV_GUN, CIHAZ_SUTUNLARI, SAYFA_BOYUTU, SIRALAMA_SUTUNLARI, VARSAYILAN_VERITABANI, BelgeDeposu,
+                         DatabaseManager, disa_aktar, ice_aktar)
+from servis_analiz import analiz_raporu, excel_raporu_yaz, excel_sayfalari
+from servis_tutarlilik import belgeleri_tara, karantinaya_al, tarama_ozeti, yeniden_bagla
+from servis_yedek import geri_yukle, yedegi_dogrula, yedek_al, yedek_bilgisi, yedekleri_listele
+
+
+def _kayit_sozlugu(satir):
+    return dict(zip(CIHAZ_SUTUNLARI, satir))
+
+
+def _yaz(veri):
+    json.dump(veri, sys.stdout, ensure_ascii=False)
+    sys.stdout.write("\n")
+
+
+# --sorgu bir JSON koşul ağacı ya da onu içeren dosyanın yoludur (bkz. servis_core.SORGU_ALANLARI)
+def _sorgu(deger):
+    if not deger:
+        return None
+    if os.path.isfile(deger):
+        with open(deger, encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(deger)
+
+
+# --kayitli verilirse kayıtlı sorgunun filtreleri temel alınır; komut satırında verilen filtreler onların yerine
+# geçer, iki koşul ağacı ise VE ile birleşir
+def _filtreler(args, db=None):
+    filtreler = {"barkod_no": args.barkod, "cihaz_durumu": args.durum,
+                 "gonderim_baslangic": args.gonderim_baslangic, "gonderim_bitis": args.gonderim_bitis,
+                 "gelme_baslangic": args.gelme_baslangic, "gelme_bitis": args.gelme_bitis, "acik_gun_ustu": args.acik_gun,
+                 "sorgu": _sorgu(args.sorgu)}
+    if not args.kayitli:
+        return filtreler
+    kayitli, _ = db.kayitli_sorgu(args.kayitli)
+    if kayitli.get("sorgu") and filtreler["sorgu"]:
+        filtreler["sorgu"] = {"ve": [kayitli["sorgu"], filtreler["sorgu"]]}
+    return {**kayitli, **{k: v for k, v in filtreler.items() if v is not None}}
+
+
+def _siralama(args, db=None):
+    if args.sirala:
+        return args.sirala, args.azalan
+    return db.kayitli_sorgu(args.kayitli)[1] if getattr(args, "kayitli", None) else None
+
+
+# Sıralı listede 'sonraki' aynı --sirala/--azalan ile kullanılmalıdır
+def _sayfa_yaz(db, args, filtre="", filtreler=None):
+    son = tuple(json.loads(args.sonra)) if args.sonra else None
+    satirlar, sonraki = db.fetch_page(son, args.limit, filtre, filtreler, siralama=_siralama(args, db))
+    if args.jsonl:
+        for satir in satirlar:
+            _yaz(_kayit_sozlugu(satir))
+    else:
+        _yaz({"kayitlar": [_kayit_sozlugu(s) for s in satirlar],
+              "sonraki": json.dumps(list(sonraki)) if sonraki else None})
+
+
+def komut_list(db, args):
+    _sayfa_yaz(db, args, filtreler=_filtreler(args, db))
+
+
+def komut_search(db, args):
+    _sayfa_yaz(db, args, filtre=" ".join(args.terimler))
+
+
+def komut_import(db, args):
+    _yaz(ice_aktar(db, args.dosya, kuru_calistirma=args.dry_run, hata_raporu=args.rapor))
+
+
+def komut_export(db, args):
+    filtreler = _filtreler(args, db)
+    ek_sayfalar = (lambda kitap: excel_sayfalari(kitap, analiz_raporu(db, args.filtre, filtreler))) if args.analiz else None
+    yazilan, sure = disa_aktar(db, args.dosya, args.filtre, filtreler, ek_sayfalar=ek_sayfalar,
+                               siralama=_siralama(args, db))
+    _yaz({"dosya": args.dosya, "kayit": yazilan, "sure": sure})
+
+
+def komut_analiz(db, args):
+    rapor = analiz_raporu(db, args.filtre, _filtreler(args, db))
+    if args.excel:
+        excel_raporu_yaz(rapor, args.excel)
+    _yaz(rapor)
+
+
+def komut_sorgu_kaydet(db, args):
+    filtreler = {k: v for k, v in _filtreler(args, db).items() if v is not None}
+    siralama = _siralama(args, db)
+    db.sorguyu_kaydet(args.ad, filtreler, siralama)
+    _yaz({"ad": args.ad, "filtreler": filtreler, "siralama": siralama})
+
+
+def komut_sorgu_listele(db, args):
+    _yaz([{"ad": ad, "filtreler": filtreler, "siralama": siralama}
+          for ad in db.kayitli_sorgulari_listele() for filtreler, siralama in [db.kayitli_sorgu(ad)]])
+
+
+def komut_sorgu_sil(db, args):
+    if not db.kayitli_sorguyu_sil(args.ad):
+        raise ValueError(f"Kayıtlı sorgu bulunamadı: {args.ad}")
+    _yaz({"silinen": args.ad})
+
+
+def komut_stats(db, args):
+    _yaz(db.fetch_istatistikler())
+
+
+def komut_vacuum(db, args):
+    once, sonra = db.vacuum()
+    _yaz({"onceki_boyut": once, "yeni_boyut": sonra})
+
+
+# Başarısızlıkta check_query_plans'ın AssertionError'ı main'de {"hata": ...} ve çıkış kodu 1 olur
+def komut_plan_denetle(db, args):
+    planlar = db.check_query_plans()
+    _yaz(planlar if args.ayrinti else {"sorgu": len(planlar), "sonuc": "tamam"})
+
+
+def komut_arsiv(db, args):
+    _yaz(BelgeDeposu().arsivle(db, gun=args.gun, sikistirma="lzma" if args.lzma else "zlib"))
+
+
+def komut_arsiv_dogrula(db, args):
+    sonuc = BelgeDeposu().paketleri_dogrula(db)
+    _yaz(sonuc)
+    if sonuc["hatalar"]:
+        raise RuntimeError(f"{len(sonuc['hatalar'])} arşiv belgesi bozuk")
+
+
+def komut_yedek(db, args):
+    _yaz(yedek_al(db, args.klasor))
+
+
+def komut_yedek_listele(db, args):
+    _yaz([{"yedek": yedek, "olusturma": bilgi["olusturma"], "belge": len(bilgi["belgeler"]),
+           "veritabani_boyutu": bilgi["veritabani"]["boyut"]}
+          for yedek, bilgi in ((yedek, yedek_bilgisi(yedek)) for yedek in yedekleri_listele(args.klasor))])
+
+
+def komut_yedek_dogrula(db, args):
+    yedek = args.yedek or next(iter(yedekleri_listele(args.klasor)), None)
+    if yedek is None:
+        raise RuntimeError("Yedek bulunamadı")
+    sonuc = yedegi_dogrula(yedek)
+    _yaz(sonuc)
+    if sonuc["hatalar"]:
+        raise RuntimeError(f"{len(sonuc['hatalar'])} yedek dosyası bozuk")
+
+
+def komut_geri_yukle(db, args):
+    _yaz(geri_yukle(db, args.yedek))
+
+
+# Ayrıntılar milyonlarca satır olabileceği için stdout'a yalnızca sayılar yazılır; tam liste --rapor dosyasına
+def komut_tara(db, args):
+    tarama = belgeleri_tara(db, derin=args.derin)
+    if args.rapor:
+        with open(args.rapor, "w", encoding="utf-8") as f:
+            json.dump(tarama, f, ensure_ascii=False)
+    sonuc = tarama_ozeti(tarama)
+    if args.bagla:
+        sonuc["bagla"] = yeniden_bagla(db, tarama)
+    if args.karantina:
+        sonuc["karantina"] = karantinaya_al(db, tarama)
+    _yaz(sonuc)
+
+
+def arguman_ayristirici():
+    parser = argparse.ArgumentParser(prog="servis_cli", description="Servis Takip Sistemi komut satırı aracı")
+    parser.add_argument("--db", default=VARSAYILAN_VERITABANI, help=f"veritabanı dosyası (varsayılan: {VARSAYILAN_VERITABANI})")
+    parser.add_argument("--olcum", help="performans ölçümünü aç ve sonunda ölçümleri bu JSON dosyasına yaz")
+    komutlar = parser.add_subparsers(dest="komut", required=True)
+
+    def sayfa_secenekleri(p):
+        p.add_argument("--limit", type=int, default=SAYFA_BOYUTU)
+        p.add_argument("--sonra", help="önceki çıktının 'sonraki' değeri; bir sonraki sayfayı döndürür")
+        p.add_argument("--jsonl", action="store_true", help="her kaydı ayrı bir satırda JSON olarak yaz")
+
+    def siralama_secenekleri(p):
+        p.add_argument("--sirala", choices=list(SIRALAMA_SUTUNLARI), help="bu sütuna göre sırala (indeksten)")
+        p.add_argument("--azalan", action="store_true", help="--sirala ile azalan sırada")
+
+    def filtre_secenekleri(p):
+        p.add_argument("--barkod", help="barkod no içinde geçen metin")
+        p.add_argument("--durum", help="cihaz durumu (tam eşleşme)")
+        for ad, aciklama in [("gonderim-baslangic", "bu tarihte ya da sonra gönderilenler"),
+                             ("gonderim-bitis", "bu tarihte ya da önce gönderilenler"),
+                             ("gelme-baslangic", "bu tarihte ya da sonra gelenler"),
+                             ("gelme-bitis", "bu tarihte ya da önce gelenler")]:
+            p.add_argument(f"--{ad}", help=f"{aciklama} (YYYY-AA-GG ya da GG.AA.YYYY)")
+        p.add_argument("--acik-gun", type=int, help="gönderileli N günden fazla olan ve henüz gelmemiş kayıtlar")
+        p.add_argument("--sorgu", help="JSON koşul ağacı ya da onu içeren dosya (alan/islem/deger; ve/veya grupları)")
+        p.add_argument("--kayitli", help="bu adla kaydedilmiş sorguyu (filtreler ve sıralama) temel al")
+
+    p = komutlar.add_parser("list", help="kayıtları id (ya da --sirala) sırasıyla listele")
+    sayfa_secenekleri(p)
+    siralama_secenekleri(p)
+    filtre_secenekleri(p)
+    p.set_defaults(islev=komut_list)
+
+    p = komutlar.add_parser("search", help="tam metin arama (sonuçlar ilgiye göre sıralı)")
+    p.add_argument("terimler", nargs="+")
+    sayfa_secenekleri(p)
+    siralama_secenekleri(p)
+    p.set_defaults(islev=komut_search)
+
+    p = komutlar.add_parser("import", help="Excel/CSV dosyasından toplu içe aktar")
+    p.add_argument("dosya")
+    p.add_argument("--dry-run", action="store_true", help="yalnızca doğrula, veritabanına yazma")
+    p.add_argument("--rapor", help="hatalı satırlar için CSV (varsayılan: <dosya>_hatalar.csv)")
+    p.set_defaults(islev=komut_import)
+
+    p = komutlar.add_parser("export", help="kayıtları .xlsx veya .csv dosyasına aktar")
+    p.add_argument("dosya")
+    p.add_argument("--filtre", default="", help="tam metin arama filtresi")
+    filtre_secenekleri(p)
+    siralama_secenekleri(p)
+    p.add_argument("--analiz", action="store_true", help=".xlsx çıktısına analiz sayfalarını da ekle")
+    p.set_defaults(islev=komut_export)
+
+    p = komutlar.add_parser("analiz", help="dönüş süresi, tamir/hurda oranı, bölge bekleyenleri ve tekrarlayan arızalar")
+    p.add_argument("--filtre", default="", help="tam metin arama filtresi")
+    filtre_secenekleri(p)
+    p.add_argument("--excel", help="raporu ayrıca bu .xlsx dosyasına yaz")
+    p.set_defaults(islev=komut_analiz)
+
+    p = komutlar.add_parser("sorgu-kaydet", help="filtreleri ve sıralamayı bu adla kaydet (arayüzde de görünür)")
+    p.add_argument("ad")
+    filtre_secenekleri(p)
+    siralama_secenekleri(p)
+    p.set_defaults(islev=komut_sorgu_kaydet)
+
+    p = komutlar.add_parser("sorgu-listele", help="kayıtlı sorguları listele")
+    p.set_defaults(islev=komut_sorgu_listele)
+
+    p = komutlar.add_parser("sorgu-sil", help="kayıtlı sorguyu sil")
+    p.add_argument("ad")
+    p.set_defaults(islev=komut_sorgu_sil)
+
+    p = komutlar.add_parser("stats", help="kayıt, durum, belge ve dosya boyutu özetini göster")
+    p.set_defaults(islev=komut_stats)
+
+    p = komutlar.add_parser("vacuum", help="arama indeksini birleştir ve veritabanı dosyasını sıkıştır")
+    p.set_defaults(islev=komut_vacuum)
+
+    p = komutlar.add_parser("plan-denetle", help="filtre, arama ve sıralama sorgularının indeks kullandığını denetle")
+    p.add_argument("--ayrinti", action="store_true", help="her sorgunun planını da yaz")
+    p.set_defaults(islev=komut_plan_denetle)
+
+    p = komutlar.add_parser("arsiv", help="hurda/tamir edilmiş eski kayıtların belgelerini sıkıştırılmış paketlere taşı")
+    p.add_argument("--gun", type=int, default=ARSIV_GUN, help=f"servisten bu kadar gün önce gelenler (varsayılan: {ARSIV_GUN})")
+    p.add_argument("--lzma", action="store_true", help="zlib yerine daha yavaş ama daha sıkı lzma kullan")
+    p.set_defaults(islev=komut_arsiv)
+
+    p = komutlar.add_parser("arsiv-dogrula", help="arşiv paketlerindeki tüm belgelerin sağlama toplamını denetle")
+    p.set_defaults(islev=komut_arsiv_dogrula)
+
+    p = komutlar.add_parser("yedek", help="veritabanı ve belgelerin artımlı yedeğini al (uygulama açıkken de)")
+    p.add_argument("--klasor", help="yedek klasörü (varsayılan: ayarlardaki yedek.klasor)")
+    p.set_defaults(islev=komut_yedek)
+
+    p = komutlar.add_parser("yedek-listele", help="tamamlanmış yedekleri en yeniden eskiye listele")
+    p.add_argument("--klasor", help="yedek klasörü (varsayılan: ayarlardaki yedek.klasor)")
+    p.set_defaults(islev=komut_yedek_listele)
+
+    p = komutlar.add_parser("yedek-dogrula", help="yedekteki veritabanı ve belgelerin sağlama toplamını denetle")
+    p.add_argument("yedek", nargs="?", help="yedek klasörü (varsayılan: en yeni yedek)")
+    p.add_argument("--klasor", help="yedek klasörü (varsayılan: ayarlardaki yedek.klasor)")
+    p.set_defaults(islev=komut_yedek_dogrula)
+
+    p = komutlar.add_parser("tara", help="belgeler klasörünü veritabanıyla karşılaştır: eksik, sahipsiz ve bozuk dosyalar")
+    p.add_argument("--derin", action="store_true", help="her dosyanın sağlama toplamını da denetle (yavaş)")
+    p.add_argument("--rapor", help="tüm bulguları bu JSON dosyasına yaz")
+    p.add_argument("--bagla", action="store_true", help="eksik belgeleri sahipsiz dosyalar arasında bulup yeniden bağla")
+    p.add_argument("--karantina", action="store_true", help="sahipsiz ve bozuk dosyaları belgeler_karantina/ altına taşı")
+    p.set_defaults(islev=komut_tara)
+
+    p = komutlar.add_parser("geri-yukle", help="yedeği doğrulayıp veritabanı ve belgelere geri yükle")
+    p.add_argument("yedek", help="yedek klasörü (ör. yedekler/20240131_120000_000)")
+    p.set_defaults(islev=komut_geri_yukle)
+    return parser
+
+
+def main(argv=None):
+    args = arguman_ayristirici().parse_args(argv)
+    servis_core.load_settings()
+    servis_core.configure_logging()
+    if args.olcum:
+        servis_core.olcumler.etkin = True
+    db = None
+    try:
+        db = DatabaseManager(args.db)
+        args.islev(db, args)
+    except Exception as e:
+        json.dump({"hata": str(e)}, sys.stderr, ensure_ascii=False)
+        sys.stderr.write("\n")
+        return 1
+    finally:
+        if db:
+            db.close()
+        if args.olcum:
+            servis_core.olcumler.json_yaz(args.olcum)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2238 @@
+"""Servis Takip Sistemi'nin arayüzden bağımsız çekirdeği.
+
+Ayarlar, veritabanı şeması ve sorguları, belge deposu ile içe/dışa aktarma burada bulunur. tkinter'e
+bağımlı değildir; masaüstü uygulaması (servis_takip.py) ve komut satırı aracı (servis_cli.py) bu modülü
+kullanır. openpyxl yalnızca Excel dosyası okunup yazılırken yüklenir.
+"""
+import sqlite3
+import datetime
+import os
+import shutil
+import logging
+import logging.handlers
+import queue
+import atexit
+import json
+import struct
+import tempfile
+import zlib
+import csv
+import re
+import threading
+import hashlib
+import random
+import functools
+import inspect
+import math
+import unicodedata
+from collections import OrderedDict, deque
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Global ayarlar
+SETTINGS_FILE = "settings.json"
+DEFAULT_SETTINGS = {
+    "log_enabled": True,
+    "log_file": "servis_takip.log",
+    # Log dosyası bu boyutu (bayt) aşınca ya da açılışından bu kadar saat geçince döndürülür (0: kapalı);
+    # log_backup_count kadar eski dosya (.1, .2, ...) saklanır
+    "log_level": "INFO",
+    "log_max_bytes": 5 * 1024 * 1024,
+    "log_rotate_hours": 24,
+    "log_backup_count": 5,
+    # Bağlantı profili: aynı veritabanı dosyasını birden çok kullanıcı paylaştığında WAL kipi okuyucuların
+    # yazıcıları beklemesini önler; busy_timeout (ms) kilitli veritabanında hata vermeden önce bekleme süresidir
+    "veritabani": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -20000,
+        "mmap_size": 268435456
+    },
+    # Performans ölçümü: açıkken veritabanı metotları ve arayüz işlemleri süre dağılımına eklenir;
+    # yavas_sorgu_ms'yi aşan SQL deyimleri sorgu planıyla (EXPLAIN QUERY PLAN) loga yazılır
+    "olcum": {
+        "etkin": False,
+        "yavas_sorgu_ms": 100
+    },
+    # Yedekleme: veritabanı çalışırken SQLite yedekleme API'siyle sayfa_adimi sayfalık adımlarla kopyalanır;
+    # klasor altında en yeni "saklanan" kadar yedek tutulur
+    "yedek": {
+        "klasor": "yedekler",
+        "saklanan": 7,
+        "sayfa_adimi": 1024
+    }
+}
+
+# Modül içe aktarılırken dosya okunmaz; uygulama ve komut satırı başlangıçta load_settings() çağırır.
+# Sözlük yerinde güncellendiği için "from servis_core import settings" ile alınan referans geçerli kalır.
+settings = json.loads(json.dumps(DEFAULT_SETTINGS))
+
+# Ayarları yükle; eski ayar dosyalarında olmayan anahtarlar varsayılanlarla tamamlanır
+def load_settings():
+    if os.path.exists(SETTINGS_FILE):
+        with open(SETTINGS_FILE, "r") as f:
+            yuklenen = json.load(f)
+        for anahtar, deger in DEFAULT_SETTINGS.items():
+            if isinstance(deger, dict):
+                yuklenen[anahtar] = {**deger, **yuklenen.get(anahtar, {})}
+            else:
+                yuklenen.setdefault(anahtar, deger)
+        settings.clear()
+        settings.update(yuklenen)
+    else:
+        settings.clear()
+        settings.update(json.loads(json.dumps(DEFAULT_SETTINGS)))
+        save_settings()
+    olcumler.yapilandir()
+    return settings
+
+# Ayarları kaydet
+def save_settings():
+    with open(SETTINGS_FILE, "w") as f:
+        json.dump(settings, f, indent=4)
+
+# Uygulama logları "servis_takip" adlı logger'a yazılır. Mesajlar %-biçimiyle (log.info("... %s", x)) verilir;
+# loglama kapalıyken logger seviyesi CRITICAL'ın üstündedir ve çağrı, mesaj biçimlenmeden hemen döner.
+# Açıkken kayıtlar bir kuyruğa bırakılır, dosyaya JSON satırları olarak ayrı bir iş parçacığı yazar.
+log = logging.getLogger("servis_takip")
+log.propagate = False
+log.setLevel(logging.CRITICAL + 1)
+_log_dinleyicisi = None
+
+# Standart LogRecord alanları dışında extra= ile verilenler JSON satırına eklenir
+_STANDART_KAYIT_ALANLARI = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonSatirBicimleyici(logging.Formatter):
+    def format(self, record):
+        satir = {"zaman": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+                 "seviye": record.levelname, "mesaj": record.getMessage(), "is_parcacigi": record.threadName}
+        for anahtar, deger in vars(record).items():
+            if anahtar not in _STANDART_KAYIT_ALANLARI:
+                satir[anahtar] = deger
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            satir["hata"] = record.exc_text
+        return json.dumps(satir, ensure_ascii=False, default=str)
+
+
+# Boyut ya da süre sınırından hangisi önce dolarsa dosya döndürülür
+class DonenLogDosyasi(logging.handlers.RotatingFileHandler):
+    def __init__(self, dosya_yolu, max_bytes=0, yedek_sayisi=0, donus_saniyesi=0):
+        super().__init__(dosya_yolu, maxBytes=max_bytes, backupCount=yedek_sayisi, encoding="utf-8", delay=True)
+        self.donus_saniyesi = donus_saniyesi
+        self.sonraki_donus = time.time() + donus_saniyesi if donus_saniyesi else None
+
+    def shouldRollover(self, record):
+        if self.sonraki_donus is not None and time.time() >= self.sonraki_donus:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        if self.donus_saniyesi:
+            self.sonraki_donus = time.time() + self.donus_saniyesi
+
+
+# Mesaj ve hata metni çağıran iş parçacığında sabitlenir (argümanlar sonradan değişebilir); JSON'a çevirme
+# ve dosyaya yazma dinleyici iş parçacığında yapılır
+class _KuyrukIsleyicisi(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _log_dinleyicisini_durdur():
+    global _log_dinleyicisi
+    for isleyici in list(log.handlers):
+        log.removeHandler(isleyici)
+    if _log_dinleyicisi:
+        # stop() kuyruktaki kayıtlar yazılana kadar bekler
+        _log_dinleyicisi.stop()
+        for isleyici in _log_dinleyicisi.handlers:
+            isleyici.close()
+        _log_dinleyicisi = None
+
+atexit.register(_log_dinleyicisini_durdur)
+
+# Loglama ayarları; çalışma sırasında (ayarlar penceresinden) tekrar çağrılabilir: önceki dinleyici kuyruğu
+# boşaltıp kapatılır, yeni dosya/seviye hemen geçerli olur
+def configure_logging():
+    global _log_dinleyicisi
+    _log_dinleyicisini_durdur()
+    if not settings["log_enabled"]:
+        log.setLevel(logging.CRITICAL + 1)
+        return
+    dosya = DonenLogDosyasi(settings["log_file"], settings["log_max_bytes"], settings["log_backup_count"],
+                            settings["log_rotate_hours"] * 3600)
+    dosya.setFormatter(JsonSatirBicimleyici())
+    kuyruk = queue.SimpleQueue()
+    _log_dinleyicisi = logging.handlers.QueueListener(kuyruk, dosya)
+    _log_dinleyicisi.start()
+    log.addHandler(_KuyrukIsleyicisi(kuyruk))
+    seviye = logging.getLevelName(str(settings["log_level"]).upper())
+    log.setLevel(seviye if isinstance(seviye, int) else logging.INFO)
+
+VARSAYILAN_VERITABANI = "servis_takip.db"
+
+# Ana listede tek seferde veritabanından çekilen satır sayısı (görünen alan + ön yükleme payı)
+SAYFA_BOYUTU = 100
+
+# Dışa aktarma: veritabanından bu kadarlık parçalar halinde okunup dosyaya yazılır
+DISA_AKTARMA_PARCASI = 5000
+DISA_AKTARMA_BASLIKLARI = ["Kayıt ID", "Barkod No", "Bölge", "Personel Ad Soyad", "Personel Sicil No",
+                           "Cihaz Tipi", "Cihaz Seri No", "Servis Gönderim Tarihi",
+                           "Servis Gelme Tarihi", "Cihaz Durumu", "Açıklama", "Belge Sayısı"]
+
+# İçe aktarma: her parti tek bir işlemde (tek commit) yazılır
+ICE_AKTARMA_PARTISI = 50000
+SICIL_NO_DESENI = re.compile(r"^\d{5,}$")
+# Tarihler veritabanında ISO-8601 (YYYY-AA-GG) metin olarak saklanır; böylece sıralanabilir ve indeksle aralık
+# taranabilir. TARIH_BICIMI yalnızca kullanıcıya gösterilen ve kullanıcıdan alınan biçimdir; boş tarih "" dir.
+TARIH_BICIMI = "%d.%m.%Y"
+
+# Kilitli veritabanı (SQLITE_BUSY) durumunda yazma işlemi artan bekleme süreleriyle yeniden denenir
+MESGUL_DENEME_SAYISI = 5
+MESGUL_ILK_BEKLEME = 0.05
+# Bağlantı başına önbellekte tutulan hazır deyim sayısı (sqlite3 varsayılanı 128); sorgu oluşturucunun ürettiği
+# SQL metinleri ağacın biçimine göre sabit kaldığından tekrar çalıştırmalar yeniden derlenmez
+HAZIR_DEYIM_ONBELLEGI = 256
+JOURNAL_KIPLERI = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SYNCHRONOUS_KIPLERI = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+# Canlı arama: en az bu kadar karakterde çalışır; eşleşme sayısı sınırı aşmıyorsa tüm sonuç kümesi belleğe
+# alınır ve sorgu uzatıldıkça veritabanına gitmeden bellekte daraltılır
+CANLI_ARAMA_EN_KISA = 2
+CANLI_ARAMA_SINIRI = 2000
+
+# Tekil kayıt önbelleği: en son kullanılan bu kadar kayıt (belgeleriyle birlikte) bellekte tutulur
+KAYIT_ONBELLEGI_BOYUTU = 1000
+
+# Belge deposu: içerik SHA-256 ile adreslenir, dosyalar parça parça okunur
+BELGE_KLASORU = "belgeler"
+OKUMA_PARCASI = 1024 * 1024
+DEPO_TASIMA_PARTISI = 100
+FICLONE = 0x40049409  # Linux yazma-üzerine-kopya klon ioctl'i (btrfs, xfs)
+ALIM_IS_PARCACIGI = 4  # Toplu belge eklemede aynı anda kopyalanan dosya sayısı
+# Sahipsiz bir blob ancak bu süre boyunca dokunulmamışsa silinir (eşzamanlı eklemelerle yarışmamak için)
+COP_TOPLAMA_BEKLEMESI = 3600
+
+# Arşiv: ARSIV_DURUMLARI'ndaki ve geri gelişinin üzerinden belirli bir gün geçmiş kayıtların belgeleri paket
+# dosyalarına (belgeler/paketler/*.stpk) alınır. Her belge pakette ayrı sıkıştırılır; böylece tek bir belge paketin
+# geri kalanı açılmadan okunabilir. Dosya düzeni: PAKET_IMZASI, girdiler, zlib ile sıkıştırılmış JSON dizin
+# ([anahtar, ofset, uzunluk, kip, boyut] listesi), dizinin ofseti (8 bayt) ve PAKET_SONU. Veritabanındaki
+# paket_girdileri tablosu aynı dizinin kopyasıdır; paket dosyası tek başına da okunabilir.
+ARSIV_DURUMLARI = ("Hurda", "Tamir edildi")
+ARSIV_GUN = 365
+ARSIV_SIKISTIRMALARI = ("zlib", "lzma")
+ARSIV_PAKET_BOYUTU = 256 * 1024 * 1024  # bir pakete alınan en fazla ham bayt
+ARSIV_PARTISI = 5000  # bir seferde okunan en fazla belge satırı
+ARSIV_KAZANC_ESIGI = 0.95  # sıkıştırılmış boyut ham boyutun bu oranını aşarsa belge sıkıştırılmadan saklanır
+SIKISTIRILMIS_UZANTILAR = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".zip", ".7z", ".rar", ".gz", ".xz", ".bz2",
+                           ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".mp3", ".mp4"}
+PAKET_IMZASI = b"STPAKET1"
+PAKET_SONU = b"STPAKSON"
+# Paketten açılan belgeler işletim sisteminin uygulamasıyla açılabilmesi için buraya çıkarılır
+ACILAN_BELGE_KLASORU = os.path.join(tempfile.gettempdir(), "servis_takip_belgeler")
+
+# Türkçe harf katlama: İ/I/ı ve Ş/Ğ/Ç/Ö/Ü aksansız küçük harfe indirgenir
+TURKCE_KATLAMA = str.maketrans({
+    "İ": "i", "I": "i", "ı": "i", "Ş": "s", "ş": "s", "Ğ": "g", "ğ": "g",
+    "Ç": "c", "ç": "c", "Ö": "o", "ö": "o", "Ü": "u", "ü": "u",
+})
+
+def turkce_normalize(metin):
+    if metin is None:
+        return None
+    metin = str(metin)
+    if metin.isascii():  # Barkod/seri no gibi ASCII metinlerde katlanacak harf yoktur
+        return metin.lower()
+    return metin.translate(TURKCE_KATLAMA).lower()
+
+# Arama kutusundaki metni FTS5 sorgusuna çevirir: her terim önek eşleşmeli ve hepsi zorunlu
+def fts_sorgusu(filtre):
+    terimler = []
+    for terim in turkce_normalize(filtre).split():
+        terim = re.sub(r"[^\w]+", " ", terim).strip()
+        if terim:
+            terimler.append('"' + terim + '"*')
+    return " ".join(terimler)
+
+# Önek aramasını B-ağacı indeksinde aralık taramasına çevirir: "BRK0" -> ("BRK0", "BRK1")
+def on_ek_araligi(on_ek):
+    return on_ek, on_ek[:-1] + chr(ord(on_ek[-1]) + 1)
+
+# FTS5 unicode61 (remove_diacritics 2) belirteçlemesinin Python karşılığı; bellekte daraltma için kullanılır
+BELIRTEC_DESENI = re.compile(r"[^\W_]+")
+
+def arama_belirtecleri(metin):
+    return toplu_belirtecler([metin])[0]
+
+# Çok sayıda metni tek seferde belirteçlere ayırır: katlama tek bir büyük metin üzerinde str.replace ile yapılır,
+# satır başına translate çağrısından iki kattan fazla hızlıdır
+def toplu_belirtecler(metinler):
+    metinler = [str(m or "").replace("\n", " ") for m in metinler]
+    if not metinler:
+        return []
+    metin = "\n".join(metinler)
+    if not metin.isascii():
+        for harf, karsilik in TURKCE_KATLAMA.items():
+            metin = metin.replace(chr(harf), karsilik)
+    metin = metin.lower()
+    if not metin.isascii():
+        metin = "".join(h for h in unicodedata.normalize("NFKD", metin) if not unicodedata.combining(h))
+    return [BELIRTEC_DESENI.findall(satir) for satir in metin.split("\n")]
+
+# Canlı arama sonuç kümesi. Yeni sorgu öncekinin uzantısıysa (her terim önceki terimle başlıyor, yeni terimler
+# eklenmiş olabilir) sonuçlar önceki kümenin alt kümesidir ve bellekte süzülür. Noktalama içeren terimler FTS'de
+# öbek (phrase) sorgusuna dönüştüğünden daraltılmaz. Daraltılan sonuçlar önceki sorgunun sıralamasını korur.
+class CanliArama:
+    def __init__(self):
+        self.terimler = None
+        self.kip = None
+        self.satirlar = None
+        self.belirtecler = None
+
+    # Yazılmakta olan tek harfli terimler ("ayşe k") FTS önek indeksinde (en az 2 karakter) yer almadığı için tüm
+    # belirteçleri taratır; canlı aramada bu terimler sonraki harf gelene kadar yok sayılır
+    @staticmethod
+    def sorgu_metni(filtre):
+        return " ".join(t for t in filtre.split() if len(t) >= CANLI_ARAMA_EN_KISA)
+
+    # Sonuçların ana listede sayfa sayfa (ve dışa aktarmada) yeniden üretilmesi için fetch_page argümanları
+    @staticmethod
+    def liste_sorgusu(kip, filtre, id_sirali=False, siralama=None):
+        if kip == "barkod":
+            return {"filtre": "", "filtreler": {"barkod_on_eki": filtre.strip().upper()}, "id_sirali": False,
+                    "siralama": siralama}
+        return {"filtre": filtre, "filtreler": None, "id_sirali": id_sirali, "siralama": siralama}
+
+    @staticmethod
+    def terimleri_ayir(filtre):
+        return turkce_normalize(filtre).split()
+
+    @staticmethod
+    def barkod_gibi(terimler):
+        return len(terimler) == 1 and terimler[0].isascii() and any(h.isdigit() for h in terimler[0])
+
+    def kaydet(self, filtre, kip, satirlar, tam):
+        if not tam:
+            self.sifirla()
+            return
+        self.terimler = self.terimleri_ayir(filtre)
+        self.kip = kip
+        self.satirlar = satirlar
+        sutunlar = [1] if kip == "barkod" else [CIHAZ_SUTUNLARI.index(s) for s in FTS_SUTUNLARI]
+        self.belirtecler = toplu_belirtecler(" ".join(str(satir[i] or "") for i in sutunlar) for satir in satirlar)
+
+    def sifirla(self):
+        self.terimler = self.satirlar = self.belirtecler = self.kip = None
+
+    def daralt(self, filtre):
+        if self.satirlar is None:
+            return None
+        terimler = self.terimleri_ayir(filtre)
+        if len(terimler) < len(self.terimler) or any(not t.startswith(o) for t, o in zip(terimler, self.terimler)):
+            return None
+        if any(arama_belirtecleri(t) != [t] for t in terimler):
+            return None
+        if self.kip == "barkod":
+            if len(terimler) != 1:
+                return None
+            secilen = [i for i, b in enumerate(self.belirtecler) if "".join(b).startswith(terimler[0])]
+        elif self.barkod_gibi(terimler):
+            return None  # veritabanında önce barkod indeksi denenir; bellekte tam metin sonucu verilmez
+        else:
+            secilen = [i for i, b in enumerate(self.belirtecler)
+                       if all(any(belirtec.startswith(t) for belirtec in b) for t in terimler)]
+        self.terimler = terimler
+        self.satirlar = [self.satirlar[i] for i in secilen]
+        self.belirtecler = [self.belirtecler[i] for i in secilen]
+        return self.satirlar
+
+# Şema geçişleri: (sürüm, açıklama, adım) sırasıyla ve her biri tek işlemde uygulanır.
+# Yeni bir şema değişikliği her zaman listenin sonuna yeni bir sürüm olarak eklenmelidir.
+def _sema_v1_cihazlar(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cihazlar (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            barkod_no TEXT NOT NULL,
+            bolge TEXT, personel_ad_soyad TEXT, personel_sicil_no TEXT,
+            cihaz_tipi TEXT, cihaz_seri_no TEXT, servis_gonderim_tarihi TEXT,
+            servis_gelme_tarihi TEXT, cihaz_durumu TEXT, aciklama TEXT,
+            cihaz_belgeleri TEXT
+        )
+    ''')
+
+def _sema_v2_indeksler(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_barkod_no ON cihazlar (barkod_no)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_cihaz_durumu ON cihazlar (cihaz_durumu)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_personel_sicil_no ON cihazlar (personel_sicil_no)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_gonderim_tarihi ON cihazlar (servis_gonderim_tarihi)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_gelme_tarihi ON cihazlar (servis_gelme_tarihi)")
+
+# Arama indeksi içeriksizdir (content=''); tetikleyiciler silme/güncellemede indekslenen değerleri geri vererek
+# indeksi senkron tutar. Katlama yalnızca yerleşik SQL ile yapılır (bkz. _fts_metni), böylece tabloya
+# uygulama dışındaki bağlantılardan (sqlite3 kabuğu, DB Browser, betikler) da yazılabilir.
+FTS_SUTUNLARI = ["barkod_no", "personel_ad_soyad", "personel_sicil_no", "cihaz_seri_no", "bolge", "aciklama"]
+
+# unicode61 (remove_diacritics 2) küçük harfe çevirir ve Ş/Ğ/Ç/Ö/Ü/İ işaretlerini atar; ayrışmayan tek harf
+# noktasız ı'dır. Üretilen belirteçler turkce_normalize ile katlanmış metninkilerle aynıdır.
+def _fts_metni(sutun):
+    return f"replace({sutun}, 'ı', 'i')"
+
+def _arama_tetikleyicileri(cursor):
+    sutunlar = ", ".join(FTS_SUTUNLARI)
+    yeni = ", ".join(_fts_metni(f"new.{s}") for s in FTS_SUTUNLARI)
+    eski = ", ".join(_fts_metni(f"old.{s}") for s in FTS_SUTUNLARI)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS cihazlar_fts_ai AFTER INSERT ON cihazlar BEGIN
+            INSERT INTO cihazlar_fts (rowid, {sutunlar}) VALUES (new.id, {yeni});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS cihazlar_fts_ad AFTER DELETE ON cihazlar BEGIN
+            INSERT INTO cihazlar_fts (cihazlar_fts, rowid, {sutunlar}) VALUES ('delete', old.id, {eski});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS cihazlar_fts_au AFTER UPDATE OF {sutunlar} ON cihazlar BEGIN
+            INSERT INTO cihazlar_fts (cihazlar_fts, rowid, {sutunlar}) VALUES ('delete', old.id, {eski});
+            INSERT INTO cihazlar_fts (rowid, {sutunlar}) VALUES (new.id, {yeni});
+        END
+    ''')
+
+def _sema_v3_arama_indeksi(cursor):
+    sutunlar = ", ".join(FTS_SUTUNLARI)
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS cihazlar_fts USING fts5(
+            {sutunlar}, content='', prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    _arama_tetikleyicileri(cursor)
+    cursor.execute(f"""
+        INSERT INTO cihazlar_fts (rowid, {sutunlar})
+        SELECT id, {", ".join(_fts_metni(s) for s in FTS_SUTUNLARI)} FROM cihazlar
+    """)
+
+# Belgeler ayrı tabloda tutulur; cihazlar.belge_sayisi tetikleyicilerle güncellenen bir sayaçtır.
+# Eski JSON listesi (cihaz_belgeleri) taşındıktan sonra boşaltılır ve artık yazılmaz.
+def _sema_v4_belgeler(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS belgeler (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cihaz_id INTEGER NOT NULL REFERENCES cihazlar (id) ON DELETE CASCADE,
+            dosya_yolu TEXT NOT NULL,
+            eklenme_tarihi TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_belgeler_cihaz_id ON belgeler (cihaz_id)")
+    cursor.execute("ALTER TABLE cihazlar ADD COLUMN belge_sayisi INTEGER NOT NULL DEFAULT 0")
+    yazici = cursor.connection.cursor()
+    cursor.execute("SELECT id, cihaz_belgeleri FROM cihazlar WHERE cihaz_belgeleri IS NOT NULL AND cihaz_belgeleri NOT IN ('', '[]')")
+    for cihaz_id, belgeler_json in cursor:
+        yazici.executemany("INSERT INTO belgeler (cihaz_id, dosya_yolu) VALUES (?, ?)",
+                           [(cihaz_id, yol) for yol in json.loads(belgeler_json)])
+    cursor.execute('''
+        UPDATE cihazlar SET cihaz_belgeleri = NULL,
+            belge_sayisi = (SELECT COUNT(*) FROM belgeler WHERE belgeler.cihaz_id = cihazlar.id)
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS belgeler_sayac_ai AFTER INSERT ON belgeler BEGIN
+            UPDATE cihazlar SET belge_sayisi = belge_sayisi + 1 WHERE id = new.cihaz_id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS belgeler_sayac_ad AFTER DELETE ON belgeler BEGIN
+            UPDATE cihazlar SET belge_sayisi = belge_sayisi - 1 WHERE id = old.cihaz_id;
+        END
+    ''')
+
+# Blob anahtarı "sha256 + uzantı" biçimindedir; uzantı dosyanın işletim sistemiyle açılabilmesi için korunur.
+# blobler.referans_sayisi belgeler tablosundaki tetikleyicilerle tutulur, sıfıra inen bloblar çöp toplayıcıya kalır.
+def _sema_v5_belge_deposu(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS blobler (
+            anahtar TEXT PRIMARY KEY,
+            boyut INTEGER NOT NULL,
+            referans_sayisi INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_blobler_sahipsiz ON blobler (anahtar) WHERE referans_sayisi = 0")
+    cursor.execute("ALTER TABLE belgeler ADD COLUMN blob_anahtar TEXT REFERENCES blobler (anahtar)")
+    cursor.execute("ALTER TABLE belgeler ADD COLUMN dosya_adi TEXT")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_belgeler_blob_anahtar ON belgeler (blob_anahtar)")
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS belgeler_blob_ai AFTER INSERT ON belgeler WHEN new.blob_anahtar IS NOT NULL BEGIN
+            UPDATE blobler SET referans_sayisi = referans_sayisi + 1 WHERE anahtar = new.blob_anahtar;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS belgeler_blob_ad AFTER DELETE ON belgeler WHEN old.blob_anahtar IS NOT NULL BEGIN
+            UPDATE blobler SET referans_sayisi = referans_sayisi - 1 WHERE anahtar = old.blob_anahtar;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS belgeler_blob_au AFTER UPDATE OF blob_anahtar ON belgeler BEGIN
+            UPDATE blobler SET referans_sayisi = referans_sayisi - 1 WHERE anahtar = old.blob_anahtar;
+            UPDATE blobler SET referans_sayisi = referans_sayisi + 1 WHERE anahtar = new.blob_anahtar;
+        END
+    ''')
+
+def _tarih_iso_ya_da_ayni(deger):
+    try:
+        return tarih_iso(deger)
+    except (TypeError, ValueError):
+        return deger
+
+# Tarih sütunları ISO biçimine çevrilir (çözülemeyen eski değerler olduğu gibi kalır, NULL -> "").
+# Gelme tarihi indeksi (gelme, gönderim) bileşik indeksiyle değiştirilir: açık kayıtlar (gelme = '') gönderim
+# tarihine göre sıralı bir aralık olur ve "N günden uzun serviste" sorgusu tek bir indeks aralığıdır.
+def _sema_v6_iso_tarihler(cursor):
+    cursor.connection.create_function("tarih_iso", 1, _tarih_iso_ya_da_ayni, deterministic=True)
+    for sutun in ("servis_gonderim_tarihi", "servis_gelme_tarihi"):
+        cursor.execute(f"UPDATE cihazlar SET {sutun} = '' WHERE {sutun} IS NULL")
+        cursor.execute(f"UPDATE cihazlar SET {sutun} = tarih_iso({sutun}) WHERE {sutun} LIKE '%.%'")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_gelme_gonderim ON cihazlar (servis_gelme_tarihi, servis_gonderim_tarihi)")
+    cursor.execute("DROP INDEX IF EXISTS idx_cihazlar_gelme_tarihi")
+
+def _sema_v7_belge_paketleri(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS paketler (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dosya TEXT NOT NULL UNIQUE,
+            sikistirma TEXT NOT NULL,
+            olusturma_tarihi TEXT NOT NULL,
+            girdi_sayisi INTEGER NOT NULL,
+            ham_boyut INTEGER NOT NULL,
+            paket_boyutu INTEGER NOT NULL
+        )
+    ''')
+    # Blob çöp toplayıcıyla silinirse girdisi de silinir; paketteki baytları ölü kalır
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS paket_girdileri (
+            anahtar TEXT PRIMARY KEY REFERENCES blobler (anahtar) ON DELETE CASCADE,
+            paket_id INTEGER NOT NULL REFERENCES paketler (id),
+            ofset INTEGER NOT NULL,
+            uzunluk INTEGER NOT NULL,
+            kip TEXT NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_paket_girdileri_paket_id ON paket_girdileri (paket_id)")
+
+# Listenin tıklanarak sıralanabilen sütunları için indeksler. Sıralı sayfalama sütun = ? karşılaştırması yaptığından
+# NULL değerler "" yapılır (yeni kayıtlar kayit_degerleri ile zaten "" yazılır).
+def _sema_v8_siralama_indeksleri(cursor):
+    for sutun in ("bolge", "personel_ad_soyad", "personel_sicil_no", "cihaz_tipi", "cihaz_seri_no", "cihaz_durumu"):
+        cursor.execute(f"UPDATE cihazlar SET {sutun} = '' WHERE {sutun} IS NULL")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_bolge ON cihazlar (bolge)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_personel_ad_soyad ON cihazlar (personel_ad_soyad)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_cihaz_tipi ON cihazlar (cihaz_tipi)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_cihaz_seri_no ON cihazlar (cihaz_seri_no)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_belge_sayisi ON cihazlar (belge_sayisi)")
+
+def _sema_v9_kayitli_sorgular(cursor):
+    # filtreler ve siralama JSON olarak saklanır (bkz. SORGU_ALANLARI, SIRALAMA_SUTUNLARI)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS kayitli_sorgular (
+            ad TEXT PRIMARY KEY,
+            filtreler TEXT NOT NULL,
+            siralama TEXT,
+            guncelleme_tarihi TEXT NOT NULL
+        )
+    ''')
+
+# Canlı aramadaki barkod öneki büyük/küçük harf duyarsızdır (FTS ve bellekte daraltma gibi); SQLite'ın yerleşik
+# upper() işlevi kullanıldığından başka bağlantılardan yazmak için ek işlev gerekmez
+def _sema_v10_barkod_buyuk_harf_indeksi(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cihazlar_barkod_buyuk ON cihazlar (upper(barkod_no))")
+
+# Eski tetikleyiciler uygulamanın kaydettiği turkce_normalize işlevini çağırıyordu ve başka bağlantılardan
+# yazmayı engelliyordu. Belirteçler aynı olduğundan indeks yeniden oluşturulmaz, yalnızca tetikleyiciler değişir.
+def _sema_v11_sql_arama_tetikleyicileri(cursor):
+    for ad in ("cihazlar_fts_ai", "cihazlar_fts_ad", "cihazlar_fts_au"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {ad}")
+    _arama_tetikleyicileri(cursor)
+
+MIGRATIONS = [
+    (1, "cihazlar tablosu", _sema_v1_cihazlar),
+    (2, "cihazlar indeksleri", _sema_v2_indeksler),
+    (3, "tam metin arama indeksi", _sema_v3_arama_indeksi),
+    (4, "belgeler tablosu", _sema_v4_belgeler),
+    (5, "içerik adresli belge deposu", _sema_v5_belge_deposu),
+    (6, "ISO tarih biçimi ve gelme/gönderim indeksi", _sema_v6_iso_tarihler),
+    (7, "belge arşiv paketleri", _sema_v7_belge_paketleri),
+    (8, "sıralama indeksleri", _sema_v8_siralama_indeksleri),
+    (9, "kayıtlı sorgular", _sema_v9_kayitli_sorgular),
+    (10, "büyük/küçük harf duyarsız barkod indeksi", _sema_v10_barkod_buyuk_harf_indeksi),
+    (11, "yerleşik SQL ile arama indeksi tetikleyicileri", _sema_v11_sql_arama_tetikleyicileri),
+]
+
+# Form açılır listelerinde sunulan değerler (veritabanı serbest metin de kabul eder)
+CIHAZ_TIPLERI = ["Laptop", "SIM Kart", "Tablet", "El Terminali", "Masaüstü Bilgisayar", "PC Monitör", "Mobil Yazıcı",
+                 "PC Yazıcı", "UPS"]
+CIHAZ_DURUMLARI = ["Serviste", "Servise Gönderildi", "Tamir edildi", "Tamir olmuyor", "Hurda"]
+
+# Liste sorgularının döndürdüğü sütunlar; son sütun belge sayısıdır
+CIHAZ_SUTUNLARI = ["id", "barkod_no", "bolge", "personel_ad_soyad", "personel_sicil_no", "cihaz_tipi",
+                   "cihaz_seri_no", "servis_gonderim_tarihi", "servis_gelme_tarihi", "cihaz_durumu",
+                   "aciklama", "belge_sayisi"]
+CIHAZ_SECIMI = ", ".join(CIHAZ_SUTUNLARI)
+# Kullanıcının girdiği alanlar (id ve belge sayısı hariç)
+KAYIT_ALANLARI = CIHAZ_SUTUNLARI[1:11]
+TARIH_ALANLARI = ("servis_gonderim_tarihi", "servis_gelme_tarihi")
+
+# Henüz geri gelmemiş kayıt
+ACIK_KAYIT = "servis_gelme_tarihi = ''"
+
+# Girdi tarihi (ISO ya da gg.aa.yyyy) saklama biçimine çevirir; geçersizse ValueError. Aynı tarihler toplu
+# içe aktarmada binlerce kez tekrarlandığı için sonuçlar önbelleklenir.
+@functools.lru_cache(maxsize=4096)
+def tarih_iso(metin):
+    metin = metin.strip()
+    if not metin:
+        return ""
+    if len(metin) == 10 and metin[4] == "-":
+        return datetime.date.fromisoformat(metin).isoformat()
+    return datetime.datetime.strptime(metin, TARIH_BICIMI).date().isoformat()
+
+# Yazılacak kaydın değerleri KAYIT_ALANLARI sırasıyla; tarihler saklama biçimine çevrilir, boş alanlar "" olur
+def kayit_degerleri(veriler):
+    return tuple(tarih_iso(veriler[alan] or "") if alan in TARIH_ALANLARI else (veriler[alan] or "")
+                 for alan in KAYIT_ALANLARI)
+
+# Kayıt formu ve içe aktarma için ortak kurallar; hata mesajı ya da None döndürür
+def kaydi_dogrula(veriler, barkod_zorunlu=True):
+    if barkod_zorunlu and not veriler.get("barkod_no"):
+        return "Barkod No zorunludur!"
+    if veriler.get("personel_sicil_no") and not SICIL_NO_DESENI.match(veriler["personel_sicil_no"]):
+        return "Personel Sicil No en az 5 rakam olmalı!"
+    try:
+        gonderim = tarih_iso(veriler.get("servis_gonderim_tarihi") or "")
+        gelme = tarih_iso(veriler.get("servis_gelme_tarihi") or "")
+    except ValueError as e:
+        return f"Tarih formatı hatalı: {e}"
+    if gonderim and gelme and gonderim > gelme:
+        return "Gönderim tarihi, gelme tarihinden sonra olamaz!"
+    return None
+
+# Tarih aralığı filtreleri (sınırlar dahil, boş tarihler hariç); değerler ISO ya da gg.aa.yyyy olabilir.
+# "acik_gun_ustu": N ise gönderilmesinin üzerinden N günden fazla geçmiş ve henüz gelmemiş kayıtlar seçilir.
+TARIH_FILTRELERI = {
+    "gonderim_baslangic": "servis_gonderim_tarihi >= ?",
+    "gonderim_bitis": "servis_gonderim_tarihi > '' AND servis_gonderim_tarihi <= ?",
+    "gelme_baslangic": "servis_gelme_tarihi >= ?",
+    "gelme_bitis": "servis_gelme_tarihi > '' AND servis_gelme_tarihi <= ?",
+}
+
+# Sorgu oluşturucu: filtreler["sorgu"] bir koşul ağacıdır ve diğer filtrelerle VE'lenir. Düğümler
+# {"ve": [...]}, {"veya": [...]} ya da {"alan": sütun, "islem": işlem, "deger": değer} biçimindedir (JSON olarak
+# saklanabilir). İşlemler: "=", "!=", "onek" (ile başlar), "icerir" (Türkçe büyük/küçük harf duyarsız),
+# "icinde" (liste), "aralik" ([alt, üst]; boş sınır uygulanmaz), "bos", "dolu". Sayı alanlarında bos/dolu 0 ile
+# karşılaştırır: belge_sayisi "dolu" belgesi olan kayıtlardır. Tarihler ISO ya da gg.aa.yyyy verilebilir.
+SORGU_ALANLARI = {
+    "id": "sayi", "barkod_no": "metin", "bolge": "metin", "personel_ad_soyad": "metin", "personel_sicil_no": "metin",
+    "cihaz_tipi": "metin", "cihaz_seri_no": "metin", "servis_gonderim_tarihi": "tarih", "servis_gelme_tarihi": "tarih",
+    "cihaz_durumu": "metin", "aciklama": "metin", "belge_sayisi": "sayi",
+}
+SORGU_ISLEMLERI = {
+    "metin": ("=", "!=", "onek", "icerir", "icinde", "aralik", "bos", "dolu"),
+    "tarih": ("=", "!=", "onek", "icinde", "aralik", "bos", "dolu"),
+    "sayi": ("=", "!=", "icinde", "aralik", "bos", "dolu"),
+}
+SORGU_LISTE_SINIRI = 1024  # "icinde" listesinde en fazla değer
+
+
+def _sorgu_degeri(tur, deger):
+    if tur == "sayi":
+        try:
+            return int(deger)
+        except (TypeError, ValueError):
+            raise ValueError(f"Sayı bekleniyordu: {deger!r}") from None
+    deger = "" if deger is None else str(deger).strip()
+    return tarih_iso(deger) if tur == "tarih" else deger
+
+
+# "icinde" listesi bir sonraki ikinin kuvvetine son değerle doldurulur: SQL metni değer sayısına değil yalnızca
+# ağacın biçimine bağlı kalır ve sqlite3'ün hazır deyim önbelleğinden tekrar kullanılır
+def _liste_kosulu(sutun, degerler):
+    uzunluk = 1 << (len(degerler) - 1).bit_length()
+    return f"{sutun} IN ({', '.join('?' * uzunluk)})", degerler + degerler[-1:] * (uzunluk - len(degerler))
+
+
+# Koşullar indeks kullanabilecek biçimde üretilir: önek ve dolu birer aralık, liste IN olur; sütunlar bir
+# fonksiyona sarılmaz. Yalnızca "!=" ve "icerir" indekssizdir. Boş grup ya da değeri boş koşul için None döner
+# (koşul uygulanmaz); boş "icinde" listesi ise hiçbir kayıtla eşleşmez.
+def sorgu_derle(dugum):
+    if not isinstance(dugum, dict):
+        raise ValueError(f"Geçersiz sorgu düğümü: {dugum!r}")
+    for baglac, sql_baglac in (("ve", " AND "), ("veya", " OR ")):
+        if baglac in dugum:
+            parcalar, params = [], []
+            for alt in dugum[baglac]:
+                derlenen = sorgu_derle(alt)
+                if derlenen:
+                    parcalar.append(derlenen[0])
+                    params += derlenen[1]
+            if not parcalar:
+                return None
+            return (parcalar[0] if len(parcalar) == 1 else f"({sql_baglac.join(parcalar)})"), params
+    alan, islem, deger = dugum.get("alan"), dugum.get("islem"), dugum.get("deger")
+    if alan not in SORGU_ALANLARI:
+        raise ValueError(f"Sorgulanamayan alan: {alan}")
+    tur = SORGU_ALANLARI[alan]
+    if islem not in SORGU_ISLEMLERI[tur]:
+        raise ValueError(f"{alan} için geçersiz işlem: {islem}")
+    bos = 0 if tur == "sayi" else ""
+    if islem == "bos":
+        return f"({alan} = ? OR {alan} IS NULL)", [bos]  # eski kayıtlarda boş alan NULL olabilir
+    if islem == "dolu":
+        return f"{alan} > ?", [bos]
+    if islem == "icinde":
+        if not isinstance(deger, list):
+            raise ValueError(f"{alan} için 'icinde' değeri bir liste olmalı: {deger!r}")
+        degerler = [_sorgu_degeri(tur, d) for d in deger]
+        if not degerler:
+            return "1 = 0", []  # boş liste hiçbir kayıtla eşleşmez (IN () gibi)
+        if len(degerler) > SORGU_LISTE_SINIRI:
+            raise ValueError(f"Listede en fazla {SORGU_LISTE_SINIRI} değer olabilir")
+        return _liste_kosulu(alan, degerler)
+    if islem == "aralik":
+        if not isinstance(deger, list) or len(deger) != 2:
+            raise ValueError(f"{alan} için 'aralik' değeri [alt, üst] biçiminde olmalı: {deger!r}")
+        alt, ust = deger
+        kosullar, params = [], []
+        if alt not in (None, ""):
+            kosullar.append(f"{alan} >= ?")
+            params.append(_sorgu_degeri(tur, alt))
+        if ust not in (None, ""):
+            if tur == "tarih" and not kosullar:
+                kosullar.append(f"{alan} > ''")  # boş (henüz gelmemiş) tarih üst sınırdan küçük sayılmaz
+            kosullar.append(f"{alan} <= ?")
+            params.append(_sorgu_degeri(tur, ust))
+        return (f"({' AND '.join(kosullar)})", params) if kosullar else None
+    if islem == "onek":
+        onek = "" if deger is None else str(deger).strip()
+        return (f"({alan} >= ? AND {alan} < ?)", list(on_ek_araligi(onek))) if onek else None
+    if islem == "icerir":  # Diğer metin aramaları gibi Türkçe büyük/küçük harf duyarsız; indekssizdir
+        metin = "" if deger is None else turkce_normalize(str(deger).strip())
+        kacisli = metin.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return (f"turkce_normalize({alan}) LIKE ? ESCAPE '\\'", [f"%{kacisli}%"]) if metin else None
+    if islem == "!=":
+        return f"IFNULL({alan}, ?) <> ?", [bos, _sorgu_degeri(tur, deger)]
+    return f"{alan} = ?", [_sorgu_degeri(tur, deger)]
+
+# Liste sıralaması: sütun -> (ORDER BY anahtarı, indeks); eşitlikte id eklenir. Anahtar indeksle aynı sıradadır
+# (indeks satırları eşitlikte rowid sırasındadır); gelme tarihi bileşik (gelme, gönderim) indeksine göre sıralanır.
+# id sırası tablonun kendi sırasıdır. Açıklama serbest metin olduğu için sıralanmaz.
+SIRALAMA_SUTUNLARI = {
+    "id": ((), None),
+    "barkod_no": (("barkod_no",), "idx_cihazlar_barkod_no"),
+    "bolge": (("bolge",), "idx_cihazlar_bolge"),
+    "personel_ad_soyad": (("personel_ad_soyad",), "idx_cihazlar_personel_ad_soyad"),
+    "personel_sicil_no": (("personel_sicil_no",), "idx_cihazlar_personel_sicil_no"),
+    "cihaz_tipi": (("cihaz_tipi",), "idx_cihazlar_cihaz_tipi"),
+    "cihaz_seri_no": (("cihaz_seri_no",), "idx_cihazlar_cihaz_seri_no"),
+    "servis_gonderim_tarihi": (("servis_gonderim_tarihi",), "idx_cihazlar_gonderim_tarihi"),
+    "servis_gelme_tarihi": (("servis_gelme_tarihi", "servis_gonderim_tarihi"), "idx_cihazlar_gelme_gonderim"),
+    "cihaz_durumu": (("cihaz_durumu",), "idx_cihazlar_cihaz_durumu"),
+    "belge_sayisi": (("belge_sayisi",), "idx_cihazlar_belge_sayisi"),
+}
+
+# Filtreli sıralı listede sıralama indeksinin baştan bu kadar satırı yoklanır (bkz. _sirali_liste_sorgusu)
+SIRALI_TARAMA_ORNEGI = 2000
+
+# siralama (sütun, azalan) biçimindedir (JSON'dan gelen liste de olur); (anahtar sütunları, indeks, azalan) döndürür
+def siralama_anahtari(siralama):
+    sutun, azalan = siralama
+    if sutun not in SIRALAMA_SUTUNLARI:
+        raise ValueError(f"Bu sütuna göre sıralanamaz: {sutun}")
+    anahtar, indeks = SIRALAMA_SUTUNLARI[sutun]
+    return anahtar, indeks, bool(azalan)
+
+# Tutarlılık taraması iş parçacıklarında kendi salt okunur bağlantılarıyla da çalıştırılır (bkz. servis_tutarlilik)
+BLOB_DILIMI_SORGUSU = '''
+    SELECT b.anahtar, b.boyut, b.referans_sayisi,
+           EXISTS (SELECT 1 FROM paket_girdileri p WHERE p.anahtar = b.anahtar)
+    FROM blobler b WHERE b.anahtar >= ? AND b.anahtar < ?
+'''
+
+# İndeks kullanması gereken sorgular: EXPLAIN QUERY PLAN ile doğrulanır (bkz. check_query_plans). Burada yalnızca
+# SQL'i metot içinde sabit olanlar durur; filtreler ve sıralamalar gerçek sorgu üreticilerinden alınır.
+INDEKSLI_SORGULAR = {
+    "fetch_cihaz_by_id": ("SELECT * FROM cihazlar WHERE id = ?", (1,)),
+    "fetch_cihazlar_by_barkod": ("SELECT * FROM cihazlar WHERE barkod_no = ?", ("",)),
+    "canli_arama_barkod": ("SELECT id FROM cihazlar WHERE upper(barkod_no) >= ? AND upper(barkod_no) < ? LIMIT ?",
+                           on_ek_araligi("BRK") + (CANLI_ARAMA_SINIRI + 1,)),
+    "belgeler_cihaz_id": ("SELECT dosya_yolu FROM belgeler WHERE cihaz_id = ?", (1,)),
+    "sahipsiz_bloblar": ("SELECT anahtar FROM blobler WHERE referans_sayisi = 0", ()),
+    "blob_dilimi": (BLOB_DILIMI_SORGUSU, ("ab", "ac")),
+    "belgeler_blob_anahtar": ("SELECT cihaz_id FROM belgeler WHERE blob_anahtar = ?", ("",)),
+}
+
+# advanced_search ile (ana listeyle aynı _filtre_kosullari'ndan) üretilip indeks kullanması gereken filtreler
+INDEKSLI_FILTRELER = {
+    "durum": {"cihaz_durumu": "Serviste"},
+    "barkod_on_eki": {"barkod_on_eki": "BRK"},
+    "gonderim_araligi": {"gonderim_baslangic": "2024-01-01", "gonderim_bitis": "2024-01-31"},
+    "gelme_araligi": {"gelme_baslangic": "2024-01-01", "gelme_bitis": "2024-01-31"},
+    "acik_kayitlar": {"acik_gun_ustu": 30},
+    "sorgu_sicil_no": {"sorgu": {"alan": "personel_sicil_no", "islem": "=", "deger": "12345"}},
+    "sorgu_icinde": {"sorgu": {"alan": "personel_sicil_no", "islem": "icinde", "deger": ["12345", "67890"]}},
+    "sorgu_onek": {"sorgu": {"alan": "bolge", "islem": "onek", "deger": "Ank"}},
+    "sorgu_belgeli": {"sorgu": {"alan": "belge_sayisi", "islem": "dolu"}},
+    "sorgu_veya": {"sorgu": {"veya": [{"alan": "cihaz_durumu", "islem": "=", "deger": "Hurda"},
+                                      {"alan": "cihaz_seri_no", "islem": "onek", "deger": "SN1"}]}},
+}
+
+# Süre dağılımı: milisaniye değerleri logaritmik kovalarda (her kova bir öncekinin 2^(1/8) katı, ~%9) sayılır,
+# böylece bellek ölçüm sayısından bağımsızdır. Yüzdelikler kovanın üst sınırıdır (en büyük değerle kırpılır).
+class SureDagilimi:
+    KOVA_ORANI = 2 ** 0.125
+
+    def __init__(self):
+        self.kovalar = {}
+        self.sayi = 0
+        self.toplam = 0.0
+        self.en_buyuk = 0.0
+
+    def ekle(self, ms):
+        kova = math.floor(math.log(max(ms, 0.001), self.KOVA_ORANI))
+        self.kovalar[kova] = self.kovalar.get(kova, 0) + 1
+        self.sayi += 1
+        self.toplam += ms
+        self.en_buyuk = max(self.en_buyuk, ms)
+
+    def yuzdelik(self, oran):
+        sira = max(1, math.ceil(oran * self.sayi))
+        birikimli = 0
+        for kova in sorted(self.kovalar):
+            birikimli += self.kovalar[kova]
+            if birikimli >= sira:
+                return min(self.KOVA_ORANI ** (kova + 1), self.en_buyuk)
+        return self.en_buyuk
+
+    def ozet(self):
+        return {"sayi": self.sayi, "toplam_ms": round(self.toplam, 3),
+                "ortalama_ms": round(self.toplam / self.sayi, 3) if self.sayi else None,
+                "p50_ms": round(self.yuzdelik(0.5), 3), "p95_ms": round(self.yuzdelik(0.95), 3),
+                "p99_ms": round(self.yuzdelik(0.99), 3), "en_buyuk_ms": round(self.en_buyuk, 3)}
+
+
+# Süreç genelindeki ölçümler; veritabanı, dosya ve arayüz iş parçacıklarından birlikte yazıldığı için kilitlidir.
+# Kapalıyken ölçüm noktaları yalnızca `etkin` bayrağına bakar.
+class Olcumler:
+    YAVAS_SORGU_LISTESI = 200
+
+    def __init__(self):
+        self.etkin = False
+        self.yavas_sorgu_ms = DEFAULT_SETTINGS["olcum"]["yavas_sorgu_ms"]
+        self._kilit = threading.Lock()
+        self.dagilimlar = {}
+        self.yavas_sorgular = deque(maxlen=self.YAVAS_SORGU_LISTESI)
+        self.baslangic = datetime.datetime.now()
+
+    def yapilandir(self):
+        ayar = {**DEFAULT_SETTINGS["olcum"], **settings.get("olcum", {})}
+        self.etkin = bool(ayar["etkin"])
+        self.yavas_sorgu_ms = float(ayar["yavas_sorgu_ms"])
+
+    def kaydet(self, ad, ms):
+        with self._kilit:
+            dagilim = self.dagilimlar.get(ad)
+            if dagilim is None:
+                dagilim = self.dagilimlar[ad] = SureDagilimi()
+            dagilim.ekle(ms)
+
+    def yavas_sorgu(self, sql, params, ms, plan):
+        kayit = {"zaman": datetime.datetime.now().isoformat(timespec="seconds"), "sure_ms": round(ms, 3),
+                 "sql": " ".join(sql.split()), "params": [str(p)[:100] for p in params][:20], "plan": plan}
+        with self._kilit:
+            self.yavas_sorgular.append(kayit)
+        log.warning("Yavaş sorgu (%.1f ms): %s", ms, kayit["sql"], extra={"sure_ms": kayit["sure_ms"], "plan": plan})
+
+    def sifirla(self):
+        with self._kilit:
+            self.dagilimlar.clear()
+            self.yavas_sorgular.clear()
+            self.baslangic = datetime.datetime.now()
+
+    def ozet(self):
+        with self._kilit:
+            return {"baslangic": self.baslangic.isoformat(timespec="seconds"),
+                    "tarih": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "etkin": self.etkin, "yavas_sorgu_ms": self.yavas_sorgu_ms,
+                    "olcumler": {ad: d.ozet() for ad, d in sorted(self.dagilimlar.items())},
+                    "yavas_sorgular": list(self.yavas_sorgular)}
+
+    def json_yaz(self, dosya_yolu):
+        with open(dosya_yolu, "w", encoding="utf-8") as f:
+            json.dump(self.ozet(), f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+
+olcumler = Olcumler()
+
+
+def _sureyi_olc(ad, islev):
+    if inspect.isgeneratorfunction(islev):
+        # Üreteçlerde süre, üretecin tüketilmesi bitene (ya da kapatılana) kadar ölçülür
+        @functools.wraps(islev)
+        def sarici(*args, **kwargs):
+            if not olcumler.etkin:
+                return (yield from islev(*args, **kwargs))
+            t0 = time.perf_counter()
+            try:
+                return (yield from islev(*args, **kwargs))
+            finally:
+                olcumler.kaydet(ad, (time.perf_counter() - t0) * 1000)
+    else:
+        @functools.wraps(islev)
+        def sarici(*args, **kwargs):
+            if not olcumler.etkin:
+                return islev(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return islev(*args, **kwargs)
+            finally:
+                olcumler.kaydet(ad, (time.perf_counter() - t0) * 1000)
+    return sarici
+
+
+# Metot/fonksiyon süresini olcumler'e "ad" ile ekleyen dekoratör (ör. @olculen("arayuz.cihaz_kaydet"))
+def olculen(ad):
+    return lambda islev: _sureyi_olc(ad, islev)
+
+
+# Sınıfın tüm açık metotlarını (ve __init__) "Sinif.metot" adıyla ölçer
+def metotlari_olc(sinif):
+    for ad, deger in list(vars(sinif).items()):
+        if inspect.isfunction(deger) and (not ad.startswith("_") or ad == "__init__"):
+            setattr(sinif, ad, _sureyi_olc(f"{sinif.__name__}.{ad}", deger))
+    return sinif
+
+
+# SQL deyimlerinin süresi imleç düzeyinde ölçülür (deyimin ilk satırı hazır olana kadar; GROUP BY/ORDER BY gibi
+# işin çoğunu baştan yapan sorgularda toplam süreye yakındır). Eşiği aşan deyimin planı aynı bağlantıda ayrı bir
+# imleçle EXPLAIN QUERY PLAN ile alınır.
+class OlculenImlec(sqlite3.Cursor):
+    PLANLI_DEYIMLER = {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE"}
+
+    def execute(self, sql, params=()):
+        if not olcumler.etkin:
+            return super().execute(sql, params)
+        t0 = time.perf_counter()
+        sonuc = super().execute(sql, params)
+        ms = (time.perf_counter() - t0) * 1000
+        olcumler.kaydet("sql", ms)
+        if ms >= olcumler.yavas_sorgu_ms:
+            olcumler.yavas_sorgu(sql, params, ms, self._sorgu_plani(sql, params))
+        return sonuc
+
+    def executemany(self, sql, params):
+        if not olcumler.etkin:
+            return super().executemany(sql, params)
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, params)
+        finally:
+            olcumler.kaydet("sql.executemany", (time.perf_counter() - t0) * 1000)
+
+    def _sorgu_plani(self, sql, params):
+        ilk = sql.split(None, 1)
+        if not ilk or ilk[0].upper() not in self.PLANLI_DEYIMLER:
+            return []
+        imlec = sqlite3.Cursor(self.connection)
+        try:
+            imlec.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return [satir[-1] for satir in imlec.fetchall()]
+        except sqlite3.Error as e:
+            return [f"plan alınamadı: {e}"]
+        finally:
+            imlec.close()
+
+
+class OlculenBaglanti(sqlite3.Connection):
+    def cursor(self, factory=OlculenImlec):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+# Çözülmüş kayıtların (belge listesiyle birlikte) id'ye göre LRU önbelleği; barkod aramaları id listesi olarak
+# saklanır ve ancak listedeki tüm kayıtlar önbellekteyse isabet sayılır. Böylece bir kaydın düşürülmesi
+# (güncelleme, silme, LRU'dan çıkma) onu içeren barkod sonuçlarını da kendiliğinden geçersiz kılar.
+class KayitOnbellegi:
+    def __init__(self, boyut=KAYIT_ONBELLEGI_BOYUTU):
+        self.boyut = boyut
+        self.kayitlar = OrderedDict()
+        self.barkodlar = OrderedDict()
+        self.isabet = 0
+        self.iska = 0
+
+    def al(self, id):
+        cihaz = self.kayitlar.get(id)
+        if cihaz is None:
+            self.iska += 1
+            return None
+        self.kayitlar.move_to_end(id)
+        self.isabet += 1
+        return cihaz
+
+    def barkod_al(self, barkod_no):
+        idler = self.barkodlar.get(barkod_no)
+        if idler is None or any(id not in self.kayitlar for id in idler):
+            self.iska += 1
+            return None
+        self.barkodlar.move_to_end(barkod_no)
+        for id in idler:
+            self.kayitlar.move_to_end(id)
+        self.isabet += 1
+        return [self.kayitlar[id] for id in idler]
+
+    def koy(self, cihaz):
+        self.kayitlar[cihaz[0]] = cihaz
+        self.kayitlar.move_to_end(cihaz[0])
+        while len(self.kayitlar) > self.boyut:
+            self.kayitlar.popitem(last=False)
+
+    def barkod_koy(self, barkod_no, cihazlar):
+        for cihaz in cihazlar:
+            self.koy(cihaz)
+        self.barkodlar[barkod_no] = tuple(cihaz[0] for cihaz in cihazlar)
+        self.barkodlar.move_to_end(barkod_no)
+        while len(self.barkodlar) > self.boyut:
+            self.barkodlar.popitem(last=False)
+
+    def dusur(self, id=None, barkod_no=None):
+        if id is not None:
+            self.kayitlar.pop(id, None)
+        if barkod_no is not None:
+            self.barkodlar.pop(barkod_no, None)
+
+    def temizle(self):
+        self.kayitlar.clear()
+        self.barkodlar.clear()
+
+    def istatistik(self):
+        toplam = self.isabet + self.iska
+        return {"isabet": self.isabet, "iska": self.iska, "isabet_orani": self.isabet / toplam if toplam else 0.0,
+                "kayit": len(self.kayitlar), "barkod": len(self.barkodlar), "boyut": self.boyut}
+
+def _mesgul_hatasi(e):
+    return isinstance(e, sqlite3.OperationalError) and ("locked" in str(e) or "busy" in str(e))
+
+class DatabaseManager:
+    def __init__(self, db_name=VARSAYILAN_VERITABANI, profil=None):
+        self.db_name = db_name
+        self.profil = {**DEFAULT_SETTINGS["veritabani"], **settings.get("veritabani", {}), **(profil or {})}
+        self.conn = sqlite3.connect(db_name, timeout=self.profil["busy_timeout"] / 1000, factory=OlculenBaglanti,
+                                    cached_statements=HAZIR_DEYIM_ONBELLEGI)
+        # Arama tetikleyicileri artık buna ihtiyaç duymaz (v11); v11 öncesi şemaları taşırken eski tetikleyiciler çağırır
+        self.conn.create_function("turkce_normalize", 1, turkce_normalize, deterministic=True)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.cursor = self.conn.cursor()
+        self.baglanti_profilini_uygula()
+        self.create_tables()
+        self.onbellek = KayitOnbellegi()
+        self._veri_surumu = self._veri_surumunu_oku()
+        self.degisiklik_dinleyicileri = []
+
+    # Değişiklik olayları: dinleyiciler (tur, id, satir) ile çağrılır. tur "ekle", "guncelle", "sil" ya da
+    # "toplu" (çok sayıda kayıt eklendi; id ve satir None) olur. satir liste sorgularıyla aynı biçimdedir
+    # (son sütun belge sayısı), böylece görünüm yalnızca etkilenen satırı yeniden sorgulamadan yamayabilir.
+    def _degisiklik_bildir(self, tur, id=None):
+        if not self.degisiklik_dinleyicileri:
+            return
+        satir = None
+        if tur in ("ekle", "guncelle"):
+            self.cursor.execute(f"SELECT {CIHAZ_SECIMI} FROM cihazlar WHERE id = ?", (id,))
+            satir = self.cursor.fetchone()
+            if satir is None:
+                return
+        for dinleyici in self.degisiklik_dinleyicileri:
+            dinleyici(tur, id, satir)
+
+    # data_version yalnızca başka bağlantıların (diğer süreçler, dışa/içe aktarma bağlantıları) yazmasıyla değişir;
+    # değiştiyse önbellekteki hiçbir kayda güvenilemez. Bu bağlantının kendi yazmaları hedefli olarak düşürülür.
+    def _veri_surumunu_oku(self):
+        self.cursor.execute("PRAGMA data_version")
+        return self.cursor.fetchone()[0]
+
+    def _onbellegi_dogrula(self):
+        surum = self._veri_surumunu_oku()
+        if surum != self._veri_surumu:
+            self._veri_surumu = surum
+            self.onbellek.temizle()
+
+    def onbellek_istatistikleri(self):
+        return self.onbellek.istatistik()
+
+    # PRAGMA değerleri parametre olarak verilemediği için ayar dosyasından gelenler önce doğrulanır
+    def baglanti_profilini_uygula(self):
+        journal_mode = str(self.profil["journal_mode"]).upper()
+        synchronous = str(self.profil["synchronous"]).upper()
+        if journal_mode not in JOURNAL_KIPLERI:
+            raise ValueError(f"Geçersiz journal_mode: {self.profil['journal_mode']}")
+        if synchronous not in SYNCHRONOUS_KIPLERI:
+            raise ValueError(f"Geçersiz synchronous: {self.profil['synchronous']}")
+        self.cursor.execute(f"PRAGMA busy_timeout = {int(self.profil['busy_timeout'])}")
+        self.cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+        etkin_kip = self.cursor.fetchone()[0]
+        if etkin_kip.upper() != journal_mode:
+            log.warning("journal_mode %s uygulanamadı, etkin kip: %s", journal_mode, etkin_kip)
+        self.cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        self.cursor.execute(f"PRAGMA cache_size = {int(self.profil['cache_size'])}")
+        self.cursor.execute(f"PRAGMA mmap_size = {int(self.profil['mmap_size'])}")
+
+    # Yazma işlemleri BEGIN IMMEDIATE ile kısa tutulur: yazma kilidi baştan alınır, böylece okuma-sonra-yazma
+    # yükseltmesinde kilitlenme olmaz. Kilit busy_timeout içinde alınamazsa işlem geri alınıp yeniden denenir.
+    def _yazma_islemi(self, islem):
+        bekleme = MESGUL_ILK_BEKLEME
+        for deneme in range(1, MESGUL_DENEME_SAYISI + 1):
+            try:
+                self.cursor.execute("BEGIN IMMEDIATE")
+                sonuc = islem()
+                self.conn.commit()
+                return sonuc
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                if not _mesgul_hatasi(e) or deneme == MESGUL_DENEME_SAYISI:
+                    raise
+                log.warning("Veritabanı meşgul, yeniden deneniyor (%d/%d): %s", deneme, MESGUL_DENEME_SAYISI, e)
+                time.sleep(bekleme * (1 + random.random()))
+                bekleme *= 2
+
+    def create_tables(self):
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sema_surumu (
+                surum INTEGER PRIMARY KEY,
+                aciklama TEXT,
+                uygulanma_tarihi TEXT
+            )
+        ''')
+        self.conn.commit()
+        self.migrate()
+
+    def schema_version(self):
+        self.cursor.execute("SELECT COALESCE(MAX(surum), 0) FROM sema_surumu")
+        return self.cursor.fetchone()[0]
+
+    def migrate(self):
+        mevcut_surum = self.schema_version()
+        for surum, aciklama, adim in MIGRATIONS:
+            if surum <= mevcut_surum:
+                continue
+            try:
+                self.cursor.execute("BEGIN IMMEDIATE")
+                # Başka bir istemci aynı anda başlatıldıysa geçişi kilidi almadan önce uygulamış olabilir
+                if self.schema_version() >= surum:
+                    self.conn.rollback()
+                    continue
+                adim(self.cursor)
+                self.cursor.execute("INSERT INTO sema_surumu (surum, aciklama, uygulanma_tarihi) VALUES (?, ?, ?)",
+                                    (surum, aciklama, datetime.datetime.now().isoformat(timespec="seconds")))
+                self.conn.commit()
+                log.info("Şema sürümü %d uygulandı: %s", surum, aciklama)
+            except sqlite3.Error as e:
+                self.conn.rollback()
+                log.error("Şema geçiş hatası (sürüm %d): %s", surum, e)
+                raise
+
+    # Sabit sorgular, INDEKSLI_FILTRELER'in advanced_search sorguları ve her sıralanabilir sütunun iki yöndeki ilk ve
+    # sonraki sayfası (fetch_page'in sorgusu) denetlenir. Sıralı sayfalar ayrıca geçici B-ağacında sıralanmamalıdır.
+    # İlk sorunda AssertionError; yoksa ad -> plan satırları döner.
+    def check_query_plans(self):
+        sorgular = [(ad, sorgu, params, False) for ad, (sorgu, params) in INDEKSLI_SORGULAR.items()]
+        for ad, filtreler in INDEKSLI_FILTRELER.items():
+            sorgular.append((f"advanced_search_{ad}", *self._arama_sorgusu(filtreler), False))
+        for sutun, (anahtar, _) in SIRALAMA_SUTUNLARI.items():
+            if not anahtar:
+                continue
+            for azalan in (False, True):
+                ad = f"siralama_{sutun}{'_azalan' if azalan else ''}"
+                for ek, son in (("", None), ("_sonraki", ("",) * len(anahtar) + (0,))):
+                    sorgu, params = self._liste_sorgusu(son, siralama=(sutun, azalan))
+                    sorgular.append((ad + ek, sorgu + " LIMIT ?", params + [SAYFA_BOYUTU], True))
+        planlar = {}
+        for ad, sorgu, params, sirali in sorgular:
+            self.cursor.execute(f"EXPLAIN QUERY PLAN {sorgu}", params)
+            detaylar = [row[-1] for row in self.cursor.fetchall()]
+            planlar[ad] = detaylar
+            if not any("USING INDEX" in d or "USING COVERING INDEX" in d or "USING INTEGER PRIMARY KEY" in d
+                       for d in detaylar):
+                raise AssertionError(f"{ad} sorgusu indeks kullanmıyor: {'; '.join(detaylar)}")
+            if sirali and any("TEMP B-TREE" in d for d in detaylar):
+                raise AssertionError(f"{ad} sorgusu indeksten sıralı okunmuyor: {'; '.join(detaylar)}")
+        return planlar
+
+    def insert_cihaz(self, veriler):
+        def ekle():
+            self.cursor.execute('''
+                INSERT INTO cihazlar (
+                    barkod_no, bolge, personel_ad_soyad, personel_sicil_no, 
+                    cihaz_tipi, cihaz_seri_no, servis_gonderim_tarihi, 
+                    servis_gelme_tarihi, cihaz_durumu, aciklama
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', kayit_degerleri(veriler))
+            cihaz_id = self.cursor.lastrowid
+            self._belgeleri_ekle(cihaz_id, veriler.get("cihaz_belgeleri") or [])
+            return cihaz_id
+
+        try:
+            cihaz_id = self._yazma_islemi(ekle)
+            self.onbellek.dusur(barkod_no=veriler["barkod_no"])
+            self._degisiklik_bildir("ekle", cihaz_id)
+            log.info("Cihaz kaydedildi: %s (Tarih: %s)", veriler["barkod_no"], veriler["servis_gonderim_tarihi"],
+                     extra={"cihaz_id": cihaz_id})
+            return cihaz_id
+        except sqlite3.Error as e:
+            log.error("Veritabanı hatası (insert_cihaz): %s", e)
+            return False
+
+    # veriler["yeni_belgeler"] verilirse aynı işlemde kayda eklenir; mevcut belgelere dokunulmaz
+    def update_cihaz(self, veriler, id):
+        def guncelle():
+            self.cursor.execute('''
+                UPDATE cihazlar SET 
+                    barkod_no = ?, bolge = ?, personel_ad_soyad = ?, personel_sicil_no = ?, 
+                    cihaz_tipi = ?, cihaz_seri_no = ?, servis_gonderim_tarihi = ?, 
+                    servis_gelme_tarihi = ?, cihaz_durumu = ?, aciklama = ?
+                WHERE id = ?
+            ''', kayit_degerleri(veriler) + (id,))
+            self._belgeleri_ekle(id, veriler.get("yeni_belgeler") or [])
+
+        try:
+            self._yazma_islemi(guncelle)
+            self.onbellek.dusur(id, veriler["barkod_no"])
+            self._degisiklik_bildir("guncelle", id)
+            log.info("Cihaz güncellendi: ID %s", id, extra={"cihaz_id": id})
+            return True
+        except sqlite3.Error as e:
+            log.error("Güncelleme hatası (update_cihaz): %s", e, extra={"cihaz_id": id})
+            return False
+
+    # Belgeler BelgeDeposu.ekle sözlükleridir; blob kaydı yoksa oluşturulur, referans sayısını tetikleyici artırır
+    def _belgeleri_ekle(self, cihaz_id, belgeler):
+        self.cursor.executemany("INSERT OR IGNORE INTO blobler (anahtar, boyut) VALUES (?, ?)",
+                                [(b["blob_anahtar"], b["boyut"]) for b in belgeler])
+        self.cursor.executemany("INSERT INTO belgeler (cihaz_id, dosya_yolu, blob_anahtar, dosya_adi) VALUES (?, ?, ?, ?)",
+                                [(cihaz_id, b["dosya_yolu"], b["blob_anahtar"], b["dosya_adi"]) for b in belgeler])
+
+    # Toplu ekleme: tüm kayıtlar tek işlemde executemany ile yazılır; hata durumunda hiçbiri yazılmaz.
+    # Satır başına çalışan arama indeksi tetikleyicisi işlem süresince kaldırılır ve indeks yeni id aralığı için
+    # tek bir INSERT ... SELECT ile doldurulur; tetikleyici aynı işlemde geri oluşturulduğundan dışarıdan görünmez.
+    def insert_cihazlar_toplu(self, kayitlar):
+        return self.insert_degerler_toplu([kayit_degerleri(kayit) for kayit in kayitlar])
+
+    # degerler: kayit_degerleri biçiminde (KAYIT_ALANLARI sırasıyla, tarihler ISO) satırlar; içe aktarma bunları
+    # doğrudan dosya sütunlarından kurar
+    def insert_degerler_toplu(self, degerler):
+        def ekle():
+            self.cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'cihazlar_fts_ai'")
+            tetikleyici = self.cursor.fetchone()[0]
+            self.cursor.execute("SELECT COALESCE(MAX(id), 0) FROM cihazlar")
+            son_id = self.cursor.fetchone()[0]
+            self.cursor.execute("DROP TRIGGER cihazlar_fts_ai")
+            self.cursor.executemany(f"INSERT INTO cihazlar ({', '.join(KAYIT_ALANLARI)}) VALUES ({', '.join('?' * len(KAYIT_ALANLARI))})",
+                                    degerler)
+            self.cursor.execute(f'''
+                INSERT INTO cihazlar_fts (rowid, {", ".join(FTS_SUTUNLARI)})
+                SELECT id, {", ".join(_fts_metni(s) for s in FTS_SUTUNLARI)} FROM cihazlar WHERE id > ?
+            ''', (son_id,))
+            self.cursor.execute(tetikleyici)
+            return len(degerler)
+
+        try:
+            eklenen = self._yazma_islemi(ekle)
+            self.onbellek.barkodlar.clear()
+            self._degisiklik_bildir("toplu")
+            return eklenen
+        except sqlite3.Error as e:
+            log.error("Veritabanı hatası (insert_degerler_toplu): %s", e)
+            raise
+
+    def add_belgeler(self, cihaz_id, belgeler):
+        try:
+            self._yazma_islemi(lambda: self._belgeleri_ekle(cihaz_id, belgeler))
+            self.onbellek.dusur(cihaz_id)
+            self._degisiklik_bildir("guncelle", cihaz_id)
+            log.info("Belgeler eklendi: ID %s (%d belge)", cihaz_id, len(belgeler), extra={"cihaz_id": cihaz_id})
+            return True
+        except sqlite3.Error as e:
+            log.error("Belge ekleme hatası (add_belgeler): %s", e, extra={"cihaz_id": cihaz_id})
+            return False
+
+    def delete_belge(self, cihaz_id, dosya_yolu):
+        silinen = self._yazma_islemi(lambda: self.cursor.execute('''
+            DELETE FROM belgeler WHERE id = (
+                SELECT id FROM belgeler WHERE cihaz_id = ? AND dosya_yolu = ? LIMIT 1
+            )
+        ''', (cihaz_id, dosya_yolu)).rowcount)
+        self.onbellek.dusur(cihaz_id)
+        self._degisiklik_bildir("guncelle", cihaz_id)
+        log.info("Belge silindi: ID %s (%s)", cihaz_id, dosya_yolu, extra={"cihaz_id": cihaz_id})
+        return silinen > 0
+
+    def delete_cihaz(self, id):
+        self._yazma_islemi(lambda: self.cursor.execute("DELETE FROM cihazlar WHERE id = ?", (id,)))
+        self.onbellek.dusur(id)
+        self._degisiklik_bildir("sil", id)
+        log.info("Cihaz silindi: ID %s", id, extra={"cihaz_id": id})
+
+    # Tekil kayıt sorguları belgeleri (dosya_yolu, dosya_adi) listesi olarak, liste sorguları yalnızca belge sayısını döndürür
+    def fetch_belgeler(self, cihaz_idleri):
+        belgeler = {cihaz_id: [] for cihaz_id in cihaz_idleri}
+        if belgeler:
+            yer_tutucular = ", ".join("?" * len(belgeler))
+            self.cursor.execute(f"SELECT cihaz_id, dosya_yolu, dosya_adi FROM belgeler WHERE cihaz_id IN ({yer_tutucular}) ORDER BY id",
+                                list(belgeler))
+            for cihaz_id, yol, ad in self.cursor.fetchall():
+                belgeler[cihaz_id].append((yol, ad or os.path.basename(yol)))
+        return belgeler
+
+    def fetch_eski_belgeler(self, son_id=0, limit=DEPO_TASIMA_PARTISI):
+        self.cursor.execute("SELECT id, dosya_yolu FROM belgeler WHERE blob_anahtar IS NULL AND id > ? ORDER BY id LIMIT ?",
+                            (son_id, limit))
+        return self.cursor.fetchall()
+
+    def belgeyi_depoya_bagla(self, belge_id, belge):
+        def bagla():
+            self.cursor.execute("INSERT OR IGNORE INTO blobler (anahtar, boyut) VALUES (?, ?)", (belge["blob_anahtar"], belge["boyut"]))
+            self.cursor.execute("UPDATE belgeler SET dosya_yolu = ?, blob_anahtar = ?, dosya_adi = ? WHERE id = ?",
+                                (belge["dosya_yolu"], belge["blob_anahtar"], belge["dosya_adi"], belge_id))
+
+        self._yazma_islemi(bagla)
+        self.onbellek.temizle()
+
+    def fetch_sahipsiz_bloblar(self):
+        self.cursor.execute("SELECT anahtar FROM blobler WHERE referans_sayisi = 0")
+        return [row[0] for row in self.cursor.fetchall()]
+
+    def delete_blob(self, anahtar):
+        return self._yazma_islemi(lambda: self.cursor.execute("DELETE FROM blobler WHERE anahtar = ? AND referans_sayisi = 0",
+                                                              (anahtar,)).rowcount) > 0
+
+    # Arşivlenecek bloblar: ARSIV_DURUMLARI'nda olup esik tarihinden önce geri gelmiş kayıtlara bağlı, henüz
+    # paketlenmemiş ve arşiv koşulunu sağlamayan başka bir kayıtla paylaşılmayan bloblar. (cihaz_id, anahtar, boyut)
+    # satırları kayıt id sırasıyla döner; son_id ile sayfalanır.
+    def fetch_arsivlenecek_bloblar(self, esik, son_id=0, limit=ARSIV_PARTISI):
+        durumlar = ", ".join("?" * len(ARSIV_DURUMLARI))
+        kosul = "{t}.cihaz_durumu IN (" + durumlar + ") AND {t}.servis_gelme_tarihi > '' AND {t}.servis_gelme_tarihi < ?"
+        # CROSS JOIN ve "+c." planlayıcıyı cihazlar üzerinde id sırasıyla taramaya zorlar; tarama LIMIT'e ulaşınca
+        # durur. Aksi halde durum indeksi ya da belgeler tablosu üzerinden gidilip eşleşen tüm satırlar her partide
+        # yeniden sıralanıyordu (1 milyon kayıtta parti başına 8-20 sn yerine ~0,1 sn)
+        self.cursor.execute(f'''
+            SELECT c.id, b.anahtar, b.boyut FROM cihazlar c
+            CROSS JOIN belgeler bl ON bl.cihaz_id = c.id
+            JOIN blobler b ON b.anahtar = bl.blob_anahtar
+            WHERE c.id > ? AND {kosul.format(t="+c")}
+              AND NOT EXISTS (SELECT 1 FROM paket_girdileri p WHERE p.anahtar = b.anahtar)
+              AND NOT EXISTS (SELECT 1 FROM belgeler d JOIN cihazlar o ON o.id = d.cihaz_id
+                              WHERE d.blob_anahtar = b.anahtar AND NOT ({kosul.format(t="o")}))
+            ORDER BY c.id LIMIT ?
+        ''', [son_id, *ARSIV_DURUMLARI, esik, *ARSIV_DURUMLARI, esik, limit])
+        return self.cursor.fetchall()
+
+    # girdiler: (anahtar, ofset, uzunluk, kip) listesi. Paket yazılırken çöp toplayıcının sildiği bloblar atlanır.
+    def paketi_kaydet(self, dosya, sikistirma, girdiler, ham_boyut, paket_boyutu):
+        def kaydet():
+            self.cursor.execute('''
+                INSERT INTO paketler (dosya, sikistirma, olusturma_tarihi, girdi_sayisi, ham_boyut, paket_boyutu)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (dosya, sikistirma, datetime.datetime.now().isoformat(timespec="seconds"), len(girdiler),
+                  ham_boyut, paket_boyutu))
+            paket_id = self.cursor.lastrowid
+            self.cursor.executemany('''
+                INSERT INTO paket_girdileri (anahtar, paket_id, ofset, uzunluk, kip)
+                SELECT ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM blobler WHERE anahtar = ?)
+            ''', [(anahtar, paket_id, ofset, uzunluk, kip, anahtar) for anahtar, ofset, uzunluk, kip in girdiler])
+            return paket_id
+
+        return self._yazma_islemi(kaydet)
+
+    # Kayıtlı sorgular: ad -> (filtreler, siralama). Kaydetmeden önce sorgu derlenerek doğrulanır; aynı adla
+    # kaydetmek öncekinin yerine geçer.
+    def kayitli_sorgulari_listele(self):
+        self.cursor.execute("SELECT ad FROM kayitli_sorgular ORDER BY ad")
+        return [satir[0] for satir in self.cursor.fetchall()]
+
+    def kayitli_sorgu(self, ad):
+        self.cursor.execute("SELECT filtreler, siralama FROM kayitli_sorgular WHERE ad = ?", (ad,))
+        satir = self.cursor.fetchone()
+        if satir is None:
+            raise ValueError(f"Kayıtlı sorgu bulunamadı: {ad}")
+        siralama = json.loads(satir[1]) if satir[1] else None
+        return json.loads(satir[0]), tuple(siralama) if siralama else None
+
+    def sorguyu_kaydet(self, ad, filtreler, siralama=None):
+        ad = ad.strip()
+        if not ad:
+            raise ValueError("Sorgu adı boş olamaz")
+        self._filtre_kosullari(filtreler)
+        if siralama:
+            siralama_anahtari(siralama)
+        self._yazma_islemi(lambda: self.cursor.execute('''
+            INSERT OR REPLACE INTO kayitli_sorgular (ad, filtreler, siralama, guncelleme_tarihi) VALUES (?, ?, ?, ?)
+        ''', (ad, json.dumps(filtreler, ensure_ascii=False), json.dumps(list(siralama)) if siralama else None,
+              datetime.datetime.now().isoformat(timespec="seconds"))))
+
+    def kayitli_sorguyu_sil(self, ad):
+        return self._yazma_islemi(lambda: self.cursor.execute("DELETE FROM kayitli_sorgular WHERE ad = ?",
+                                                               (ad,)).rowcount)
+
+    # (paket dosyası, ofset, uzunluk, kip, ham boyut) ya da paketlenmemişse None
+    def fetch_paket_girdisi(self, anahtar):
+        self.cursor.execute('''
+            SELECT p.dosya, g.ofset, g.uzunluk, g.kip, b.boyut FROM paket_girdileri g
+            JOIN paketler p ON p.id = g.paket_id JOIN blobler b ON b.anahtar = g.anahtar
+            WHERE g.anahtar = ?
+        ''', (anahtar,))
+        return self.cursor.fetchone()
+
+    # Tüm paket girdilerini paket ve ofset sırasıyla akıtır: (anahtar, paket dosyası, ofset, uzunluk, kip, ham boyut)
+    def iter_paket_girdileri(self):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT g.anahtar, p.dosya, g.ofset, g.uzunluk, g.kip, b.boyut FROM paket_girdileri g
+                JOIN paketler p ON p.id = g.paket_id JOIN blobler b ON b.anahtar = g.anahtar
+                ORDER BY g.paket_id, g.ofset
+            ''')
+            yield from cursor
+        finally:
+            cursor.close()
+
+    # Anahtarı onek ile başlayan bloblar: (anahtar, boyut, referans sayısı, pakette mi). Depo klasörü
+    # (belgeler/<onek>/) ile birebir karşılaştırılabilsin diye birincil anahtar aralığıyla okunur.
+    def fetch_blob_dilimi(self, onek):
+        self.cursor.execute(BLOB_DILIMI_SORGUSU, on_ek_araligi(onek))
+        return self.cursor.fetchall()
+
+    def blob_var_mi(self, anahtar):
+        self.cursor.execute("SELECT 1 FROM blobler WHERE anahtar = ?", (anahtar,))
+        return self.cursor.fetchone() is not None
+
+    # Depoya taşınmamış (blob_anahtar'ı olmayan) eski belgeler: (belge id, cihaz id, dosya yolu)
+    def iter_eski_belgeler(self):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT id, cihaz_id, dosya_yolu FROM belgeler WHERE blob_anahtar IS NULL ORDER BY id")
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def fetch_paket_dosyalari(self):
+        self.cursor.execute("SELECT dosya, girdi_sayisi FROM paketler")
+        return self.cursor.fetchall()
+
+    # Bloblara bağlı belge satırları: (blob anahtarı, belge id, cihaz id, dosya adı)
+    def fetch_blob_belgeleri(self, anahtarlar):
+        anahtarlar, satirlar = list(anahtarlar), []
+        for i in range(0, len(anahtarlar), 500):
+            parca = anahtarlar[i:i + 500]
+            self.cursor.execute(f"SELECT blob_anahtar, id, cihaz_id, dosya_adi FROM belgeler "
+                                f"WHERE blob_anahtar IN ({', '.join('?' * len(parca))})", parca)
+            satirlar.extend(self.cursor.fetchall())
+        return satirlar
+
+    # Önbellekten dönen kayıtların belge listesi kopyalanır; çağıranın listeyi değiştirmesi önbelleği bozmaz
+    def fetch_cihaz_by_id(self, id):
+        self._onbellegi_dogrula()
+        cihaz = self.onbellek.al(id)
+        if cihaz is None:
+            self.cursor.execute(f"SELECT {CIHAZ_SECIMI} FROM cihazlar WHERE id = ?", (id,))
+            cihaz = self.cursor.fetchone()
+            if not cihaz:
+                return None
+            cihaz = cihaz[:-1] + (self.fetch_belgeler([cihaz[0]])[cihaz[0]],)
+            self.onbellek.koy(cihaz)
+        return cihaz[:-1] + (list(cihaz[-1]),)
+
+    def fetch_cihazlar_by_barkod(self, barkod_no):
+        self._onbellegi_dogrula()
+        cihazlar = self.onbellek.barkod_al(barkod_no)
+        if cihazlar is None:
+            self.cursor.execute(f"SELECT {CIHAZ_SECIMI} FROM cihazlar WHERE barkod_no = ?", (barkod_no,))
+            rows = self.cursor.fetchall()
+            belgeler = self.fetch_belgeler([row[0] for row in rows])
+            cihazlar = [row[:-1] + (belgeler[row[0]],) for row in rows]
+            self.onbellek.barkod_koy(barkod_no, cihazlar)
+        return [cihaz[:-1] + (list(cihaz[-1]),) for cihaz in cihazlar]
+
+    def fetch_all(self, filtre=""):
+        eslesme = fts_sorgusu(filtre) if filtre else ""
+        if eslesme:
+            self.cursor.execute(f'''
+                SELECT {", ".join("c." + s for s in CIHAZ_SUTUNLARI)} FROM cihazlar_fts
+                JOIN cihazlar c ON c.id = cihazlar_fts.rowid
+                WHERE cihazlar_fts MATCH ?
+                ORDER BY cihazlar_fts.rank
+            ''', (eslesme,))
+        else:
+            self.cursor.execute(f"SELECT {CIHAZ_SECIMI} FROM cihazlar")
+        return self.cursor.fetchall()
+
+    def _filtre_kosullari(self, filtreler):
+        kosullar, params = [], []
+        if filtreler.get("barkod_no"):
+            kosullar.append("barkod_no LIKE ?")
+            params.append(f"%{filtreler['barkod_no']}%")
+        if filtreler.get("cihaz_durumu"):
+            kosullar.append("cihaz_durumu = ?")
+            params.append(filtreler["cihaz_durumu"])
+        if filtreler.get("barkod_on_eki"):
+            kosullar.append("upper(barkod_no) >= ? AND upper(barkod_no) < ?")
+            params += on_ek_araligi(filtreler["barkod_on_eki"].upper())
+        for anahtar, kosul in TARIH_FILTRELERI.items():
+            if filtreler.get(anahtar):
+                kosullar.append(kosul)
+                params.append(tarih_iso(filtreler[anahtar]))
+        if filtreler.get("acik_gun_ustu") is not None:
+            sinir = datetime.date.today() - datetime.timedelta(days=int(filtreler["acik_gun_ustu"]))
+            kosullar.append(f"{ACIK_KAYIT} AND servis_gonderim_tarihi > '' AND servis_gonderim_tarihi < ?")
+            params.append(sinir.isoformat())
+        derlenen = sorgu_derle(filtreler["sorgu"]) if filtreler.get("sorgu") else None
+        if derlenen:
+            kosullar.append(derlenen[0])
+            params += derlenen[1]
+        return kosullar, params
+
+    def _arama_sorgusu(self, filtreler):
+        kosullar, params = self._filtre_kosullari(filtreler)
+        return " AND ".join([f"SELECT {CIHAZ_SECIMI} FROM cihazlar WHERE 1=1"] + kosullar), params
+
+    def advanced_search(self, filtreler):
+        self.cursor.execute(*self._arama_sorgusu(filtreler))
+        return self.cursor.fetchall()
+
+    # Ana listenin sorgusu: tam metin aramada (rank, id), diğer durumlarda id sırasıyla; son sütun sıralama anahtarıdır.
+    # Çok sayıda eşleşen aramalarda bm25 sıralaması tüm eşleşmeleri puanlamayı gerektirir; id_sirali bu durumda
+    # FTS indeksinin kendi rowid sırasıyla okur ve ilk sayfa eşleşme sayısından bağımsız olarak hızlı gelir.
+    # siralama verilirse (bkz. SIRALAMA_SUTUNLARI) ikisinin de yerine geçer.
+    def _liste_sorgusu(self, son=None, filtre="", filtreler=None, id_sirali=False, siralama=None):
+        eslesme = fts_sorgusu(filtre) if filtre else ""
+        if siralama:
+            return self._sirali_liste_sorgusu(son, eslesme, filtreler, *siralama_anahtari(siralama))
+        if eslesme and id_sirali:
+            query = f'''
+                SELECT {", ".join("c." + s for s in CIHAZ_SUTUNLARI)}, NULL FROM cihazlar_fts
+                JOIN cihazlar c ON c.id = cihazlar_fts.rowid
+                WHERE cihazlar_fts MATCH ? AND cihazlar_fts.rowid > ?
+                ORDER BY cihazlar_fts.rowid
+            '''
+            params = [eslesme, son[1] if son else 0]
+        elif eslesme:
+            query = f'''
+                SELECT {", ".join("c." + s for s in CIHAZ_SUTUNLARI)}, cihazlar_fts.rank FROM cihazlar_fts
+                JOIN cihazlar c ON c.id = cihazlar_fts.rowid
+                WHERE cihazlar_fts MATCH ?
+            '''
+            params = [eslesme]
+            if son:
+                query += " AND (cihazlar_fts.rank > ? OR (cihazlar_fts.rank = ? AND c.id > ?))"
+                params += [son[0], son[0], son[1]]
+            query += " ORDER BY cihazlar_fts.rank, c.id"
+        else:
+            kosullar, params = self._filtre_kosullari(filtreler or {})
+            query = " AND ".join([f"SELECT {CIHAZ_SECIMI}, NULL FROM cihazlar WHERE id > ?"] + kosullar) + " ORDER BY id"
+            params = [son[1] if son else 0] + params
+        return query, params
+
+    # Sütuna göre sıralı liste; ORDER BY anahtarın indeksiyle aynı sırada olduğundan sıralama değişince ilk sayfa
+    # sıralama yapılmadan indeksten okunur. İmleç (anahtar değerleri..., id) olur. Sonraki sayfa iki parçadır: son
+    # satırla aynı anahtarı taşıyan kalan satırlar (anahtar = ? AND id > ?: indeksin rowid kısmında arama) ve sonraki
+    # anahtarlar; UNION ALL parçaları sırayla okuduğundan LIMIT dolunca ikinci parçaya geçilmez. Tek bir
+    # (anahtar, id) > (?, ?) karşılaştırması indekste yalnızca anahtara göre arandığından "Serviste" gibi büyük
+    # eşitlik gruplarında her sayfa grubun başından taranırdı. Tam metin aramada eşleşmeler zaten bellekte
+    # sıralandığından tek karşılaştırma yeterlidir.
+    # Filtreliyken planlayıcı sıralamadan bağımsız olarak filtre indeksini seçer ve "Serviste" gibi geniş bir filtrede
+    # yüz binlerce satırı sıralar. Bu yüzden sıralama indeksinin ilk SIRALI_TARAMA_ORNEGI satırı yoklanır: içlerinde
+    # en az bir sayfa eşleşme varsa sorgu INDEXED BY ile sıralama indeksine yönlendirilir. Yoksa filtre seçicidir ya da
+    # sıralamayla ilişkilidir (ör. "Serviste" kayıtları gelme tarihine göre azalan sırada en sondadır) ve eşleşenleri
+    # filtre indeksinden alıp sıralamak daha kısadır.
+    def _sirali_liste_sorgusu(self, son, eslesme, filtreler, sutunlar, indeks, azalan):
+        yon, karsilastirma = ("DESC", "<") if azalan else ("ASC", ">")
+        if eslesme:
+            sutunlar = tuple("c." + s for s in sutunlar)
+        anahtar = sutunlar + ("c.id" if eslesme else "id",)
+        sira = ", ".join(f"{s} {yon}" for s in anahtar)
+        if eslesme:
+            secim = (f"SELECT {', '.join('c.' + s for s in CIHAZ_SUTUNLARI)}, NULL FROM cihazlar_fts "
+                     "JOIN cihazlar c ON c.id = cihazlar_fts.rowid")
+            kosullar, params = ["cihazlar_fts MATCH ?"], [eslesme]
+        else:
+            kosullar, params = self._filtre_kosullari(filtreler or {})
+            secim = f"SELECT {CIHAZ_SECIMI}, NULL FROM cihazlar"
+            if kosullar:
+                yonlendirme = f" INDEXED BY {indeks}" if indeks else " NOT INDEXED"
+                self.cursor.execute(f"SELECT COUNT(*) FROM (SELECT * FROM cihazlar{yonlendirme} ORDER BY {sira} LIMIT ?) "
+                                    f"WHERE {' AND '.join(kosullar)}", [SIRALI_TARAMA_ORNEGI] + params)
+                if self.cursor.fetchone()[0] >= SAYFA_BOYUTU:
+                    secim += yonlendirme
+
+        def parca(ek_kosullar):
+            return f"{secim} WHERE {' AND '.join(ek_kosullar + kosullar) or '1 = 1'} ORDER BY {sira}"
+
+        if not son:
+            return parca([]), params
+        if eslesme or not sutunlar:
+            return parca([f"({', '.join(anahtar)}) {karsilastirma} ({', '.join('?' * len(anahtar))})"]), list(son) + params
+        esit = [f"{s} = ?" for s in sutunlar] + [f"id {karsilastirma} ?"]
+        sonraki = [f"({', '.join(sutunlar)}) {karsilastirma} ({', '.join('?' * len(sutunlar))})"]
+        query = f"SELECT * FROM ({parca(esit)}) UNION ALL SELECT * FROM ({parca(sonraki)})"
+        return query, list(son) + params + list(son[:-1]) + params
+
+    # Arama kutusu için: (kip, satirlar, tam, sorgu, imlec). Tek terimli ve rakam içeren aramalar önce barkod
+    # indeksinde önek aralığı olarak denenir (kip "barkod"), sonuç yoksa tam metin aramaya (kip "fts") düşülür.
+    # Eşleşmeler sınırı aşmıyorsa tam=True ve satirlar tüm sonuçlardır (barkod ya da ilgi sırasıyla); aşıyorsa
+    # satirlar ilk sayfadır, devamı sorgu ve imlec ile fetch_page'den id sırasıyla alınır. siralama verilirse
+    # sonuçlar her zaman o sütuna göre sayfa sayfa gelir (tam=False).
+    def canli_arama(self, filtre, sinir=CANLI_ARAMA_SINIRI, siralama=None):
+        if CanliArama.barkod_gibi(CanliArama.terimleri_ayir(filtre)):
+            sorgu = CanliArama.liste_sorgusu("barkod", filtre, siralama=siralama)
+            alt, ust = on_ek_araligi(sorgu["filtreler"]["barkod_on_eki"])
+            self.cursor.execute("SELECT id FROM cihazlar WHERE upper(barkod_no) >= ? AND upper(barkod_no) < ? LIMIT ?",
+                                (alt, ust, sinir + 1))
+            sayi = len(self.cursor.fetchall())
+            if sayi:
+                if sayi <= sinir and not siralama:
+                    self.cursor.execute(f"SELECT {CIHAZ_SECIMI} FROM cihazlar WHERE upper(barkod_no) >= ? "
+                                        "AND upper(barkod_no) < ? "
+                                        "ORDER BY barkod_no, id", (alt, ust))
+                    return "barkod", self.cursor.fetchall(), True, sorgu, None
+                satirlar, imlec = self.fetch_page(None, SAYFA_BOYUTU, **sorgu)
+                return "barkod", satirlar, False, sorgu, imlec
+        eslesme = fts_sorgusu(filtre)
+        self.cursor.execute("SELECT rowid FROM cihazlar_fts WHERE cihazlar_fts MATCH ? LIMIT ?", (eslesme, sinir + 1))
+        if len(self.cursor.fetchall()) <= sinir and not siralama:
+            sorgu = CanliArama.liste_sorgusu("fts", filtre)
+            return "fts", self.fetch_page(None, sinir, **sorgu)[0], True, sorgu, None
+        sorgu = CanliArama.liste_sorgusu("fts", filtre, id_sirali=True, siralama=siralama)
+        satirlar, imlec = self.fetch_page(None, SAYFA_BOYUTU, **sorgu)
+        return "fts", satirlar, False, sorgu, imlec
+
+    # Anahtar kümesi (keyset) sayfalama: OFFSET yerine son satırın sıralama anahtarından devam edilir.
+    # Dönen imleç bir sonraki çağrıya "son" olarak verilir; None ise başka sayfa yoktur.
+    def fetch_page(self, son=None, limit=SAYFA_BOYUTU, filtre="", filtreler=None, id_sirali=False, siralama=None):
+        query, params = self._liste_sorgusu(son, filtre, filtreler, id_sirali, siralama)
+        self.cursor.execute(query + " LIMIT ?", params + [limit])
+        rows = self.cursor.fetchall()
+        sonraki = None
+        if len(rows) == limit and siralama:
+            sonraki = tuple(rows[-1][CIHAZ_SUTUNLARI.index(s)] for s in siralama_anahtari(siralama)[0]) + (rows[-1][0],)
+        elif len(rows) == limit:
+            sonraki = (rows[-1][-1], rows[-1][0])
+        return [row[:-1] for row in rows], sonraki
+
+    # Ana listeyle aynı filtreyi uygular ama satırları parça parça akıtır; bellek kullanımı tablo boyutundan bağımsızdır
+    def iter_cihazlar(self, filtre="", filtreler=None, parca=DISA_AKTARMA_PARCASI, id_sirali=False, siralama=None):
+        query, params = self._liste_sorgusu(None, filtre, filtreler, id_sirali, siralama)
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(parca)
+                if not rows:
+                    break
+                yield [row[:-1] for row in rows]
+        finally:
+            cursor.close()
+
+    def count_cihazlar(self, filtre="", filtreler=None):
+        eslesme = fts_sorgusu(filtre) if filtre else ""
+        if eslesme:
+            self.cursor.execute("SELECT COUNT(*) FROM cihazlar_fts WHERE cihazlar_fts MATCH ?", (eslesme,))
+        else:
+            kosullar, params = self._filtre_kosullari(filtreler or {})
+            self.cursor.execute(" AND ".join(["SELECT COUNT(*) FROM cihazlar WHERE 1=1"] + kosullar), params)
+        return self.cursor.fetchone()[0]
+
+    def fetch_istatistikler(self):
+        self.cursor.execute("SELECT COUNT(*), COALESCE(SUM(belge_sayisi), 0) FROM cihazlar")
+        kayit, belge = self.cursor.fetchone()
+        self.cursor.execute("SELECT cihaz_durumu, COUNT(*) FROM cihazlar GROUP BY cihaz_durumu ORDER BY COUNT(*) DESC")
+        durumlar = {durum or "": sayi for durum, sayi in self.cursor.fetchall()}
+        self.cursor.execute("SELECT COUNT(*), COALESCE(SUM(boyut), 0) FROM blobler")
+        blob, blob_boyutu = self.cursor.fetchone()
+        self.cursor.execute("SELECT COUNT(*), COALESCE(SUM(ham_boyut), 0), COALESCE(SUM(paket_boyutu), 0) FROM paketler")
+        paket, paket_ham_boyut, paket_boyutu = self.cursor.fetchone()
+        self.cursor.execute("PRAGMA page_count")
+        sayfa = self.cursor.fetchone()[0]
+        self.cursor.execute("PRAGMA page_size")
+        sayfa_boyutu = self.cursor.fetchone()[0]
+        self.cursor.execute("PRAGMA freelist_count")
+        bos_sayfa = self.cursor.fetchone()[0]
+        return {"kayit": kayit, "durumlar": durumlar, "belge": belge, "blob": blob, "blob_boyutu": blob_boyutu,
+                "paket": paket, "paket_ham_boyut": paket_ham_boyut, "paket_boyutu": paket_boyutu,
+                "veritabani_boyutu": sayfa * sayfa_boyutu, "bos_alan": bos_sayfa * sayfa_boyutu,
+                "sema_surumu": self.schema_version()}
+
+    # Bakım: arama indeksi birleştirilir, WAL dosyası boşaltılır ve dosya yeniden yazılarak boş sayfalar geri verilir
+    def vacuum(self):
+        once = os.path.getsize(self.db_name)
+        self._yazma_islemi(lambda: self.cursor.execute("INSERT INTO cihazlar_fts (cihazlar_fts) VALUES ('optimize')"))
+        self.cursor.execute("VACUUM")
+        self.cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.cursor.execute("PRAGMA optimize")
+        sonra = os.path.getsize(self.db_name)
+        log.info("Veritabanı sıkıştırıldı: %d -> %d bayt", once, sonra)
+        return once, sonra
+
+    # İmleç önce kapatılır: açık bir deyim kalırsa bağlantı gerçekte kapanmaz ve WAL dosyası aktarılmadan kalır
+    def close(self):
+        istatistik = self.onbellek.istatistik()
+        if istatistik["isabet"] + istatistik["iska"]:
+            log.info("Kayıt önbelleği: %d isabet, %d ıska (%%%.0f)", istatistik["isabet"], istatistik["iska"],
+                     istatistik["isabet_orani"] * 100)
+        self.cursor.close()
+        self.conn.close()
+
+metotlari_olc(DatabaseManager)
+
+class GorevIptalEdildi(Exception):
+    pass
+
+# olcum verilirse baslangic'tan (varsayılan: gönderildiği an) sonucun ana döngüye ulaşmasına kadar geçen süre bu adla
+# ölçülür (bkz. GorevYurutucu._kuyrugu_isle)
+class Gorev:
+    def __init__(self, yurutucu, ad=None, tamamlandi=None, hata=None, olcum=None, baslangic=None):
+        self.yurutucu = yurutucu
+        self.ad = ad
+        self.tamamlandi = tamamlandi
+        self.hata = hata
+        self.olcum = olcum
+        self.baslangic = baslangic if baslangic is not None else time.perf_counter()
+        self.oran = None
+        self.mesaj = ""
+        self.future = None
+        self._iptal = threading.Event()
+
+    @property
+    def iptal_edildi(self):
+        return self._iptal.is_set()
+
+    def iptal_et(self):
+        self._iptal.set()
+        # Henüz başlamamış görev hiç çalışmayacağı için sonucu burada bildirilir
+        if self.future and self.future.cancel():
+            self.yurutucu.sonuc_kuyrugu.put(("iptal", self, None))
+
+    def iptal_kontrol(self):
+        if self._iptal.is_set():
+            raise GorevIptalEdildi(self.ad)
+
+    # İş parçacığından çağrılır; arayüz güncellemesi ana döngüde yapılır
+    def ilerleme(self, oran, mesaj=""):
+        self.yurutucu.sonuc_kuyrugu.put(("ilerleme", self, (oran, mesaj)))
+
+# Paket girdisi sıkıştırıcı/açıcıları; lzma yalnızca kullanıldığında yüklenir. "ham" girdi sıkıştırılmamıştır.
+def _sikistirici(kip):
+    if kip == "lzma":
+        import lzma
+        return lzma.LZMACompressor(preset=6)
+    return zlib.compressobj(6)
+
+def _acici(kip):
+    if kip == "ham":
+        return None
+    if kip == "lzma":
+        import lzma
+        return lzma.LZMADecompressor()
+    return zlib.decompressobj()
+
+# Yazılmakta olan arşiv paketi: girdiler ".tmp" dosyasına eklenir, bitir() dizini yazıp dosyayı diske aktardıktan
+# sonra adını verir. Kayıt veritabanına ancak bundan sonra yapılır.
+class _PaketYazici:
+    def __init__(self, depo, sikistirma):
+        self.depo = depo
+        self.sikistirma = sikistirma
+        self.dosya = f"{datetime.datetime.now():%Y%m%d_%H%M%S}_{os.urandom(4).hex()}.stpk"
+        self.yol = depo.paket_yolu(self.dosya)
+        os.makedirs(os.path.dirname(self.yol), exist_ok=True)
+        self.f = open(self.yol + ".tmp", "wb")
+        self.f.write(PAKET_IMZASI)
+        self.girdiler, self.boyutlar, self.anahtarlar = [], [], set()
+        self.ham_bayt = 0
+        self.son_cihaz = None
+
+    # Kaynak dosya bulunamazsa False döner
+    def ekle(self, anahtar, boyut):
+        self.anahtarlar.add(anahtar)
+        ofset = self.f.tell()
+        try:
+            kip = self.depo._girdi_yaz(self.depo.blob_yolu(anahtar), self.f, self.sikistirma)
+        except FileNotFoundError:
+            return False
+        self.girdiler.append((anahtar, ofset, self.f.tell() - ofset, kip))
+        self.boyutlar.append(boyut)
+        self.ham_bayt += boyut
+        return True
+
+    def bitir(self):
+        dizin_ofseti = self.f.tell()
+        dizin = [list(girdi) + [boyut] for girdi, boyut in zip(self.girdiler, self.boyutlar)]
+        self.f.write(zlib.compress(json.dumps(dizin).encode("utf-8")))
+        self.f.write(struct.pack("<Q", dizin_ofseti) + PAKET_SONU)
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        boyut = self.f.tell()
+        self.f.close()
+        os.replace(self.yol + ".tmp", self.yol)
+        return boyut
+
+    def vazgec(self):
+        self.f.close()
+        if os.path.exists(self.yol + ".tmp"):
+            os.remove(self.yol + ".tmp")
+
+# İçerik adresli belge deposu: her içerik belgeler/<ilk iki hane>/<sha256><uzantı> altında bir kez saklanır,
+# kayıtlar (belgeler tablosu) bu bloblara bağlanır. Referansı kalmayan bloblar cop_topla ile silinir.
+class BelgeDeposu:
+    def __init__(self, kok=BELGE_KLASORU):
+        self.kok = kok
+
+    def blob_yolu(self, anahtar):
+        return os.path.join(self.kok, anahtar[:2], anahtar)
+
+    @staticmethod
+    def sha256(yol, gorev=None):
+        ozet = hashlib.sha256()
+        with open(yol, "rb") as f:
+            for parca in iter(lambda: f.read(OKUMA_PARCASI), b""):
+                if gorev:
+                    gorev.iptal_kontrol()
+                ozet.update(parca)
+        return ozet.hexdigest()
+
+    # Yeni yazılan blob, kaynakla aynı sağlama toplamına sahip olduğu doğrulanmadan depoya alınmaz
+    def ekle(self, kaynak, gorev=None, depoda=False):
+        uzanti = re.sub(r"[^\w.]", "", os.path.splitext(kaynak)[1].lower())[:16]
+        anahtar = self.sha256(kaynak, gorev) + uzanti
+        hedef = self.blob_yolu(anahtar)
+        if os.path.exists(hedef):
+            os.utime(hedef)  # Yeni referans alacak blob çöp toplayıcıya yakalanmasın
+        else:
+            os.makedirs(os.path.dirname(hedef), exist_ok=True)
+            gecici = f"{hedef}.{threading.get_ident()}.tmp"
+            yontem = self._yerlestir(kaynak, gecici, depoda)
+            # Sabit bağlantı aynı dosyanın ikinci adıdır, içeriği farklı olamaz
+            if yontem != "baglanti" and self.sha256(gecici, gorev) + uzanti != anahtar:
+                os.remove(gecici)
+                raise OSError(f"Kopyanın sağlama toplamı kaynakla uyuşmuyor: {kaynak}")
+            os.replace(gecici, hedef)
+        return {"blob_anahtar": anahtar, "dosya_yolu": hedef, "boyut": os.path.getsize(hedef),
+                "dosya_adi": os.path.basename(kaynak)}
+
+    # Depo içindeki dosyalar sabit bağlantıyla (hardlink) taşınır. Dış kaynaklara bağlantı kurulmaz, aksi halde
+    # kaynağın sonradan düzenlenmesi blobu da değiştirirdi; bunlar için önce yazma-üzerine-kopya klon denenir.
+    @staticmethod
+    def _yerlestir(kaynak, hedef, depoda):
+        if depoda:
+            try:
+                os.link(kaynak, hedef)
+                return "baglanti"
+            except OSError:
+                pass
+        if fcntl is not None:
+            try:
+                with open(kaynak, "rb") as k, open(hedef, "wb") as h:
+                    fcntl.ioctl(h.fileno(), FICLONE, k.fileno())
+                return "klon"
+            except OSError:
+                pass
+        shutil.copyfile(kaynak, hedef)
+        return "kopya"
+
+    # Depo öncesi {id}_{barkod}_{seri}_{ad} biçiminde kopyalanmış belgeleri bir parti halinde depoya taşır.
+    # (sonraki_son_id, taşınan, hatalar) döndürür; sonraki_son_id None ise taşınacak belge kalmamıştır.
+    def eski_belgeleri_tasi(self, db, gorev=None, son_id=0):
+        satirlar = db.fetch_eski_belgeler(son_id)
+        tasinan, hatalar = 0, []
+        for belge_id, yol in satirlar:
+            if gorev:
+                gorev.iptal_kontrol()
+            try:
+                belge = self.ekle(yol, gorev, depoda=True)
+                belge["dosya_adi"] = os.path.basename(yol)
+                db.belgeyi_depoya_bagla(belge_id, belge)
+                os.remove(yol)
+                tasinan += 1
+            except OSError as e:
+                log.error("Belge depoya taşınamadı: %s (Dosya: %s)", e, yol)
+                hatalar.append((yol, str(e)))
+        sonraki = satirlar[-1][0] if len(satirlar) == DEPO_TASIMA_PARTISI else None
+        return sonraki, tasinan, hatalar
+
+    # Veritabanı iş parçacığında çalışır; (silinen blob sayısı, kazanılan bayt) döndürür
+    def cop_topla(self, db, gorev=None):
+        simdi = time.time()
+        silinen, kazanilan = 0, 0
+        for anahtar in db.fetch_sahipsiz_bloblar():
+            if gorev:
+                gorev.iptal_kontrol()
+            yol = self.blob_yolu(anahtar)
+            try:
+                bilgi = os.stat(yol)
+            except FileNotFoundError:
+                db.delete_blob(anahtar)
+                continue
+            if simdi - bilgi.st_mtime < COP_TOPLAMA_BEKLEMESI:
+                continue
+            if db.delete_blob(anahtar):
+                os.remove(yol)
+                silinen += 1
+                kazanilan += bilgi.st_size
+        log.info("Belge deposu temizlendi: %d blob, %d bayt", silinen, kazanilan)
+        return silinen, kazanilan
+
+    def paket_yolu(self, dosya):
+        return os.path.join(self.kok, "paketler", dosya)
+
+    # Arşiv koşulunu sağlayan bloblar kayıt sırasıyla paketlere yazılır; paket ARSIV_PAKET_BOYUTU'nu geçince bir
+    # sonraki kayıtta kapatılır. Paket tamamen yazılıp diske aktarıldıktan sonra veritabanına kaydedilir, gevşek
+    # dosyalar ancak ondan sonra silinir; arada kesilirse en kötü ihtimalle kaydı olmayan bir paket ya da silinmemiş
+    # gevşek dosyalar kalır. Özet sözlüğü döndürür.
+    def arsivle(self, db, gorev=None, gun=ARSIV_GUN, sikistirma="zlib"):
+        if sikistirma not in ARSIV_SIKISTIRMALARI:
+            raise ValueError(f"Geçersiz sıkıştırma: {sikistirma}")
+        esik = (datetime.date.today() - datetime.timedelta(days=gun)).isoformat()
+        ozet = {"paket": 0, "belge": 0, "eksik": 0, "ham_bayt": 0, "paket_bayt": 0}
+        baslangic = time.perf_counter()
+        paket, son_id = None, 0
+        try:
+            while son_id is not None:
+                satirlar, son_id = self._arsiv_partisi(db, esik, son_id)
+                # Birden çok kayda bağlı bir blob aynı partide ya da henüz kaydedilmemiş açık pakette olabilir
+                gorulen = set(paket.anahtarlar) if paket else set()
+                for cihaz_id, anahtar, boyut in satirlar:
+                    if anahtar in gorulen:
+                        continue
+                    gorulen.add(anahtar)
+                    if gorev:
+                        gorev.iptal_kontrol()
+                    if paket and paket.f.tell() >= ARSIV_PAKET_BOYUTU and cihaz_id != paket.son_cihaz:
+                        self._paketi_kapat(db, paket, ozet)
+                        paket = None
+                    if paket is None:
+                        paket = _PaketYazici(self, sikistirma)
+                    paket.son_cihaz = cihaz_id
+                    if not paket.ekle(anahtar, boyut):
+                        ozet["eksik"] += 1
+                    elif gorev:
+                        islenen = ozet["ham_bayt"] + paket.ham_bayt
+                        hiz = islenen / max(time.perf_counter() - baslangic, 1e-6) / 1024 / 1024
+                        gorev.ilerleme(None, f"{ozet['belge'] + len(paket.girdiler)} belge arşivlendi, {hiz:.1f} MB/s")
+            if paket:
+                self._paketi_kapat(db, paket, ozet)
+        except BaseException:
+            if paket:
+                paket.vazgec()
+            raise
+        ozet["sure"] = round(time.perf_counter() - baslangic, 3)
+        ozet["tasarruf_bayt"] = ozet["ham_bayt"] - ozet["paket_bayt"]
+        ozet["oran"] = round(ozet["paket_bayt"] / ozet["ham_bayt"], 4) if ozet["ham_bayt"] else None
+        ozet["hiz_mb_sn"] = round(ozet["ham_bayt"] / max(ozet["sure"], 1e-6) / 1024 / 1024, 1)
+        log.info("Belgeler arşivlendi: %d paket, %d belge, %d -> %d bayt, %.1f MB/s, %d eksik dosya",
+                 ozet["paket"], ozet["belge"], ozet["ham_bayt"], ozet["paket_bayt"], ozet["hiz_mb_sn"], ozet["eksik"],
+                 extra={"arsiv": ozet})
+        return ozet
+
+    # Bir parti (cihaz_id, anahtar, boyut) satırı ve sonraki partinin son_id'si (bitti ise None). Parti sınırında
+    # yarım kalabilecek son kaydın belgeleri bir sonraki partiye bırakılır.
+    @staticmethod
+    def _arsiv_partisi(db, esik, son_id):
+        satirlar = db.fetch_arsivlenecek_bloblar(esik, son_id, ARSIV_PARTISI)
+        if len(satirlar) < ARSIV_PARTISI:
+            return satirlar, None
+        if satirlar[0][0] != satirlar[-1][0]:
+            satirlar = [satir for satir in satirlar if satir[0] != satirlar[-1][0]]
+        return satirlar, satirlar[-1][0]
+
+    def _paketi_kapat(self, db, paket, ozet):
+        if not paket.girdiler:
+            paket.vazgec()
+            return
+        paket_bayt = paket.bitir()
+        db.paketi_kaydet(paket.dosya, paket.sikistirma, paket.girdiler, paket.ham_bayt, paket_bayt)
+        for anahtar, _, _, _ in paket.girdiler:
+            try:
+                os.remove(self.blob_yolu(anahtar))
+            except FileNotFoundError:
+                pass
+        ozet["paket"] += 1
+        ozet["belge"] += len(paket.girdiler)
+        ozet["ham_bayt"] += paket.ham_bayt
+        ozet["paket_bayt"] += paket_bayt
+
+    # Zaten sıkıştırılmış biçimler ve sıkıştırmanın yeterince küçültmediği dosyalar ham olarak yazılır
+    @staticmethod
+    def _girdi_yaz(kaynak, f, sikistirma):
+        ofset = f.tell()
+        with open(kaynak, "rb") as k:
+            boyut = os.fstat(k.fileno()).st_size
+            if os.path.splitext(kaynak)[1].lower() not in SIKISTIRILMIS_UZANTILAR:
+                sikistirici = _sikistirici(sikistirma)
+                for parca in iter(lambda: k.read(OKUMA_PARCASI), b""):
+                    f.write(sikistirici.compress(parca))
+                f.write(sikistirici.flush())
+                if f.tell() - ofset <= boyut * ARSIV_KAZANC_ESIGI:
+                    return sikistirma
+                f.seek(ofset)
+                f.truncate()
+                k.seek(0)
+            shutil.copyfileobj(k, f, OKUMA_PARCASI)
+        return "ham"
+
+    # Paket girdisinin ham içeriğini parça parça döndürür; paketin yalnızca bu girdinin baytları okunur
+    def girdi_parcalari(self, dosya, ofset, uzunluk, kip):
+        acici = _acici(kip)
+        with open(self.paket_yolu(dosya), "rb") as f:
+            f.seek(ofset)
+            kalan = uzunluk
+            while kalan:
+                parca = f.read(min(OKUMA_PARCASI, kalan))
+                if not parca:
+                    raise OSError(f"Paket dosyası eksik: {dosya}")
+                kalan -= len(parca)
+                yield acici.decompress(parca) if acici else parca
+        if acici and hasattr(acici, "flush"):
+            yield acici.flush()
+
+    # Açılabilir bir dosya yolu döndürür: gevşek dosya duruyorsa kendisi, yoksa paket girdisi
+    # (db.fetch_paket_girdisi) ACILAN_BELGE_KLASORU'na çıkarılır ve sağlama toplamı anahtarla doğrulanır
+    def belge_yolu(self, yol, girdi=None):
+        if os.path.exists(yol) or girdi is None:
+            return yol
+        anahtar = os.path.basename(yol)
+        hedef = os.path.join(ACILAN_BELGE_KLASORU, anahtar)
+        if not os.path.exists(hedef):
+            os.makedirs(ACILAN_BELGE_KLASORU, exist_ok=True)
+            gecici = f"{hedef}.{threading.get_ident()}.tmp"
+            baslangic = time.perf_counter()
+            ozet = hashlib.sha256()
+            with open(gecici, "wb") as f:
+                for parca in self.girdi_parcalari(*girdi[:4]):
+                    ozet.update(parca)
+                    f.write(parca)
+            if not anahtar.startswith(ozet.hexdigest()):
+                os.remove(gecici)
+                raise OSError(f"Paketten açılan belge bozuk: {anahtar}")
+            os.replace(gecici, hedef)
+            sure = time.perf_counter() - baslangic
+            log.info("Belge paketten açıldı: %s (%d bayt, %.1f MB/s)", anahtar, girdi[4],
+                     girdi[4] / max(sure, 1e-6) / 1024 / 1024)
+        return hedef
+
+    # Tüm paket girdilerini açıp sağlama toplamını anahtarla karşılaştırır; açma hızını da ölçer
+    def paketleri_dogrula(self, db, gorev=None):
+        baslangic = time.perf_counter()
+        sonuc = {"belge": 0, "ham_bayt": 0, "hatalar": []}
+        for anahtar, dosya, ofset, uzunluk, kip, boyut in db.iter_paket_girdileri():
+            if gorev:
+                gorev.iptal_kontrol()
+            ozet = hashlib.sha256()
+            try:
+                for parca in self.girdi_parcalari(dosya, ofset, uzunluk, kip):
+                    ozet.update(parca)
+                if not anahtar.startswith(ozet.hexdigest()):
+                    raise OSError("sağlama toplamı uyuşmuyor")
+            except Exception as e:  # zlib.error, lzma.LZMAError, eksik paket: hepsi bozuk girdi olarak raporlanır
+                sonuc["hatalar"].append((anahtar, dosya, str(e)))
+            sonuc["belge"] += 1
+            sonuc["ham_bayt"] += boyut
+            if gorev and sonuc["belge"] % 100 == 0:
+                gorev.ilerleme(None, f"{sonuc['belge']} belge doğrulandı")
+        sonuc["sure"] = round(time.perf_counter() - baslangic, 3)
+        sonuc["hiz_mb_sn"] = round(sonuc["ham_bayt"] / max(sonuc["sure"], 1e-6) / 1024 / 1024, 1)
+        log.info("Arşiv doğrulandı: %d belge, %d hata, %.1f MB/s", sonuc["belge"], len(sonuc["hatalar"]),
+                 sonuc["hiz_mb_sn"])
+        return sonuc
+
+# Seçilen dosyaları sınırlı bir havuzla eşzamanlı olarak depoya ekler. Bir dosyadaki hata diğerlerini durdurmaz;
+# (belgeler, (dosya, hata) listesi, özet metni) döndürür. Belgeler seçim sırasını korur.
+def belgeleri_depoya_ekle(gorev, dosyalar, depo):
+    boyutlar, hatalar = {}, []
+    for dosya in dosyalar:
+        try:
+            boyutlar[dosya] = os.path.getsize(dosya)
+        except OSError:
+            hatalar.append((dosya, "Dosya bulunamadı"))
+    toplam_bayt = sum(boyutlar.values())
+    sonuclar, islenen_bayt, biten = {}, 0, 0
+    baslangic = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=ALIM_IS_PARCACIGI, thread_name_prefix="servis-alim") as havuz:
+        isler = {havuz.submit(depo.ekle, dosya, gorev): dosya for dosya in boyutlar}
+        try:
+            for is_ in as_completed(isler):
+                dosya = isler[is_]
+                try:
+                    sonuclar[dosya] = is_.result()
+                except OSError as e:
+                    log.error("Dosya kopyalama hatası: %s (Dosya: %s)", e, dosya)
+                    hatalar.append((dosya, "Dosya kopyalanamadı"))
+                biten += 1
+                islenen_bayt += boyutlar[dosya]
+                hiz = islenen_bayt / max(time.perf_counter() - baslangic, 1e-6) / 1024 / 1024
+                gorev.ilerleme(islenen_bayt / toplam_bayt if toplam_bayt else biten / len(isler),
+                               f"{biten}/{len(isler)} dosya, {hiz:.1f} MB/s")
+        except GorevIptalEdildi:
+            for bekleyen in isler:
+                bekleyen.cancel()
+            raise
+    sure = time.perf_counter() - baslangic
+    belgeler = [sonuclar[dosya] for dosya in boyutlar if dosya in sonuclar]
+    ozet = (f"{len(belgeler)} belge eklendi ({islenen_bayt / 1024 / 1024:.1f} MB, "
+            f"{islenen_bayt / max(sure, 1e-6) / 1024 / 1024:.1f} MB/s)")
+    log.info("Toplu belge ekleme: %s, %d hata, %.2f sn", ozet, len(hatalar), sure)
+    return belgeler, hatalar, ozet
+
+# Satırları veritabanından doğrudan .xlsx (openpyxl yalnızca-yazma kipi) ya da .csv dosyasına akıtır.
+# CSV, Türkçe Excel'in doğrudan açabilmesi için UTF-8 BOM ve ";" ayraçla yazılır. (satır sayısı, süre) döndürür.
+# ek_sayfalar verilirse .xlsx çıktısında kayıtlardan sonra ek_sayfalar(kitap) çağrılır (ör. analiz sayfaları);
+# CSV tek tablo olduğundan bu durumda yok sayılır
+def disa_aktar(db, dosya_yolu, filtre="", filtreler=None, gorev=None, id_sirali=False, ek_sayfalar=None, siralama=None):
+    toplam = db.count_cihazlar(filtre, filtreler)
+    yazilan = 0
+    baslangic = time.perf_counter()
+    csv_mi = dosya_yolu.lower().endswith(".csv")
+    try:
+        if csv_mi:
+            with open(dosya_yolu, "w", newline="", encoding="utf-8-sig") as f:
+                yazici = csv.writer(f, delimiter=";")
+                yazici.writerow(DISA_AKTARMA_BASLIKLARI)
+                for satirlar in db.iter_cihazlar(filtre, filtreler, id_sirali=id_sirali, siralama=siralama):
+                    if gorev:
+                        gorev.iptal_kontrol()
+                    yazici.writerows(satirlar)
+                    yazilan += len(satirlar)
+                    if gorev:
+                        gorev.ilerleme(yazilan / toplam if toplam else 1.0, f"{yazilan}/{toplam} kayıt")
+        else:
+            from openpyxl import Workbook
+            kitap = Workbook(write_only=True)
+            sayfa = kitap.create_sheet("Cihazlar")
+            sayfa.append(DISA_AKTARMA_BASLIKLARI)
+            for satirlar in db.iter_cihazlar(filtre, filtreler, id_sirali=id_sirali, siralama=siralama):
+                if gorev:
+                    gorev.iptal_kontrol()
+                for satir in satirlar:
+                    sayfa.append(satir)
+                yazilan += len(satirlar)
+                if gorev:
+                    gorev.ilerleme(yazilan / toplam if toplam else 1.0, f"{yazilan}/{toplam} kayıt")
+            if ek_sayfalar:
+                ek_sayfalar(kitap)
+            kitap.save(dosya_yolu)
+    except GorevIptalEdildi:
+        if os.path.exists(dosya_yolu):
+            os.remove(dosya_yolu)
+        raise
+    sure = time.perf_counter() - baslangic
+    log.info("Dışa aktarma: %s (%d kayıt, %.2f sn, %.0f kayıt/sn)", dosya_yolu, yazilan, sure,
+             yazilan / max(sure, 1e-6), extra={"kayit": yazilan, "sure": round(sure, 3)})
+    return yazilan, sure
+
+# İçe aktarılan dosyanın satırlarını akıtır (.xlsx openpyxl salt-okunur kipte, diğerleri CSV olarak)
+def _kaynak_satirlari(dosya_yolu):
+    if dosya_yolu.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook
+        kitap = load_workbook(dosya_yolu, read_only=True, data_only=True)
+        try:
+            for satir in kitap.worksheets[0].iter_rows(values_only=True):
+                yield list(satir)
+        finally:
+            kitap.close()
+    else:
+        with open(dosya_yolu, newline="", encoding="utf-8-sig") as f:
+            ornek = f.read(64 * 1024)
+            f.seek(0)
+            try:
+                ayrac = csv.Sniffer().sniff(ornek, delimiters=";,\t").delimiter
+            except csv.Error:
+                ayrac = ";"
+            yield from csv.reader(f, delimiter=ayrac)
+
+def _hucre_metni(deger):
+    if deger is None:
+        return ""
+    if isinstance(deger, (datetime.datetime, datetime.date)):
+        return deger.strftime("%Y-%m-%d")
+    if isinstance(deger, float) and deger.is_integer():
+        return str(int(deger))
+    return str(deger).strip()
+
+# Excel/CSV dosyasından toplu kayıt ekler. Başlıklar dışa aktarma başlıkları ya da sütun adları olabilir.
+# Her satır kaydi_dogrula ile denetlenir; reddedilenler hata raporuna (CSV) yazılır. kuru_calistirma=True ise
+# yalnızca doğrulama yapılır, veritabanına yazılmaz. Satır değerleri sütun konumlarından doğrudan KAYIT_ALANLARI
+# sırasıyla kurulur; CSV hücreleri zaten metin olduğundan _hucre_metni yalnızca metin olmayan (Excel) hücrelere uygulanır.
+def ice_aktar(db, dosya_yolu, kuru_calistirma=False, hata_raporu=None, gorev=None, parti=ICE_AKTARMA_PARTISI):
+    hata_raporu = hata_raporu or os.path.splitext(dosya_yolu)[0] + "_hatalar.csv"
+    alan_adlari = {turkce_normalize(alan.replace("_", " ")): alan for alan in KAYIT_ALANLARI}
+    satirlar = _kaynak_satirlari(dosya_yolu)
+    baslik = next(satirlar, None)
+    if not baslik:
+        raise ValueError("Dosya boş")
+    sutunlar = {alan_adlari[ad]: i for i, ad in enumerate(turkce_normalize(_hucre_metni(h)) for h in baslik)
+                if ad in alan_adlari}
+    if "barkod_no" not in sutunlar:
+        raise ValueError("Barkod No sütunu bulunamadı")
+    konumlar = [sutunlar.get(alan) for alan in KAYIT_ALANLARI]
+    tarih_konumlari = [KAYIT_ALANLARI.index(alan) for alan in TARIH_ALANLARI]
+
+    sonuc = {"okunan": 0, "eklenen": 0, "reddedilen": 0, "hata_raporu": None}
+    bekleyen, rapor, rapor_dosyasi = [], None, None
+    baslangic = time.perf_counter()
+    try:
+        for satir_no, satir in enumerate(satirlar, start=2):
+            if not any(h not in (None, "") for h in satir):
+                continue
+            sonuc["okunan"] += 1
+            uzunluk = len(satir)
+            degerler = [("" if i is None or i >= uzunluk else
+                         satir[i].strip() if type(satir[i]) is str else _hucre_metni(satir[i])) for i in konumlar]
+            hata = kaydi_dogrula(dict(zip(KAYIT_ALANLARI, degerler)))
+            if hata:
+                if rapor is None:
+                    rapor_dosyasi = open(hata_raporu, "w", newline="", encoding="utf-8-sig")
+                    rapor = csv.writer(rapor_dosyasi, delimiter=";")
+                    rapor.writerow(["Satır", "Hata"] + [_hucre_metni(h) for h in baslik])
+                rapor.writerow([satir_no, hata] + [_hucre_metni(h) for h in satir])
+                sonuc["reddedilen"] += 1
+                continue
+            for i in tarih_konumlari:
+                degerler[i] = tarih_iso(degerler[i])
+            bekleyen.append(degerler)
+            if len(bekleyen) >= parti:
+                if gorev:
+                    gorev.iptal_kontrol()
+                    gorev.ilerleme(None, f"{sonuc['okunan']} satır okundu")
+                if not kuru_calistirma:
+                    db.insert_degerler_toplu(bekleyen)
+                sonuc["eklenen"] += len(bekleyen)
+                bekleyen = []
+        if bekleyen:
+            if not kuru_calistirma:
+                db.insert_degerler_toplu(bekleyen)
+            sonuc["eklenen"] += len(bekleyen)
+    finally:
+        satirlar.close()
+        if rapor_dosyasi:
+            rapor_dosyasi.close()
+            sonuc["hata_raporu"] = hata_raporu
+    sonuc["sure"] = time.perf_counter() - baslangic
+    sonuc["hiz"] = sonuc["okunan"] / max(sonuc["sure"], 1e-6)
+    log.info("İçe aktarma%s: %s | %d eklendi, %d reddedildi, %.0f satır/sn", " (deneme)" if kuru_calistirma else "",
+             dosya_yolu, sonuc["eklenen"], sonuc["reddedilen"], sonuc["hiz"])
+    return sonuc
@@ -1,178 +1,247 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, Menu
-import sqlite3
+from tkinter import ttk, messagebox, filedialog, simpledialog, Menu
 import datetime
+import json
 import os
-import shutil
-from tkcalendar import DateEntry
 import logging
-import json
-import pandas as pd
 import platform
-import re
-
-# Global ayarlar
-SETTINGS_FILE = "settings.json"
-DEFAULT_SETTINGS = {
-    "log_enabled": True,
-    "log_file": "servis_takip.log"
-}
-
-# Ayarları yükle
-def load_settings():
-    global settings
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, "r") as f:
-            settings = json.load(f)
-    else:
-        settings = DEFAULT_SETTINGS.copy()
-        save_settings()
-    return settings
-
-# Ayarları kaydet
-def save_settings():
-    with open(SETTINGS_FILE, "w") as f:
-        json.dump(settings, f, indent=4)
-
-# Loglama ayarları
-def configure_logging():
-    if settings["log_enabled"]:
-        logging.basicConfig(filename=settings["log_file"], level=logging.INFO,
-                            format="%(asctime)s - %(levelname)s - %(message)s")
-    else:
-        logging.basicConfig(level=logging.CRITICAL)
-
-# İlk ayarları yükle ve loglamayı yapılandır
-settings = load_settings()
-configure_logging()
-
-class DatabaseManager:
-    def __init__(self, db_name="servis_takip.db"):
-        self.conn = sqlite3.connect(db_name)
-        self.cursor = self.conn.cursor()
-        self.create_tables()
-
-    def create_tables(self):
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cihazlar (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                barkod_no TEXT NOT NULL,
-                bolge TEXT, personel_ad_soyad TEXT, personel_sicil_no TEXT,
-                cihaz_tipi TEXT, cihaz_seri_no TEXT, servis_gonderim_tarihi TEXT,
-                servis_gelme_tarihi TEXT, cihaz_durumu TEXT, aciklama TEXT,
-                cihaz_belgeleri TEXT
-            )
-        ''')
-        self.conn.commit()
-
-    def insert_cihaz(self, veriler):
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from servis_core import (settings, load_settings, save_settings, configure_logging, BELGE_KLASORU, SAYFA_BOYUTU,
+                         log, olcumler, ARSIV_GUN, TARIH_BICIMI, TARIH_ALANLARI, VARSAYILAN_VERITABANI, CIHAZ_TIPLERI, CIHAZ_DURUMLARI,
+                         CanliArama, DatabaseManager, Gorev, GorevIptalEdildi, BelgeDeposu, belgeleri_depoya_ekle,
+                         SORGU_ALANLARI, SORGU_ISLEMLERI, disa_aktar, ice_aktar, kaydi_dogrula, sorgu_derle, tarih_iso)
+from servis_analiz import analiz_raporu, excel_raporu_yaz, excel_sayfalari, rapor_tablolari
+from servis_tutarlilik import belgeleri_tara, karantinaya_al, yeniden_bagla
+from servis_yedek import yedegi_dogrula, yedek_al, yedekleri_listele
+
+# Toplu belge eklemede hata özetinde gösterilen en fazla dosya sayısı
+HATA_OZETI_SATIRI = 15
+
+# Tutarlılık taraması penceresinde listelenen en fazla bulgu sayısı
+TARAMA_GOSTERILEN = 5000
+
+# Arka plan görevleri: dosya iş parçacığı sayısı ve olay döngüsü gecikme ölçümü
+DOSYA_IS_PARCACIGI = 4
+NABIZ_ARALIGI_MS = 100
+BLOKAJ_ESIGI_MS = 200
+
+# Ayarlar penceresinde seçilebilen log seviyeleri
+LOG_SEVIYELERI = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
+# Canlı arama: son tuş vuruşundan bu kadar sonra aranır
+ARAMA_GECIKMESI_MS = 150
+
+# Başlığına tıklanınca listenin veritabanında sıralandığı sütunlar (liste sütunu -> SIRALAMA_SUTUNLARI anahtarı)
+LISTE_SIRALAMALARI = {"ID": "id", "Barkod": "barkod_no", "Bolge": "bolge", "Personel": "personel_ad_soyad",
+                      "Sicil": "personel_sicil_no", "Tip": "cihaz_tipi", "Seri": "cihaz_seri_no",
+                      "Gonderim": "servis_gonderim_tarihi", "Gelme": "servis_gelme_tarihi", "Durum": "cihaz_durumu",
+                      "Belge": "belge_sayisi"}
+
+# Sorgulama penceresindeki koşul oluşturucu: ekrandaki adlar -> SORGU_ALANLARI / işlem anahtarları
+SORGU_ALAN_ADLARI = {"Kayıt ID": "id", "Barkod No": "barkod_no", "Bölge": "bolge", "Personel Ad Soyad": "personel_ad_soyad",
+                     "Sicil No": "personel_sicil_no", "Cihaz Tipi": "cihaz_tipi", "Seri No": "cihaz_seri_no",
+                     "Gönderim Tarihi": "servis_gonderim_tarihi", "Gelme Tarihi": "servis_gelme_tarihi",
+                     "Durum": "cihaz_durumu", "Açıklama": "aciklama", "Belge Sayısı": "belge_sayisi"}
+SORGU_ISLEM_ADLARI = {"=": "eşittir", "!=": "eşit değil", "onek": "ile başlar", "icerir": "içerir",
+                      "icinde": "listede (a, b, ...)", "aralik": "arasında (alt..üst)", "bos": "boş", "dolu": "dolu"}
+SORGU_BAGLACLARI = {"VE": "ve", "VEYA": "veya"}
+
+# Veritabanındaki ISO tarih (YYYY-AA-GG) yalnızca ekranda gg.aa.yyyy olarak gösterilir
+def tarih_goster(deger):
+    if deger and len(deger) == 10 and deger[4] == "-":
+        return f"{deger[8:10]}.{deger[5:7]}.{deger[:4]}"
+    return deger
+
+# Liste sütunları: tarih sütunları (7, 8) görüntü biçimine çevrilir
+def liste_degerleri(cihaz):
+    return cihaz[:7] + (tarih_goster(cihaz[7]), tarih_goster(cihaz[8])) + tuple(cihaz[9:])
+
+# Veritabanı işleri tek bir iş parçacığında (bağlantının sahibi) sırayla, dosya işleri ise bir havuzda çalışır.
+# Sonuçlar kuyruğa yazılır ve root.after ile ana döngüde tamamlandi/hata geri çağrılarına iletilir.
+class GorevYurutucu:
+    def __init__(self, root, db_fabrikasi, db_hatasi=None):
+        self.root = root
+        self.db_havuzu = ThreadPoolExecutor(max_workers=1, thread_name_prefix="servis-db")
+        self.dosya_havuzu = ThreadPoolExecutor(max_workers=DOSYA_IS_PARCACIGI, thread_name_prefix="servis-dosya")
+        self.sonuc_kuyrugu = queue.Queue()
+        self.aktif_gorevler = []
+        self.degisiklik_dinleyici = None
+        self.veri_dinleyici = None
+        self.son_gecikme_ms = 0.0
+        self.max_gecikme_ms = 0.0
+        self._son_nabiz = None
+        self._kapaniyor = False
+        self._kuyrugu_isle()
+        self._nabiz()
+        # Bağlantı (ve gerekirse şema geçişi) ilk veritabanı görevi olarak açılır; pencere bunu beklemez.
+        # Sonraki görevler aynı iş parçacığında sırayla çalıştığı için her zaman açılmış bağlantıyı görür.
+        self.db = None
+        self.db_gorevi(lambda gorev: self._db_ac(db_fabrikasi), hata=db_hatasi)
+
+    # Veritabanı değişiklik olayları iş parçacığında üretilir; kuyruk üzerinden ana döngüye taşınır
+    def _db_ac(self, db_fabrikasi):
+        db = db_fabrikasi()
+        db.degisiklik_dinleyicileri.append(lambda *olay: self.sonuc_kuyrugu.put(("degisiklik", None, olay)))
+        self.db = db
+
+    # olcum: arayüz işleminin süresi bu adla kaydedilir; birden çok adımlı işlemlerde son adıma, tıklama anı
+    # baslangic olarak verilir
+    def db_gorevi(self, is_fn, tamamlandi=None, hata=None, ad=None, olcum=None, baslangic=None):
+        return self._gonder(self.db_havuzu, is_fn, tamamlandi, hata, ad, olcum, baslangic)
+
+    def dosya_gorevi(self, is_fn, tamamlandi=None, hata=None, ad=None, olcum=None, baslangic=None):
+        return self._gonder(self.dosya_havuzu, is_fn, tamamlandi, hata, ad, olcum, baslangic)
+
+    def _gonder(self, havuz, is_fn, tamamlandi, hata, ad, olcum=None, baslangic=None):
+        gorev = Gorev(self, ad, tamamlandi, hata, olcum, baslangic)
+        self.aktif_gorevler.append(gorev)
+        gorev.future = havuz.submit(self._calistir, gorev, is_fn)
+        self._bildir()
+        return gorev
+
+    def _calistir(self, gorev, is_fn):
         try:
-            veriler["cihaz_belgeleri"] = json.dumps(veriler["cihaz_belgeleri"])
-            self.cursor.execute('''
-                INSERT INTO cihazlar (
-                    barkod_no, bolge, personel_ad_soyad, personel_sicil_no, 
-                    cihaz_tipi, cihaz_seri_no, servis_gonderim_tarihi, 
-                    servis_gelme_tarihi, cihaz_durumu, aciklama, cihaz_belgeleri
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                veriler['barkod_no'], veriler['bolge'], veriler['personel_ad_soyad'], 
-                veriler['personel_sicil_no'], veriler['cihaz_tipi'], veriler['cihaz_seri_no'], 
-                veriler['servis_gonderim_tarihi'], veriler['servis_gelme_tarihi'], 
-                veriler['cihaz_durumu'], veriler['aciklama'], veriler['cihaz_belgeleri']
-            ))
-            self.conn.commit()
-            if settings["log_enabled"]:
-                logging.info(f"Cihaz kaydedildi: {veriler['barkod_no']} (Tarih: {veriler['servis_gonderim_tarihi']})")
-            return self.cursor.lastrowid
-        except sqlite3.Error as e:
-            if settings["log_enabled"]:
-                logging.error(f"Veritabanı hatası (insert_cihaz): {e}")
-            return False
-
-    def update_cihaz(self, veriler, id):
-        try:
-            veriler["cihaz_belgeleri"] = json.dumps(veriler["cihaz_belgeleri"])
-            self.cursor.execute('''
-                UPDATE cihazlar SET 
-                    barkod_no = ?, bolge = ?, personel_ad_soyad = ?, personel_sicil_no = ?, 
-                    cihaz_tipi = ?, cihaz_seri_no = ?, servis_gonderim_tarihi = ?, 
-                    servis_gelme_tarihi = ?, cihaz_durumu = ?, aciklama = ?, 
-                    cihaz_belgeleri = ? 
-                WHERE id = ?
-            ''', (
-                veriler['barkod_no'], veriler['bolge'], veriler['personel_ad_soyad'], 
-                veriler['personel_sicil_no'], veriler['cihaz_tipi'], veriler['cihaz_seri_no'], 
-                veriler['servis_gonderim_tarihi'], veriler['servis_gelme_tarihi'], 
-                veriler['cihaz_durumu'], veriler['aciklama'], veriler['cihaz_belgeleri'], id
-            ))
-            self.conn.commit()
-            if settings["log_enabled"]:
-                logging.info(f"Cihaz güncellendi: ID {id}")
-            return True
-        except sqlite3.Error as e:
-            if settings["log_enabled"]:
-                logging.error(f"Güncelleme hatası (update_cihaz): {e}")
-            return False
-
-    def delete_cihaz(self, id):
-        self.cursor.execute("DELETE FROM cihazlar WHERE id = ?", (id,))
-        self.conn.commit()
-        if settings["log_enabled"]:
-            logging.info(f"Cihaz silindi: ID {id}")
-
-    def fetch_cihaz_by_id(self, id):
-        self.cursor.execute("SELECT * FROM cihazlar WHERE id = ?", (id,))
-        cihaz = self.cursor.fetchone()
-        if cihaz:
-            cihaz = list(cihaz)
-            cihaz[11] = json.loads(cihaz[11]) if cihaz[11] else []
-            return tuple(cihaz)
-        return None
-
-    def fetch_cihazlar_by_barkod(self, barkod_no):
-        self.cursor.execute("SELECT * FROM cihazlar WHERE barkod_no = ?", (barkod_no,))
-        rows = self.cursor.fetchall()
-        return [tuple(list(row)[:-1] + [json.loads(row[-1]) if row[-1] else []]) for row in rows]
-
-    def fetch_all(self, filtre=""):
-        if filtre:
-            self.cursor.execute("SELECT * FROM cihazlar WHERE barkod_no LIKE ? OR personel_ad_soyad LIKE ?",
-                               (f"%{filtre}%", f"%{filtre}%"))
-        else:
-            self.cursor.execute("SELECT * FROM cihazlar")
-        rows = self.cursor.fetchall()
-        return [tuple(list(row)[:-1] + [json.loads(row[-1]) if row[-1] else []]) for row in rows]
-
-    def advanced_search(self, filtreler):
-        query = "SELECT * FROM cihazlar WHERE 1=1"
-        params = []
-        if filtreler.get("barkod_no"):
-            query += " AND barkod_no LIKE ?"
-            params.append(f"%{filtreler['barkod_no']}%")
-        if filtreler.get("cihaz_durumu"):
-            query += " AND cihaz_durumu = ?"
-            params.append(filtreler["cihaz_durumu"])
-        self.cursor.execute(query, params)
-        rows = self.cursor.fetchall()
-        return [tuple(list(row)[:-1] + [json.loads(row[-1]) if row[-1] else []]) for row in rows]
-
-    def close(self):
-        self.conn.close()
+            gorev.iptal_kontrol()
+            self.sonuc_kuyrugu.put(("bitti", gorev, is_fn(gorev)))
+        except GorevIptalEdildi:
+            self.sonuc_kuyrugu.put(("iptal", gorev, None))
+        except Exception as e:
+            self.sonuc_kuyrugu.put(("hata", gorev, e))
+
+    def _kuyrugu_isle(self):
+        while True:
+            try:
+                tur, gorev, deger = self.sonuc_kuyrugu.get_nowait()
+            except queue.Empty:
+                break
+            if tur == "ilerleme":
+                gorev.oran, gorev.mesaj = deger
+                self._bildir()
+                continue
+            if tur == "degisiklik":
+                if self.veri_dinleyici:
+                    self.veri_dinleyici(*deger)
+                continue
+            if gorev in self.aktif_gorevler:
+                self.aktif_gorevler.remove(gorev)
+            self._bildir()
+            # Geri çağrıdan önce kaydedilir: sonuç iletisi gibi kalıcı pencerelerde kullanıcının beklemesi sayılmaz
+            if gorev.olcum and tur != "iptal" and olcumler.etkin:
+                olcumler.kaydet(gorev.olcum, (time.perf_counter() - gorev.baslangic) * 1000)
+            if tur == "bitti" and gorev.tamamlandi:
+                gorev.tamamlandi(deger)
+            elif tur == "hata":
+                log.error("Arka plan görevi hatası (%s): %s", gorev.ad or "adsız", deger, exc_info=deger)
+                if gorev.hata:
+                    gorev.hata(deger)
+            elif tur == "iptal":
+                log.info("Görev iptal edildi: %s", gorev.ad or "adsız")
+        if not self._kapaniyor:
+            self.root.after(20, self._kuyrugu_isle)
+
+    # Olay döngüsü gecikmesi: zamanlayıcının beklenenden ne kadar geç çalıştığı
+    def _nabiz(self):
+        simdi = time.perf_counter()
+        if self._son_nabiz is not None:
+            self.son_gecikme_ms = max(0.0, (simdi - self._son_nabiz) * 1000 - NABIZ_ARALIGI_MS)
+            self.max_gecikme_ms = max(self.max_gecikme_ms, self.son_gecikme_ms)
+            if self.son_gecikme_ms > BLOKAJ_ESIGI_MS:
+                log.warning("Arayüz %.0f ms bloke oldu", self.son_gecikme_ms)
+            if olcumler.etkin:
+                olcumler.kaydet("arayuz.olay_dongusu_gecikmesi", self.son_gecikme_ms)
+            self._bildir()
+        self._son_nabiz = simdi
+        if not self._kapaniyor:
+            self.root.after(NABIZ_ARALIGI_MS, self._nabiz)
+
+    def _bildir(self):
+        if self.degisiklik_dinleyici:
+            self.degisiklik_dinleyici()
+
+    def gorunur_gorevler(self):
+        return [g for g in self.aktif_gorevler if g.ad]
+
+    def iptal_et(self):
+        for gorev in self.gorunur_gorevler():
+            gorev.iptal_et()
+
+    def kapat(self):
+        self._kapaniyor = True
+        for gorev in list(self.aktif_gorevler):
+            gorev.iptal_et()
+        self.dosya_havuzu.shutdown(wait=True)
+        self.db_havuzu.submit(lambda: self.db and self.db.close()).result()
+        self.db_havuzu.shutdown(wait=True)
 
 class ServisTakipUygulamasi:
     def __init__(self):
+        self.acilis_baslangici = time.perf_counter()
+        self.ilk_kare_ms = None
+        self.ilk_liste_ms = None
         self.root = tk.Tk()
-        os.makedirs("belgeler", exist_ok=True)
-        self.db = DatabaseManager()
+        os.makedirs(BELGE_KLASORU, exist_ok=True)
+        self.depo = BelgeDeposu()
+        self.db_name = VARSAYILAN_VERITABANI
+        self.yurutucu = GorevYurutucu(self.root, lambda: DatabaseManager(self.db_name),
+                                      db_hatasi=lambda e: self.gorev_hatasi("Veritabanı açılamadı", e))
+        self.liste_sorgusu = {"filtre": "", "filtreler": None, "id_sirali": False, "siralama": None}
+        self.siralama = None
+        self.liste_imleci = None
+        self.bellek_satirlari = None
+        self.canli_arama = CanliArama()
+        self.son_arama = ""
+        self.arama_zamanlayici = None
+        self.arama_gorevi = None
+        self.liste_nesli = 0
+        self.liste_bitti = True
+        self.sayfa_bekliyor = False
+        self.son_durum = "Hazır"
         self.setup_main_window()
+        self.yurutucu.degisiklik_dinleyici = self.gorev_durumunu_goster
+        self.yurutucu.veri_dinleyici = self.kayit_degisti
+
+    # Bağlantı veritabanı iş parçacığına aittir; self.db yalnızca yurutucu.db_gorevi içinden kullanılır
+    @property
+    def db(self):
+        return self.yurutucu.db
+
+    # Pencere ilk kez çizildikten sonra: tarih seçiciler oluşturulur ve ilk liste yüklenir
+    def _ilk_kare(self, event):
+        if self.ilk_kare_ms is not None:
+            return
+        self.ilk_kare_ms = (time.perf_counter() - self.acilis_baslangici) * 1000
+        self.root.after_idle(self._acilisi_tamamla)
+
+    def _acilisi_tamamla(self):
+        self._tarih_alanlarini_olustur()
+        self.tum_cihazlari_listele()
+
+    # tkcalendar ilk çizimi geciktirmemek için burada yüklenir; o ana kadar alanlarda düz metin kutusu durur
+    def _tarih_alanlarini_olustur(self):
+        from tkcalendar import DateEntry
+        for key, yer_tutucu in list(self.entries.items()):
+            if not getattr(yer_tutucu, "tarih_alani", False):
+                continue
+            entry = DateEntry(yer_tutucu.master, date_pattern="dd.mm.yyyy", width=15)
+            try:
+                entry.set_date(datetime.datetime.strptime(yer_tutucu.get(), TARIH_BICIMI))
+            except ValueError:
+                entry.set_date(datetime.datetime.now())
+            entry.grid(**yer_tutucu.grid_info())
+            entry.lift(yer_tutucu)  # sekme (Tab) sırası yığın sırasını izler; alan yerinde kalmalı
+            yer_tutucu.destroy()
+            self.entries[key] = entry
 
     def create_input_fields(self, frame, alanlar):
         self.entries = {}
         for i, (label, key, widget_type, *args) in enumerate(alanlar):
             ttk.Label(frame, text=label).grid(row=i, column=0, sticky="e", padx=5, pady=5)
-            if widget_type == DateEntry:
-                entry = DateEntry(frame, date_pattern="dd.mm.yyyy", width=15)
-                entry.set_date(datetime.datetime.now())
+            if widget_type == "tarih":
+                entry = ttk.Entry(frame, width=17)
+                entry.insert(0, datetime.datetime.now().strftime(TARIH_BICIMI))
+                entry.tarih_alani = True
             elif widget_type == ttk.Combobox:
                 entry = ttk.Combobox(frame, values=args[0])
                 entry.set(args[0][0])
@@ -195,8 +264,7 @@ class ServisTakipUygulamasi:
                 icon = tk.PhotoImage(file="app_icon.png")
                 self.root.iconphoto(True, icon)
         except Exception as e:
-            if settings["log_enabled"]:
-                logging.warning(f"İkon yüklenirken hata oluştu: {e}")
+            log.warning("İkon yüklenirken hata oluştu: %s", e)
 
         # Menü çubuğu
         menubar = Menu(self.root)
@@ -204,6 +272,19 @@ class ServisTakipUygulamasi:
         settings_menu = Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Ayarlar", menu=settings_menu)
         settings_menu.add_command(label="Ayarları Aç", command=self.show_settings)
+        settings_menu.add_separator()
+        settings_menu.add_command(label="Eski Belgeleri Depoya Taşı", command=self.eski_belgeleri_tasi)
+        settings_menu.add_command(label="Kullanılmayan Belgeleri Temizle", command=self.belge_deposunu_temizle)
+        settings_menu.add_command(label="Eski Belgeleri Arşivle", command=self.belgeleri_arsivle)
+        settings_menu.add_command(label="Arşivi Doğrula", command=self.arsivi_dogrula)
+        settings_menu.add_command(label="Belge Tutarlılık Taraması", command=self.belge_taramasi)
+        settings_menu.add_separator()
+        settings_menu.add_command(label="Yedek Al", command=self.yedek_baslat)
+        settings_menu.add_command(label="Son Yedeği Doğrula", command=self.son_yedegi_dogrula)
+        rapor_menu = Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Raporlar", menu=rapor_menu)
+        rapor_menu.add_command(label="İstatistikler", command=self.istatistikleri_goster)
+        rapor_menu.add_command(label="Performans Paneli", command=self.performans_paneli)
 
         style = ttk.Style()
         style.theme_use("clam")
@@ -219,7 +300,10 @@ class ServisTakipUygulamasi:
         search_frame = ttk.Frame(main_frame)
         search_frame.pack(fill="x", pady=5)
         self.search_var = tk.StringVar()
-        ttk.Entry(search_frame, textvariable=self.search_var, width=30).pack(side="left", padx=5)
+        self.search_var.trace_add("write", self._arama_degisti)
+        arama_kutusu = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
+        arama_kutusu.pack(side="left", padx=5)
+        arama_kutusu.bind("<Return>", lambda e: self.simple_search())
         ttk.Button(search_frame, text="Ara", command=self.simple_search).pack(side="left")
 
         input_frame = ttk.LabelFrame(main_frame, text="Cihaz Bilgileri", padding="10")
@@ -228,12 +312,12 @@ class ServisTakipUygulamasi:
             ("Bölge:", "bolge", ttk.Entry),
             ("Personel Ad Soyad:", "personel_ad_soyad", ttk.Entry),
             ("Personel Sicil No:", "personel_sicil_no", ttk.Entry),
-            ("Cihaz Tipi:", "cihaz_tipi", ttk.Combobox, ["Laptop", "SIM Kart", "Tablet", "El Terminali","Masaüstü Bilgisayar","PC Monitör","Mobil Yazıcı","PC Yazıcı","UPS"]),
+            ("Cihaz Tipi:", "cihaz_tipi", ttk.Combobox, CIHAZ_TIPLERI),
             ("Barkod No*:", "barkod_no", ttk.Entry),
             ("Cihaz Seri No:", "cihaz_seri_no", ttk.Entry),
-            ("Servis Gönderim Tarihi:", "servis_gonderim_tarihi", DateEntry),
-            ("Servis Gelme Tarihi:", "servis_gelme_tarihi", DateEntry),
-            ("Cihaz Durumu:", "cihaz_durumu", ttk.Combobox, ["Serviste", "Servise Gönderildi", "Tamir edildi","Tamir olmuyor","Hurda"]),
+            ("Servis Gönderim Tarihi:", "servis_gonderim_tarihi", "tarih"),
+            ("Servis Gelme Tarihi:", "servis_gelme_tarihi", "tarih"),
+            ("Cihaz Durumu:", "cihaz_durumu", ttk.Combobox, CIHAZ_DURUMLARI),
             ("Açıklama:", "aciklama", tk.Text),
         ]
         self.create_input_fields(input_frame, alanlar)
@@ -258,15 +342,30 @@ class ServisTakipUygulamasi:
         ttk.Button(btn_frame, text="Sil", command=self.cihaz_sil, style="Danger.TButton").pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Tüm Cihazları Göster", command=self.tum_cihazlari_listele, style="Primary.TButton").pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Excel'e Aktar", command=self.export_to_excel).pack(side="left", padx=5)
+        # Komut satırındaki export --analiz karşılığı; analiz tüm sorgu üzerinde ikinci bir toplama geçişidir
+        self.analizli_aktar = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="Analiz Sayfalarıyla", variable=self.analizli_aktar).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Excel'den İçe Aktar", command=self.import_from_excel).pack(side="left", padx=5)
+
+        durum_frame = ttk.Frame(main_frame)
+        durum_frame.pack(side="bottom", fill="x")
+        self.ilerleme_cubugu = ttk.Progressbar(durum_frame, length=200, mode="determinate", maximum=100)
+        self.ilerleme_cubugu.pack(side="left", padx=5)
+        self.ilerleme_label = ttk.Label(durum_frame, text="Hazır")
+        self.ilerleme_label.pack(side="left", padx=5)
+        self.iptal_btn = ttk.Button(durum_frame, text="İptal", command=self.yurutucu.iptal_et, state="disabled")
+        self.iptal_btn.pack(side="left", padx=5)
+        self.gecikme_label = ttk.Label(durum_frame, text="")
+        self.gecikme_label.pack(side="right", padx=5)
 
         tree_frame = ttk.Frame(main_frame)
         tree_frame.pack(fill="both", expand=True, pady=10)
 
-        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", style="Vertical.TScrollbar")
-        scrollbar.pack(side="right", fill="y")
+        self.tree_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", style="Vertical.TScrollbar")
+        self.tree_scrollbar.pack(side="right", fill="y")
 
         self.tree = ttk.Treeview(tree_frame, columns=("ID", "Barkod", "Bolge", "Personel", "Sicil", "Tip", "Seri", "Gonderim", "Gelme", "Durum", "Aciklama", "Belge"), 
-                                 show="headings", yscrollcommand=scrollbar.set)
+                                 show="headings", yscrollcommand=self.on_tree_scroll)
         self.tree.heading("ID", text="Kayıt ID", anchor="center")
         self.tree.heading("Barkod", text="Barkod No", anchor="center")
         self.tree.heading("Bolge", text="Bölge", anchor="center")
@@ -292,12 +391,15 @@ class ServisTakipUygulamasi:
         self.tree.column("Aciklama", width=150, anchor="center")
         self.tree.column("Belge", width=80, anchor="center")
         self.tree.pack(fill="both", expand=True)
+        self.baslik_metinleri = {kolon: self.tree.heading(kolon, "text") for kolon in LISTE_SIRALAMALARI}
+        for kolon in LISTE_SIRALAMALARI:
+            self.tree.heading(kolon, command=lambda kolon=kolon: self.siralamayi_degistir(kolon))
 
         style.configure("Treeview", background="#ffffff", fieldbackground="#ffffff", font=("Helvetica", 10))
         style.configure("Treeview.Heading", background="#2c3e50", foreground="white", font=("Helvetica", 11, "bold"))
         self.tree.tag_configure("all", background="#ffffff", foreground="#333333")
 
-        scrollbar.config(command=self.tree.yview)
+        self.tree_scrollbar.config(command=self.tree.yview)
 
         style.configure("Success.TButton", background="#28a745")
         style.configure("Info.TButton", background="#007bff")
@@ -317,12 +419,32 @@ class ServisTakipUygulamasi:
         self.tree.bind("<Double-1>", self.on_tree_double_click)
 
         self.root.protocol("WM_DELETE_WINDOW", self.kapat)
-        self.tum_cihazlari_listele()
+        self.root.bind("<Expose>", self._ilk_kare, add="+")
+
+    def gorev_durumunu_goster(self):
+        gorevler = self.yurutucu.gorunur_gorevler()
+        if gorevler:
+            gorev = gorevler[-1]
+            self.ilerleme_cubugu["value"] = (gorev.oran or 0) * 100
+            metin = gorev.ad + (f": {gorev.mesaj}" if gorev.mesaj else "")
+            if len(gorevler) > 1:
+                metin += f" (+{len(gorevler) - 1} görev)"
+            self.ilerleme_label.config(text=metin)
+            self.iptal_btn.config(state="normal")
+        else:
+            self.ilerleme_cubugu["value"] = 0
+            self.ilerleme_label.config(text=self.son_durum)
+            self.iptal_btn.config(state="disabled")
+        self.gecikme_label.config(text=f"Arayüz gecikmesi: {self.yurutucu.son_gecikme_ms:.0f} ms "
+                                       f"(en fazla {self.yurutucu.max_gecikme_ms:.0f} ms)")
+
+    def gorev_hatasi(self, mesaj, e):
+        messagebox.showerror("Hata", f"{mesaj}: {e}")
 
     def show_settings(self):
         settings_win = tk.Toplevel(self.root)
         settings_win.title("Ayarlar")
-        settings_win.geometry("400x200")
+        settings_win.geometry("400x300")
         settings_win.configure(bg="#f0f0f0")
         settings_win.resizable(False, False)
 
@@ -339,8 +461,22 @@ class ServisTakipUygulamasi:
         self.log_file_entry.insert(0, settings["log_file"])
         ttk.Button(settings_frame, text="Dosya Seç", command=self.select_log_file).grid(row=1, column=2, padx=5, pady=5)
 
-        ttk.Button(settings_frame, text="Kaydet", command=lambda: self.save_settings_from_ui(log_var)).grid(row=2, column=0, pady=10)
-        ttk.Button(settings_frame, text="Kapat", command=settings_win.destroy).grid(row=2, column=1, pady=10)
+        ttk.Label(settings_frame, text="Log Seviyesi:").grid(row=2, column=0, padx=5, pady=5, sticky="e")
+        self.log_level_combo = ttk.Combobox(settings_frame, values=LOG_SEVIYELERI, state="readonly", width=12)
+        self.log_level_combo.grid(row=2, column=1, padx=5, pady=5, sticky="w")
+        self.log_level_combo.set(settings["log_level"])
+
+        olcum_var = tk.BooleanVar(value=olcumler.etkin)
+        ttk.Checkbutton(settings_frame, text="Performans Ölçümü", variable=olcum_var,
+                        command=lambda: self.toggle_olcum(olcum_var)).grid(row=3, column=0, columnspan=2, pady=5, sticky="w")
+        ttk.Label(settings_frame, text="Yavaş Sorgu Eşiği (ms):").grid(row=4, column=0, padx=5, pady=5, sticky="e")
+        self.yavas_sorgu_entry = ttk.Entry(settings_frame, width=10)
+        self.yavas_sorgu_entry.grid(row=4, column=1, padx=5, pady=5, sticky="w")
+        self.yavas_sorgu_entry.insert(0, f"{olcumler.yavas_sorgu_ms:g}")
+
+        ttk.Button(settings_frame, text="Kaydet",
+                   command=lambda: self.save_settings_from_ui(log_var, olcum_var)).grid(row=5, column=0, pady=10)
+        ttk.Button(settings_frame, text="Kapat", command=settings_win.destroy).grid(row=5, column=1, pady=10)
 
     def toggle_logging(self, log_var):
         settings["log_enabled"] = log_var.get()
@@ -350,6 +486,10 @@ class ServisTakipUygulamasi:
         else:
             messagebox.showinfo("Bilgi", "Loglama devre dışı bırakıldı.")
 
+    def toggle_olcum(self, olcum_var):
+        settings.setdefault("olcum", {})["etkin"] = olcum_var.get()
+        olcumler.yapilandir()
+
     def select_log_file(self):
         file_path = filedialog.asksaveasfilename(defaultextension=".log", 
                                                 filetypes=[("Log Dosyaları", "*.log"), ("Tüm Dosyalar", "*.*")],
@@ -358,11 +498,19 @@ class ServisTakipUygulamasi:
             self.log_file_entry.delete(0, tk.END)
             self.log_file_entry.insert(0, file_path)
 
-    def save_settings_from_ui(self, log_var):
+    def save_settings_from_ui(self, log_var, olcum_var):
+        try:
+            yavas_sorgu_ms = float(self.yavas_sorgu_entry.get().replace(",", "."))
+        except ValueError:
+            messagebox.showwarning("Hata", "Yavaş sorgu eşiği bir sayı olmalı!")
+            return
         settings["log_enabled"] = log_var.get()
         settings["log_file"] = self.log_file_entry.get()
+        settings["log_level"] = self.log_level_combo.get()
+        settings["olcum"] = {"etkin": olcum_var.get(), "yavas_sorgu_ms": yavas_sorgu_ms}
         save_settings()
         configure_logging()
+        olcumler.yapilandir()
         messagebox.showinfo("Başarılı", "Ayarlar kaydedildi!")
 
     def on_tree_double_click(self, event):
@@ -375,8 +523,12 @@ class ServisTakipUygulamasi:
             messagebox.showwarning("Hata", "Lütfen bir cihaz seçin!")
 
     def load_cihaz_to_entries(self, id):
+        self.yurutucu.db_gorevi(lambda gorev: self.db.fetch_cihaz_by_id(id),
+                                tamamlandi=lambda cihaz: self._cihazi_alanlara_yaz(id, cihaz),
+                                hata=lambda e: self.gorev_hatasi("Cihaz bilgileri yüklenemedi", e))
+
+    def _cihazi_alanlara_yaz(self, id, cihaz):
         try:
-            cihaz = self.db.fetch_cihaz_by_id(id)
             if cihaz:
                 self.entries["barkod_no"].delete(0, tk.END)
                 self.entries["barkod_no"].insert(0, cihaz[1] or "")
@@ -389,8 +541,8 @@ class ServisTakipUygulamasi:
                 self.entries["cihaz_tipi"].set(cihaz[5] or "")
                 self.entries["cihaz_seri_no"].delete(0, tk.END)
                 self.entries["cihaz_seri_no"].insert(0, cihaz[6] or "")
-                self.entries["servis_gonderim_tarihi"].set_date(datetime.datetime.strptime(cihaz[7], "%d.%m.%Y") if cihaz[7] else datetime.datetime.now())
-                self.entries["servis_gelme_tarihi"].set_date(datetime.datetime.strptime(cihaz[8], "%d.%m.%Y") if cihaz[8] else datetime.datetime.now())
+                self.entries["servis_gonderim_tarihi"].set_date(datetime.date.fromisoformat(cihaz[7]) if cihaz[7] else datetime.date.today())
+                self.entries["servis_gelme_tarihi"].set_date(datetime.date.fromisoformat(cihaz[8]) if cihaz[8] else datetime.date.today())
                 self.entries["cihaz_durumu"].set(cihaz[9] or "")
                 self.entries["aciklama"].delete("1.0", tk.END)
                 self.entries["aciklama"].insert("1.0", cihaz[10] or "")
@@ -400,8 +552,7 @@ class ServisTakipUygulamasi:
             else:
                 messagebox.showwarning("Hata", f"ID {id} için cihaz bulunamadı!")
         except Exception as e:
-            if settings["log_enabled"]:
-                logging.error(f"Cihaz yükleme hatası (ID: {id}): {e}")
+            log.error("Cihaz yükleme hatası (ID: %s): %s", id, e)
             messagebox.showerror("Hata", f"Cihaz bilgileri yüklenemedi: {e}")
 
     def check_aciklama_length(self, event):
@@ -412,11 +563,67 @@ class ServisTakipUygulamasi:
             self.entries["aciklama"].insert("1.0", content[:300])
 
     def simple_search(self):
-        filtre = self.search_var.get()
-        self.tree.delete(*self.tree.get_children())
-        for cihaz in self.db.fetch_all(filtre):
-            item = self.tree.insert("", "end", values=(cihaz[0],) + cihaz[1:-1] + (len(cihaz[11]),))
-            self.tree.item(item, tags=(cihaz[9],))
+        self._canli_aramayi_durdur()
+        self.son_arama = CanliArama.sorgu_metni(self.search_var.get())
+        self.listeyi_yukle(filtre=self.search_var.get())
+
+    # Canlı arama: tuş vuruşları ARAMA_GECIKMESI_MS boyunca biriktirilir. Sorgu bellekteki tam sonuç kümesinden
+    # daraltılabiliyorsa veritabanına gidilmez; aksi halde önceki arama görevi iptal edilir ve yenisi gönderilir.
+    # Geç gelen eski sonuçlar liste nesli ile ayıklanır.
+    def _arama_degisti(self, *args):
+        if self.arama_zamanlayici:
+            self.root.after_cancel(self.arama_zamanlayici)
+        self.arama_zamanlayici = self.root.after(ARAMA_GECIKMESI_MS, self.canli_ara)
+
+    def _canli_aramayi_durdur(self):
+        if self.arama_zamanlayici:
+            self.root.after_cancel(self.arama_zamanlayici)
+            self.arama_zamanlayici = None
+        if self.arama_gorevi:
+            self.arama_gorevi.iptal_et()
+            self.arama_gorevi = None
+
+    def canli_ara(self):
+        self.arama_zamanlayici = None
+        metin = CanliArama.sorgu_metni(self.search_var.get())
+        if metin == self.son_arama:
+            return
+        self.son_arama = metin
+        self._canli_aramayi_durdur()
+        if not metin:
+            self.listeyi_yukle()
+            return
+        satirlar = self.canli_arama.daralt(metin)
+        if satirlar is not None:
+            self._listeyi_sifirla(CanliArama.liste_sorgusu(self.canli_arama.kip, metin), satirlar)
+            self.sonraki_sayfayi_yukle()
+            return
+
+        # Sonuç kümesi iş parçacığında belirteçlere ayrılır; ana döngüdeki nesne yalnızca sonuç gelince değiştirilir
+        siralama = self.siralama
+
+        def ara(gorev):
+            kip, satirlar, tam, sorgu, imlec = self.db.canli_arama(metin, siralama=siralama)
+            gorev.iptal_kontrol()
+            arama = CanliArama()
+            arama.kaydet(metin, kip, satirlar, tam)
+            return arama, satirlar, tam, sorgu, imlec
+
+        self.liste_nesli += 1
+        nesil = self.liste_nesli
+        self.arama_gorevi = self.yurutucu.db_gorevi(ara, tamamlandi=lambda sonuc: self._arama_geldi(nesil, *sonuc),
+                                                    hata=lambda e: self._sayfa_hatasi(nesil, e))
+
+    def _arama_geldi(self, nesil, arama, satirlar, tam, sorgu, imlec):
+        if nesil != self.liste_nesli:
+            return
+        self.canli_arama = arama
+        if tam:
+            self._listeyi_sifirla(sorgu, satirlar)
+            self.sonraki_sayfayi_yukle()
+        else:
+            self._listeyi_sifirla(sorgu)
+            self._sayfa_geldi(self.liste_nesli, satirlar, imlec)
 
     def dosyalar_sec(self):
         dosyalar = filedialog.askopenfilenames(filetypes=[("Tüm Dosyalar", "*.*")])
@@ -430,7 +637,11 @@ class ServisTakipUygulamasi:
             messagebox.showwarning("Hata", "Lütfen bir barkod numarası girin!")
             return
 
-        cihazlar = self.db.fetch_cihazlar_by_barkod(barkod_no)
+        self.yurutucu.db_gorevi(lambda gorev: self.db.fetch_cihazlar_by_barkod(barkod_no),
+                                tamamlandi=lambda cihazlar: self._belge_penceresi(barkod_no, cihazlar),
+                                hata=lambda e: self.gorev_hatasi("Belgeler yüklenemedi", e), olcum="arayuz.show_belgeler")
+
+    def _belge_penceresi(self, barkod_no, cihazlar):
         if not cihazlar:
             messagebox.showinfo("Bilgi", "Bu barkod numarasına ait cihaz bulunamadı!")
             return
@@ -450,8 +661,8 @@ class ServisTakipUygulamasi:
         tree.pack(fill="both", expand=True, padx=10, pady=10)
 
         for cihaz in cihazlar:
-            for belge in cihaz[11]:
-                tree.insert("", "end", values=(cihaz[0], cihaz[7], os.path.basename(belge)))
+            for _, dosya_adi in cihaz[11]:
+                tree.insert("", "end", values=(cihaz[0], cihaz[7], dosya_adi))
 
         def open_belge():
             selected = tree.selection()
@@ -459,12 +670,12 @@ class ServisTakipUygulamasi:
                 id, _, dosya_adi = tree.item(selected[0])["values"]
                 for cihaz in cihazlar:
                     if cihaz[0] == id:
-                        for belge in cihaz[11]:
-                            if os.path.basename(belge) == dosya_adi:
+                        for belge, ad in cihaz[11]:
+                            if ad == dosya_adi:
                                 if os.path.exists(belge):
                                     os.startfile(belge)
                                 else:
-                                    messagebox.showwarning("Hata", "Belge bulunamadı!")
+                                    self._arsivden_ac(belge)
                                 break
                         break
 
@@ -475,19 +686,16 @@ class ServisTakipUygulamasi:
                 for cihaz in cihazlar:
                     if cihaz[0] == id:
                         belgeler = cihaz[11]
-                        for i, belge in enumerate(belgeler):
-                            if os.path.basename(belge) == dosya_adi:
+                        for i, (belge, ad) in enumerate(belgeler):
+                            if ad == dosya_adi:
                                 if messagebox.askyesno("Onay", f"'{dosya_adi}' belgesi silinsin mi?"):
-                                    belgeler.pop(i)
-                                    yeni_veriler = {
-                                        "barkod_no": cihaz[1], "bolge": cihaz[2], "personel_ad_soyad": cihaz[3],
-                                        "personel_sicil_no": cihaz[4], "cihaz_tipi": cihaz[5], "cihaz_seri_no": cihaz[6],
-                                        "servis_gonderim_tarihi": cihaz[7], "servis_gelme_tarihi": cihaz[8],
-                                        "cihaz_durumu": cihaz[9], "aciklama": cihaz[10], "cihaz_belgeleri": belgeler
-                                    }
-                                    self.db.update_cihaz(yeni_veriler, id)
-                                    tree.delete(selected[0])
-                                    self.tum_cihazlari_listele()
+                                    def silindi(sonuc, i=i, item=selected[0], belgeler=belgeler):
+                                        belgeler.pop(i)
+                                        tree.delete(item)
+
+                                    self.yurutucu.db_gorevi(lambda gorev: self.db.delete_belge(id, belge),
+                                                            tamamlandi=silindi,
+                                                            hata=lambda e: self.gorev_hatasi("Belge silinemedi", e))
                                 break
                         break
 
@@ -496,117 +704,121 @@ class ServisTakipUygulamasi:
         ttk.Button(btn_frame, text="Aç", command=open_belge).pack(side="left", padx=5)
         ttk.Button(btn_frame, text="Sil", command=delete_belge).pack(side="left", padx=5)
 
+    # Formdaki değerler; tarihler takvimden doğrudan ISO olarak alınır (tkcalendar yüklenmeden önce metin kutusundan)
+    def _form_verileri(self):
+        veriler = {}
+        for key, entry in self.entries.items():
+            if key == "aciklama":
+                veriler[key] = entry.get("1.0", tk.END).strip()
+            elif key in TARIH_ALANLARI and hasattr(entry, "get_date"):
+                veriler[key] = entry.get_date().isoformat()
+            else:
+                veriler[key] = entry.get()
+        return veriler
+
     def cihaz_kaydet(self):
+        baslangic = time.perf_counter()
         try:
-            veriler = {key: entry.get() for key, entry in self.entries.items() if key != "aciklama"}
-            veriler["aciklama"] = self.entries["aciklama"].get("1.0", tk.END).strip()
-            if not veriler["barkod_no"]:
-                messagebox.showwarning("Hata", "Barkod No zorunludur!")
-                return
-            if veriler["personel_sicil_no"] and not re.match(r"^\d{5,}$", veriler["personel_sicil_no"]):
-                messagebox.showwarning("Hata", "Personel Sicil No en az 5 rakam olmalı!")
+            veriler = self._form_verileri()
+            hata = kaydi_dogrula(veriler)
+            if hata:
+                log.error("Kayıt doğrulama hatası: %s", hata)
+                messagebox.showwarning("Hata", hata)
                 return
 
-            try:
-                gonderim = datetime.datetime.strptime(veriler["servis_gonderim_tarihi"], "%d.%m.%Y")
-                gelme = datetime.datetime.strptime(veriler["servis_gelme_tarihi"], "%d.%m.%Y")
-                if gonderim > gelme:
-                    messagebox.showwarning("Hata", "Gönderim tarihi, gelme tarihinden sonra olamaz!")
-                    return
-            except ValueError as e:
-                if settings["log_enabled"]:
-                    logging.error(f"Tarih formatı hatası: {e}")
-                messagebox.showerror("Hata", f"Tarih formatı hatalı: {e}")
-                return
+            dosyalar = list(self.secilen_dosyalar)
+            if dosyalar:
+                self.yurutucu.dosya_gorevi(lambda gorev: belgeleri_depoya_ekle(gorev, dosyalar, self.depo),
+                                           tamamlandi=lambda sonuc: self._kaydi_yaz(veriler, *sonuc, baslangic=baslangic),
+                                           hata=lambda e: self.gorev_hatasi("Belgeler kopyalanamadı", e),
+                                           ad="Belgeler kopyalanıyor")
+            else:
+                self._kaydi_yaz(veriler, [], [], baslangic=baslangic)
 
-            veriler["cihaz_belgeleri"] = []
-            cihaz_id = self.db.insert_cihaz(veriler)
-            if not cihaz_id:
+        except Exception as e:
+            log.error("Cihaz kaydetme hatası: %s", e)
+            messagebox.showerror("Hata", f"Beklenmedik bir hata oluştu: {e}")
+
+    # Kayıt ve belgeleri tek işlemde yazılır
+    def _kaydi_yaz(self, veriler, belgeler, hatalar, ozet=None, baslangic=None):
+        self.kopyalama_hatalarini_goster(hatalar, ozet)
+        veriler["cihaz_belgeleri"] = belgeler
+
+        def kaydedildi(cihaz_id):
+            if cihaz_id:
+                self._kayit_tamamlandi(cihaz_id)
+            else:
                 messagebox.showerror("Hata", "Cihaz veritabanına kaydedilemedi!")
-                return
 
-            belge_yollari = []
-            if self.secilen_dosyalar:
-                os.makedirs("belgeler", exist_ok=True)
-                for dosya in self.secilen_dosyalar:
-                    if not os.path.exists(dosya):
-                        messagebox.showwarning("Hata", f"Dosya bulunamadı: {dosya}")
-                        continue
-                    barkod_no_clean = re.sub(r'[<>:"/\\|?*]', '_', veriler['barkod_no'])
-                    seri_no_clean = re.sub(r'[<>:"/\\|?*]', '_', veriler['cihaz_seri_no'] or "bos")
-                    dosya_adi_clean = re.sub(r'[<>:"/\\|?*]', '_', os.path.basename(dosya))
-                    yeni_dosya_adi = f"{cihaz_id}_{barkod_no_clean}_{seri_no_clean}_{dosya_adi_clean}"
-                    yeni_dosya_yolu = os.path.join("belgeler", yeni_dosya_adi)
-                    try:
-                        shutil.copy(dosya, yeni_dosya_yolu)
-                        belge_yollari.append(yeni_dosya_yolu)
-                    except Exception as e:
-                        if settings["log_enabled"]:
-                            logging.error(f"Dosya kopyalama hatası: {e} (Dosya: {dosya})")
-                        messagebox.showwarning("Hata", f"Dosya kopyalanamadı: {dosya}")
-                        continue
-
-                if belge_yollari:
-                    veriler["cihaz_belgeleri"] = belge_yollari
-                    if not self.db.update_cihaz(veriler, cihaz_id):
-                        messagebox.showerror("Hata", "Belgeler güncellenemedi!")
-                        return
-
-            messagebox.showinfo("Başarılı", "Cihaz başarıyla kaydedildi!")
-            self.temizle()
-            self.tum_cihazlari_listele()
+        self.yurutucu.db_gorevi(lambda gorev: self.db.insert_cihaz(veriler), tamamlandi=kaydedildi,
+                                hata=lambda e: self.gorev_hatasi("Beklenmedik bir hata oluştu", e),
+                                ad="Cihaz kaydediliyor", olcum="arayuz.cihaz_kaydet", baslangic=baslangic)
 
-        except Exception as e:
-            if settings["log_enabled"]:
-                logging.error(f"Cihaz kaydetme hatası: {e}")
-            messagebox.showerror("Hata", f"Beklenmedik bir hata oluştu: {e}")
+    def _kayit_tamamlandi(self, cihaz_id):
+        messagebox.showinfo("Başarılı", "Cihaz başarıyla kaydedildi!")
+        self.temizle()
+        if self.tree.exists(cihaz_id):
+            self.tree.selection_set(cihaz_id)
+            self.tree.see(cihaz_id)
+
+    # Tüm hatalar tek bir özet penceresinde gösterilir
+    def kopyalama_hatalarini_goster(self, hatalar, ozet=None):
+        if ozet:
+            self.son_durum = ozet
+            self.gorev_durumunu_goster()
+        if not hatalar:
+            return
+        satirlar = [f"{os.path.basename(dosya)}: {mesaj}" for dosya, mesaj in hatalar[:HATA_OZETI_SATIRI]]
+        if len(hatalar) > HATA_OZETI_SATIRI:
+            satirlar.append(f"... ve {len(hatalar) - HATA_OZETI_SATIRI} dosya daha")
+        messagebox.showwarning("Uyarı", f"{len(hatalar)} dosya eklenemedi:\n\n" + "\n".join(satirlar))
 
+    # Ölçülen süre onay penceresine kadardır (kayıt okunur, belgeler kopyalanır); onaydan sonraki yazma
+    # "arayuz.durum_guncelle_onay" olarak ayrıca ölçülür
     def durum_guncelle(self):
         if not hasattr(self, "selected_id"):
             messagebox.showwarning("Hata", "Lütfen listeden bir cihaz seçin!")
             return
 
-        try:
-            yeni_veriler = {key: entry.get() for key, entry in self.entries.items() if key != "aciklama"}
-            yeni_veriler["aciklama"] = self.entries["aciklama"].get("1.0", tk.END).strip()
-            if yeni_veriler["personel_sicil_no"] and not re.match(r"^\d{5,}$", yeni_veriler["personel_sicil_no"]):
-                messagebox.showwarning("Hata", "Personel Sicil No en az 5 rakam olmalı!")
-                return
+        yeni_veriler = self._form_verileri()
+        hata = kaydi_dogrula(yeni_veriler, barkod_zorunlu=False)
+        if hata:
+            messagebox.showwarning("Hata", hata)
+            return
 
-            gonderim = datetime.datetime.strptime(yeni_veriler["servis_gonderim_tarihi"], "%d.%m.%Y")
-            gelme = datetime.datetime.strptime(yeni_veriler["servis_gelme_tarihi"], "%d.%m.%Y")
-            if gonderim > gelme:
-                messagebox.showwarning("Hata", "Gönderim tarihi, gelme tarihinden sonra olamaz!")
-                return
+        cihaz_id = self.selected_id
+        dosyalar = list(self.secilen_dosyalar)
+        baslangic = time.perf_counter()
+        self.yurutucu.db_gorevi(lambda gorev: self.db.fetch_cihaz_by_id(cihaz_id),
+                                tamamlandi=lambda mevcut: self._guncelleme_belgelerini_kopyala(cihaz_id, yeni_veriler, dosyalar, mevcut, baslangic),
+                                hata=lambda e: self.gorev_hatasi("Beklenmedik bir hata oluştu", e),
+                                olcum=None if dosyalar else "arayuz.durum_guncelle", baslangic=baslangic)
+
+    def _guncelleme_belgelerini_kopyala(self, cihaz_id, yeni_veriler, dosyalar, mevcut_cihaz, baslangic=None):
+        if not mevcut_cihaz:
+            messagebox.showwarning("Hata", f"ID {cihaz_id} için cihaz bulunamadı!")
+            return
+        if not dosyalar:
+            self._guncelleme_onayi(yeni_veriler, mevcut_cihaz, [], [])
+            return
+        self.yurutucu.dosya_gorevi(
+            lambda gorev: belgeleri_depoya_ekle(gorev, dosyalar, self.depo),
+            tamamlandi=lambda sonuc: self._guncelleme_onayi(yeni_veriler, mevcut_cihaz, *sonuc),
+            hata=lambda e: self.gorev_hatasi("Belgeler kopyalanamadı", e),
+            ad="Belgeler kopyalanıyor", olcum="arayuz.durum_guncelle", baslangic=baslangic)
+
+    def _guncelleme_onayi(self, yeni_veriler, mevcut_cihaz, yeni_belgeler, hatalar, ozet=None):
+        self.kopyalama_hatalarini_goster(hatalar, ozet)
+        try:
+            belge_yollari = {yol for yol, _ in mevcut_cihaz[11]}
+            eklenecek = []
+            for belge in yeni_belgeler:
+                if belge["dosya_yolu"] not in belge_yollari:  # Aynı içeriğin tekrar eklenmesini önle
+                    belge_yollari.add(belge["dosya_yolu"])
+                    eklenecek.append(belge)
+                log.info("Yeni belge eklendi: %s (%s)", belge["dosya_adi"], belge["dosya_yolu"])
 
-            mevcut_cihaz = self.db.fetch_cihaz_by_id(self.selected_id)
-            belge_yollari = mevcut_cihaz[11].copy()  # Mevcut belgelerin bir kopyasını al
-
-            # Yeni belgeleri ekle
-            if self.secilen_dosyalar:
-                os.makedirs("belgeler", exist_ok=True)
-                for dosya in self.secilen_dosyalar:
-                    if not os.path.exists(dosya):
-                        messagebox.showwarning("Hata", f"Dosya bulunamadı: {dosya}")
-                        continue
-                    barkod_no_clean = re.sub(r'[<>:"/\\|?*]', '_', yeni_veriler['barkod_no'])
-                    seri_no_clean = re.sub(r'[<>:"/\\|?*]', '_', yeni_veriler['cihaz_seri_no'] or "bos")
-                    dosya_adi_clean = re.sub(r'[<>:"/\\|?*]', '_', os.path.basename(dosya))
-                    yeni_dosya_adi = f"{self.selected_id}_{barkod_no_clean}_{seri_no_clean}_{dosya_adi_clean}"
-                    yeni_dosya_yolu = os.path.join("belgeler", yeni_dosya_adi)
-                    try:
-                        shutil.copy(dosya, yeni_dosya_yolu)
-                        if yeni_dosya_yolu not in belge_yollari:  # Aynı dosyanın tekrar eklenmesini önle
-                            belge_yollari.append(yeni_dosya_yolu)
-                        if settings["log_enabled"]:
-                            logging.info(f"Yeni belge eklendi: {yeni_dosya_yolu}")
-                    except Exception as e:
-                        if settings["log_enabled"]:
-                            logging.error(f"Dosya kopyalama hatası: {e} (Dosya: {dosya})")
-                        messagebox.showwarning("Hata", f"Dosya kopyalanamadı: {dosya}")
-                        continue
-
-            yeni_veriler["cihaz_belgeleri"] = belge_yollari  # Güncellenmiş belgeleri ata
+            yeni_veriler["yeni_belgeler"] = eklenecek
 
             degisiklikler = []
             alanlar_ve_indeksler = {
@@ -625,22 +837,22 @@ class ServisTakipUygulamasi:
             for key, indeks in alanlar_ve_indeksler.items():
                 eski_deger = str(mevcut_cihaz[indeks] or "").strip()
                 yeni_deger = str(yeni_veriler.get(key, "") or "").strip()
+                if key in TARIH_ALANLARI:
+                    yeni_deger = tarih_iso(yeni_deger)
                 if eski_deger != yeni_deger and (eski_deger or yeni_deger):
+                    if key in TARIH_ALANLARI:
+                        eski_deger, yeni_deger = tarih_goster(eski_deger), tarih_goster(yeni_deger)
                     degisiklikler.append((key.replace('_', ' ').title(), eski_deger, yeni_deger))
 
-            if len(yeni_veriler["cihaz_belgeleri"]) > len(mevcut_cihaz[11]):
-                degisiklikler.append(("Cihaz Belgeleri", str(len(mevcut_cihaz[11])), str(len(yeni_veriler["cihaz_belgeleri"]))))
+            if eklenecek:
+                degisiklikler.append(("Cihaz Belgeleri", str(len(mevcut_cihaz[11])), str(len(mevcut_cihaz[11]) + len(eklenecek))))
 
             if not degisiklikler:
                 messagebox.showinfo("Bilgi", "Herhangi bir değişiklik yapılmadı.")
                 return
 
-        except ValueError as e:
-            messagebox.showerror("Hata", f"Tarih formatı hatalı: {e}")
-            return
         except Exception as e:
-            if settings["log_enabled"]:
-                logging.error(f"Güncelleme hatası: {e}")
+            log.error("Güncelleme hatası: %s", e)
             messagebox.showerror("Hata", f"Beklenmedik bir hata oluştu: {e}")
             return
 
@@ -691,14 +903,23 @@ class ServisTakipUygulamasi:
 
     def onay_kapat(self, window, veriler, degisiklikler, onay):
         window.destroy()
-        if onay and self.db.update_cihaz(veriler, self.selected_id):
-            if settings["log_enabled"]:
-                logging.info(f"Cihaz güncellendi: ID {self.selected_id} | Değişiklikler: {', '.join([f'{d[0]}: {d[1]} -> {d[2]}' for d in degisiklikler])}")
+        if onay:
+            cihaz_id = self.selected_id
+            self.yurutucu.db_gorevi(lambda gorev: self.db.update_cihaz(veriler, cihaz_id),
+                                    tamamlandi=lambda basarili: self._guncelleme_tamamlandi(degisiklikler, basarili),
+                                    hata=lambda e: self.gorev_hatasi("Güncelleme sırasında bir sorun oluştu", e),
+                                    ad="Cihaz güncelleniyor", olcum="arayuz.durum_guncelle_onay")
+
+    def _guncelleme_tamamlandi(self, degisiklikler, basarili):
+        if basarili:
+            if log.isEnabledFor(logging.INFO):
+                log.info("Cihaz güncellendi: ID %s | Değişiklikler: %s", self.selected_id,
+                         ", ".join(f"{d[0]}: {d[1]} -> {d[2]}" for d in degisiklikler))
             messagebox.showinfo("Başarılı", f"ID {self.selected_id} başarıyla güncellendi!\n\nDeğişiklikler:\n" + "\n".join([f"{d[0]}: '{d[1]}' -> '{d[2]}'" for d in degisiklikler]))
-            self.tum_cihazlari_listele()
             self.temizle()
-            delattr(self, "selected_id")
-        elif onay:
+            if hasattr(self, "selected_id"):
+                delattr(self, "selected_id")
+        else:
             messagebox.showerror("Hata", "Güncelleme sırasında bir sorun oluştu!")
 
     def cihaz_sil(self):
@@ -707,69 +928,769 @@ class ServisTakipUygulamasi:
             return
 
         if messagebox.askyesno("Onay", f"ID {self.selected_id} numaralı kayıt silinsin mi?"):
-            self.db.delete_cihaz(self.selected_id)
-            messagebox.showinfo("Başarılı", "Kayıt silindi!")
-            self.temizle()
-            self.tum_cihazlari_listele()
-            delattr(self, "selected_id")
+            cihaz_id = self.selected_id
+            self.yurutucu.db_gorevi(lambda gorev: self.db.delete_cihaz(cihaz_id),
+                                    tamamlandi=lambda sonuc: self._silme_tamamlandi(),
+                                    hata=lambda e: self.gorev_hatasi("Kayıt silinemedi", e),
+                                    ad="Kayıt siliniyor")
+
+    def _silme_tamamlandi(self):
+        messagebox.showinfo("Başarılı", "Kayıt silindi!")
+        self.temizle()
+
+    def eski_belgeleri_tasi(self, son_id=0, toplam=0, hatalar=None):
+        hatalar = hatalar if hatalar is not None else []
+
+        def parti_bitti(sonuc):
+            sonraki, tasinan, parti_hatalari = sonuc
+            hatalar.extend(parti_hatalari)
+            if sonraki is not None:
+                self.eski_belgeleri_tasi(sonraki, toplam + tasinan, hatalar)
+                return
+            mesaj = f"{toplam + tasinan} belge depoya taşındı."
+            if hatalar:
+                mesaj += f"\n{len(hatalar)} belge taşınamadı (ayrıntılar log dosyasında)."
+            messagebox.showinfo("Bilgi", mesaj)
+
+        # Her parti ayrı bir görevdir; aradaki liste/sorgu görevleri bekletilmez
+        self.yurutucu.db_gorevi(lambda gorev: self.depo.eski_belgeleri_tasi(self.db, gorev, son_id),
+                                tamamlandi=parti_bitti,
+                                hata=lambda e: self.gorev_hatasi("Belgeler depoya taşınamadı", e),
+                                ad=f"Belgeler depoya taşınıyor ({toplam})")
+
+    # Arşiv paketine alınmış belge geçici klasöre çıkarılıp açılır
+    def _arsivden_ac(self, belge):
+        def girdi_bulundu(girdi):
+            if girdi is None:
+                messagebox.showwarning("Hata", "Belge bulunamadı!")
+                return
+            self.yurutucu.dosya_gorevi(lambda gorev: self.depo.belge_yolu(belge, girdi), tamamlandi=os.startfile,
+                                       hata=lambda e: self.gorev_hatasi("Belge arşivden açılamadı", e),
+                                       ad="Belge arşivden açılıyor")
+
+        self.yurutucu.db_gorevi(lambda gorev: self.db.fetch_paket_girdisi(os.path.basename(belge)),
+                                tamamlandi=girdi_bulundu,
+                                hata=lambda e: self.gorev_hatasi("Belge arşivden açılamadı", e))
+
+    # Arşivleme dosya iş parçacığında ayrı bir bağlantıyla yapılır; uzun sürse de liste ve kayıt işlemleri beklemez
+    def belgeleri_arsivle(self):
+        gun = simpledialog.askinteger("Eski Belgeleri Arşivle",
+                                      "Hurda ya da tamir edilip kaç günden uzun süre önce gelen cihazların belgeleri "
+                                      "sıkıştırılarak arşivlensin?", initialvalue=ARSIV_GUN, minvalue=0, parent=self.root)
+        if gun is None:
+            return
+        db_name = self.db_name
+
+        def arsivle(gorev):
+            db = DatabaseManager(db_name)
+            try:
+                return self.depo.arsivle(db, gorev, gun)
+            finally:
+                db.close()
+
+        def arsivlendi(ozet):
+            mesaj = (f"{ozet['belge']} belge {ozet['paket']} pakete arşivlendi.\n"
+                     f"{ozet['ham_bayt'] / 1024 / 1024:.1f} MB -> {ozet['paket_bayt'] / 1024 / 1024:.1f} MB "
+                     f"({ozet['tasarruf_bayt'] / 1024 / 1024:.1f} MB kazanıldı, {ozet['hiz_mb_sn']} MB/s)")
+            if ozet["eksik"]:
+                mesaj += f"\n{ozet['eksik']} belgenin dosyası bulunamadığı için atlandı."
+            messagebox.showinfo("Bilgi", mesaj)
+
+        self.yurutucu.dosya_gorevi(arsivle, tamamlandi=arsivlendi,
+                                   hata=lambda e: self.gorev_hatasi("Belgeler arşivlenemedi", e),
+                                   ad="Belgeler arşivleniyor")
+
+    def arsivi_dogrula(self):
+        db_name = self.db_name
+
+        def dogrula(gorev):
+            db = DatabaseManager(db_name)
+            try:
+                return self.depo.paketleri_dogrula(db, gorev)
+            finally:
+                db.close()
+
+        def dogrulandi(sonuc):
+            mesaj = f"{sonuc['belge']} arşiv belgesi doğrulandı ({sonuc['hiz_mb_sn']} MB/s)."
+            if sonuc["hatalar"]:
+                ilkler = "\n".join(f"{anahtar} ({dosya}): {hata}" for anahtar, dosya, hata in sonuc["hatalar"][:10])
+                messagebox.showwarning("Uyarı", f"{mesaj}\n{len(sonuc['hatalar'])} belge bozuk:\n{ilkler}")
+            else:
+                messagebox.showinfo("Bilgi", mesaj)
+
+        self.yurutucu.dosya_gorevi(dogrula, tamamlandi=dogrulandi,
+                                   hata=lambda e: self.gorev_hatasi("Arşiv doğrulanamadı", e),
+                                   ad="Arşiv doğrulanıyor")
+
+    # Tarama dosya iş parçacığında ayrı bağlantıyla başlar; depo dilimleri kendi bağlantılarıyla paralel taranır
+    def belge_taramasi(self):
+        derin = messagebox.askyesno("Belge Tutarlılık Taraması",
+                                    "Dosyaların içeriği de sağlama toplamıyla denetlensin mi?\n\n"
+                                    "Evet: bozuk dosyalar da bulunur, tüm belgeler okunduğu için uzun sürer.\n"
+                                    "Hayır: yalnızca eksik, sahipsiz ve boyutu tutmayan dosyalar aranır.")
+        db_name = self.db_name
+
+        def tara(gorev):
+            db = DatabaseManager(db_name)
+            try:
+                return belgeleri_tara(db, derin=derin, gorev=gorev)
+            finally:
+                db.close()
+
+        self.yurutucu.dosya_gorevi(tara, tamamlandi=self._tarama_sonucu,
+                                   hata=lambda e: self.gorev_hatasi("Belgeler taranamadı", e),
+                                   ad="Belgeler taranıyor")
+
+    # Milyonlarca bulgu olabileceği için tabloda ilk TARAMA_GOSTERILEN satır gösterilir; tamamı JSON'a aktarılır
+    def _tarama_sonucu(self, tarama):
+        sonuc_win = tk.Toplevel(self.root)
+        sonuc_win.title("Belge Tutarlılık Taraması")
+        sonuc_win.geometry("900x450")
+        sonuc_win.configure(bg="#f0f0f0")
+
+        ttk.Label(sonuc_win, text=f"{tarama['dosya']} dosya ({tarama['bayt'] / 1024 / 1024:.1f} MB), "
+                                  f"{tarama['sure']} sn • eksik {len(tarama['eksik'])} • "
+                                  f"sahipsiz {len(tarama['sahipsiz'])} • sıfır bayt {len(tarama['sifir_bayt'])} • "
+                                  f"bozuk {len(tarama['bozuk'])}").pack(pady=5)
+        tablo_frame = ttk.Frame(sonuc_win)
+        tablo_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        tree = ttk.Treeview(tablo_frame, columns=("Tür", "Dosya", "Ayrıntı"), show="headings")
+        for ad, genislik in (("Tür", 90), ("Dosya", 520), ("Ayrıntı", 250)):
+            tree.heading(ad, text=ad)
+            tree.column(ad, width=genislik, anchor="w")
+        scrollbar = ttk.Scrollbar(tablo_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        tree.pack(fill="both", expand=True)
+
+        satirlar = [("eksik", e["dosya_yolu"], ", ".join(f"kayıt {cihaz_id}: {ad}" for _, cihaz_id, ad in e["belgeler"]))
+                    for e in tarama["eksik"]]
+        satirlar += [("sahipsiz", yol, "") for yol in tarama["sahipsiz"]]
+        satirlar += [("sıfır bayt", yol, "") for yol in tarama["sifir_bayt"]]
+        satirlar += [("bozuk", yol, neden) for yol, neden in tarama["bozuk"]]
+        for satir in satirlar[:TARAMA_GOSTERILEN]:
+            tree.insert("", "end", values=satir)
+        if len(satirlar) > TARAMA_GOSTERILEN:
+            tree.insert("", "end", values=("...", f"{len(satirlar) - TARAMA_GOSTERILEN} satır daha (JSON'a aktarın)", ""))
+
+        db_name = self.db_name
+
+        def duzelt(islem, ad, mesaj):
+            def calistir(gorev):
+                db = DatabaseManager(db_name)
+                try:
+                    return islem(db, tarama, gorev)
+                finally:
+                    db.close()
+
+            def bitti(sonuc):
+                sonuc_win.destroy()
+                messagebox.showinfo("Bilgi", mesaj(sonuc))
+
+            self.yurutucu.dosya_gorevi(calistir, tamamlandi=bitti, hata=lambda e: self.gorev_hatasi(f"{ad} başarısız", e),
+                                       ad=ad)
+
+        def karantina():
+            if messagebox.askyesno("Onay", "Sahipsiz, sıfır baytlık ve bozuk dosyalar karantina klasörüne taşınsın mı?",
+                                   parent=sonuc_win):
+                duzelt(lambda db, t, gorev: karantinaya_al(db, t), "Karantinaya alma",
+                       lambda s: f"{s['tasinan']} dosya karantinaya alındı: {s['karantina']}")
+
+        def bagla():
+            duzelt(yeniden_bagla, "Yeniden bağlama",
+                   lambda s: f"{s['baglanan']} belge yeniden bağlandı, {s['eksik_kalan']} belge hâlâ eksik.")
+
+        def json_aktar():
+            dosya_adi = filedialog.asksaveasfilename(parent=sonuc_win, defaultextension=".json",
+                                                     filetypes=[("JSON Dosyaları", "*.json")],
+                                                     initialfile=f"tarama_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            if not dosya_adi:
+                return
+            try:
+                with open(dosya_adi, "w", encoding="utf-8") as f:
+                    json.dump(tarama, f, ensure_ascii=False)
+            except OSError as e:
+                messagebox.showerror("Hata", f"Tarama sonucu yazılamadı: {e}", parent=sonuc_win)
+                return
+            messagebox.showinfo("Başarılı", f"Tarama sonucu {dosya_adi} dosyasına aktarıldı!", parent=sonuc_win)
+
+        btn_frame = ttk.Frame(sonuc_win)
+        btn_frame.pack(pady=5)
+        ttk.Button(btn_frame, text="Yeniden Bağla", command=bagla).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Karantinaya Al", command=karantina).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="JSON'a Aktar", command=json_aktar).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Kapat", command=sonuc_win.destroy).pack(side="left", padx=5)
+
+    # Veritabanı ayrı bağlantıdan sayfa adımlarıyla kopyalanır; arayüz ve kayıt işlemleri yedek boyunca çalışır
+    def yedek_baslat(self):
+        db_name = self.db_name
+
+        def yedekle(gorev):
+            db = DatabaseManager(db_name)
+            try:
+                return yedek_al(db, gorev=gorev)
+            finally:
+                db.close()
+
+        def yedeklendi(ozet):
+            messagebox.showinfo("Bilgi", f"Yedek alındı: {ozet['yedek']}\n"
+                                         f"{ozet['belge']} belge ({ozet['kopyalanan_belge']} yeni/değişmiş kopyalandı, "
+                                         f"{ozet['bagli_belge']} önceki yedekten), {ozet['sure']} sn")
+
+        self.yurutucu.dosya_gorevi(yedekle, tamamlandi=yedeklendi,
+                                   hata=lambda e: self.gorev_hatasi("Yedek alınamadı", e), ad="Yedek alınıyor")
+
+    def son_yedegi_dogrula(self):
+        yedekler = yedekleri_listele()
+        if not yedekler:
+            messagebox.showinfo("Bilgi", "Henüz yedek alınmamış.")
+            return
+
+        def dogrulandi(sonuc):
+            if sonuc["hatalar"]:
+                ilkler = "\n".join(f"{dosya}: {hata}" for dosya, hata in sonuc["hatalar"][:10])
+                messagebox.showwarning("Uyarı", f"{sonuc['yedek']}: {len(sonuc['hatalar'])} bozuk dosya\n{ilkler}")
+            else:
+                messagebox.showinfo("Bilgi", f"{sonuc['yedek']} doğrulandı ({sonuc['belge']} belge).")
+
+        self.yurutucu.dosya_gorevi(lambda gorev: yedegi_dogrula(yedekler[0], gorev), tamamlandi=dogrulandi,
+                                   hata=lambda e: self.gorev_hatasi("Yedek doğrulanamadı", e),
+                                   ad="Yedek doğrulanıyor")
+
+    def belge_deposunu_temizle(self):
+        def temizlendi(sonuc):
+            silinen, kazanilan = sonuc
+            messagebox.showinfo("Bilgi", f"{silinen} kullanılmayan belge silindi ({kazanilan / 1024 / 1024:.1f} MB).")
+
+        self.yurutucu.db_gorevi(lambda gorev: self.depo.cop_topla(self.db, gorev), tamamlandi=temizlendi,
+                                hata=lambda e: self.gorev_hatasi("Belge deposu temizlenemedi", e),
+                                ad="Belge deposu temizleniyor")
 
     def tum_cihazlari_listele(self):
+        baslangic = time.perf_counter()
         self.temizle()
+        self.search_var.set("")  # Yazma izi canlı aramayı zamanlar; hemen ardından iptal edilir
+        self._canli_aramayi_durdur()
+        self.son_arama = ""
+        self.listeyi_yukle(olcum=("arayuz.tum_cihazlari_listele", baslangic))
+
+    # Liste pencereli çalışır: yalnızca ilk sayfa yüklenir, kullanıcı sona yaklaştıkça sonraki sayfalar eklenir.
+    # Seçili sütun sıralaması (self.siralama) her yüklemede korunur. olcum (ad, başlangıç) ilk sayfaya kadar ölçülür.
+    def listeyi_yukle(self, filtre="", filtreler=None, id_sirali=False, siralama=None, olcum=None):
+        self._listeyi_sifirla({"filtre": filtre, "filtreler": filtreler, "id_sirali": id_sirali,
+                               "siralama": siralama or self.siralama})
+        self.sonraki_sayfayi_yukle(olcum)
+
+    # Başlık tıklaması: artan -> azalan -> sırasız. Sıralama veritabanında yapılır; ağaçtaki satırlar yeniden
+    # sıralanmaz, liste aynı filtreyle yeni sıradan baştan yüklenir. Bellekteki canlı arama sonuçları ilgi
+    # sırasında olduğundan atılır; sıralıyken canlı arama da sayfa sayfa veritabanından gelir.
+    def siralamayi_degistir(self, kolon):
+        baslangic = time.perf_counter()
+        sutun = LISTE_SIRALAMALARI[kolon]
+        if self.siralama is None or self.siralama[0] != sutun:
+            self.siralama = (sutun, False)
+        elif not self.siralama[1]:
+            self.siralama = (sutun, True)
+        else:
+            self.siralama = None
+        for k, metin in self.baslik_metinleri.items():
+            if self.siralama and LISTE_SIRALAMALARI[k] == self.siralama[0]:
+                metin += " ▼" if self.siralama[1] else " ▲"
+            self.tree.heading(k, text=metin)
+        self.canli_arama.sifirla()
+        self.listeyi_yukle(**{**self.liste_sorgusu, "siralama": None},
+                           olcum=("arayuz.siralamayi_degistir", baslangic))
+
+    # bellek_satirlari verilirse sayfalar veritabanı yerine bu listeden alınır (imleç listedeki konumdur);
+    # liste_sorgusu yine de aynı sonuçları veren sorgudur, dışa aktarma ve yeniden yükleme onu kullanır
+    def _listeyi_sifirla(self, sorgu, bellek_satirlari=None):
+        self.liste_nesli += 1  # Bekleyen eski sayfa sonuçları yok sayılır
+        self.liste_sorgusu = sorgu
+        self.bellek_satirlari = bellek_satirlari
+        self.liste_imleci = None
+        self.liste_bitti = False
+        self.sayfa_bekliyor = False
         self.tree.delete(*self.tree.get_children())
-        for cihaz in self.db.fetch_all():
-            item = self.tree.insert("", "end", values=(cihaz[0],) + cihaz[1:-1] + (len(cihaz[11]),))
-            self.tree.item(item, tags=(cihaz[9],))
 
+    def sonraki_sayfayi_yukle(self, olcum=None):
+        if self.liste_bitti or self.sayfa_bekliyor:
+            return
+        if self.bellek_satirlari is not None:
+            bas = self.liste_imleci or 0
+            son = bas + SAYFA_BOYUTU
+            self._sayfa_geldi(self.liste_nesli, self.bellek_satirlari[bas:son],
+                              son if son < len(self.bellek_satirlari) else None)
+            return
+        self.sayfa_bekliyor = True
+        nesil, imlec, sorgu = self.liste_nesli, self.liste_imleci, self.liste_sorgusu
+        olcum_adi, baslangic = olcum or (None, None)
+        self.yurutucu.db_gorevi(lambda gorev: self.db.fetch_page(imlec, SAYFA_BOYUTU, **sorgu),
+                                tamamlandi=lambda sonuc: self._sayfa_geldi(nesil, *sonuc),
+                                hata=lambda e: self._sayfa_hatasi(nesil, e), olcum=olcum_adi, baslangic=baslangic)
+
+    def _sayfa_geldi(self, nesil, cihazlar, imlec):
+        if nesil != self.liste_nesli:
+            return
+        self.sayfa_bekliyor = False
+        self.liste_imleci = imlec
+        self.liste_bitti = imlec is None
+        for cihaz in cihazlar:
+            self._tree_satir_ekle(cihaz)
+        if self.ilk_liste_ms is None:
+            self.ilk_liste_ms = (time.perf_counter() - self.acilis_baslangici) * 1000
+            log.info("Açılış: ilk kare %.0f ms, ilk liste %.0f ms", self.ilk_kare_ms, self.ilk_liste_ms)
+
+    def _sayfa_hatasi(self, nesil, e):
+        if nesil == self.liste_nesli:
+            self.sayfa_bekliyor = False
+            self.liste_bitti = True
+            self.gorev_hatasi("Liste yüklenemedi", e)
+
+    # Satırların iid'si kayıt id'sidir; değişiklik olayları etkilenen satırı doğrudan bulur
+    def _tree_satir_ekle(self, cihaz):
+        if self.tree.exists(cihaz[0]):
+            self.tree.item(cihaz[0], values=liste_degerleri(cihaz), tags=(cihaz[9],))
+        else:
+            self.tree.insert("", "end", iid=cihaz[0], values=liste_degerleri(cihaz), tags=(cihaz[9],))
+
+    # Veri katmanından gelen değişiklik olayı: liste baştan yüklenmez, yalnızca ilgili satır yamanır.
+    # Yeni kayıt id sırasının sonuna düşer; ancak liste filtresiz, sütuna göre sıralanmamış ve tamamen yüklüyse
+    # eklenir, aksi halde sıradaki sayfalarla zaten gelecektir (filtreli listede eşleşip eşleşmediği, sıralı
+    # listede yeri bilinmediğinden eklenmez).
+    def kayit_degisti(self, tur, id, satir):
+        self.canli_arama.sifirla()  # bellekteki arama sonuçları artık veritabanını yansıtmayabilir
+        if self.bellek_satirlari is not None and tur in ("sil", "guncelle"):
+            self._bellek_satirini_yama(id, satir if tur == "guncelle" else None)
+        if tur == "sil":
+            if self.tree.exists(id):
+                self.tree.delete(id)
+        elif tur == "guncelle":
+            if self.tree.exists(id):
+                self.tree.item(id, values=liste_degerleri(satir), tags=(satir[9],))
+        elif tur == "ekle":
+            filtresiz = (not self.liste_sorgusu["filtre"] and not any((self.liste_sorgusu["filtreler"] or {}).values())
+                         and not self.liste_sorgusu["siralama"])
+            if self.tree.exists(id) or (filtresiz and self.liste_bitti):
+                self._tree_satir_ekle(satir)
+        elif tur == "toplu":
+            self.listeyi_yukle(**self.liste_sorgusu)
+
+    # Henüz ağaca eklenmemiş bellek satırları sonraki sayfalarda eski haliyle görünmesin diye yamanır
+    def _bellek_satirini_yama(self, id, satir):
+        for i, eski in enumerate(self.bellek_satirlari):
+            if eski[0] != id:
+                continue
+            if satir:
+                self.bellek_satirlari[i] = satir
+            else:
+                del self.bellek_satirlari[i]
+                if self.liste_imleci and i < self.liste_imleci:
+                    self.liste_imleci -= 1
+            break
+
+    def on_tree_scroll(self, first, last):
+        self.tree_scrollbar.set(first, last)
+        if float(last) > 0.9:
+            self.sonraki_sayfayi_yukle()
+
+    # Sabit filtreler ve koşul oluşturucu birlikte uygulanır. Koşullar gruplanır: aynı gruptakiler "grup içi",
+    # gruplar "gruplar arası" bağlaçla birleşir (varsayılan: gruplar VE, grup içi VEYA). Boş değerli satırlar
+    # yok sayılır. Kayıtlı sorgular (filtreler + sıralama) buradan çalıştırılır ya da Excel'e aktarılır.
     def show_advanced_search(self):
         search_win = tk.Toplevel(self.root)
         search_win.title("Sorgulama")
-        search_win.geometry("300x150")
+        search_win.geometry("780x640")
         search_win.configure(bg="#f0f0f0")
-        search_win.resizable(False, False)
 
         filter_frame = ttk.LabelFrame(search_win, text="Filtreler", padding="10")
-        filter_frame.pack(fill="x", pady=10)
+        filter_frame.pack(fill="x", padx=10, pady=10)
 
         ttk.Label(filter_frame, text="Barkod No:").grid(row=0, column=0, padx=5, pady=5)
         barkod_entry = ttk.Entry(filter_frame)
         barkod_entry.grid(row=0, column=1, padx=5, pady=5)
 
         ttk.Label(filter_frame, text="Cihaz Durumu:").grid(row=1, column=0, padx=5, pady=5)
-        durum_combo = ttk.Combobox(filter_frame, values=["", "Serviste", "Servise Gönderildi", "Tamir edildi","Tamir olmuyor","Hurda"])
+        durum_combo = ttk.Combobox(filter_frame, values=[""] + CIHAZ_DURUMLARI)
         durum_combo.grid(row=1, column=1, padx=5, pady=5)
 
-        def perform_search():
+        # Tarih aralıkları gg.aa.yyyy olarak girilir, boş bırakılan sınır uygulanmaz
+        tarih_alanlari = {}
+        for satir, (etiket, anahtar) in enumerate([("Gönderim (başlangıç):", "gonderim_baslangic"),
+                                                   ("Gönderim (bitiş):", "gonderim_bitis"),
+                                                   ("Gelme (başlangıç):", "gelme_baslangic"),
+                                                   ("Gelme (bitiş):", "gelme_bitis")], start=2):
+            ttk.Label(filter_frame, text=etiket).grid(row=satir, column=0, padx=5, pady=2)
+            tarih_alanlari[anahtar] = ttk.Entry(filter_frame)
+            tarih_alanlari[anahtar].grid(row=satir, column=1, padx=5, pady=2)
+
+        ttk.Label(filter_frame, text="Serviste (gün üstü):").grid(row=6, column=0, padx=5, pady=5)
+        gun_entry = ttk.Entry(filter_frame)
+        gun_entry.grid(row=6, column=1, padx=5, pady=5)
+
+        kosul_frame = ttk.LabelFrame(search_win, text="Koşullar", padding="10")
+        kosul_frame.pack(fill="both", expand=True, padx=10)
+        baglac_frame = ttk.Frame(kosul_frame)
+        baglac_frame.pack(fill="x")
+        ttk.Label(baglac_frame, text="Gruplar arası:").pack(side="left")
+        dis_baglac = ttk.Combobox(baglac_frame, values=list(SORGU_BAGLACLARI), width=6, state="readonly")
+        dis_baglac.set("VE")
+        dis_baglac.pack(side="left", padx=5)
+        ttk.Label(baglac_frame, text="Grup içi:").pack(side="left", padx=(15, 0))
+        ic_baglac = ttk.Combobox(baglac_frame, values=list(SORGU_BAGLACLARI), width=6, state="readonly")
+        ic_baglac.set("VEYA")
+        ic_baglac.pack(side="left", padx=5)
+        satir_frame = ttk.Frame(kosul_frame)
+        satir_frame.pack(fill="both", expand=True, pady=5)
+        for sutun, baslik in enumerate(("Grup", "Alan", "İşlem", "Değer")):
+            ttk.Label(satir_frame, text=baslik).grid(row=0, column=sutun, padx=5, sticky="w")
+        kosul_satirlari = []
+
+        def kosul_ekle():
+            grup = ttk.Spinbox(satir_frame, from_=1, to=9, width=4)
+            grup.set(len(kosul_satirlari) + 1)
+            alan = ttk.Combobox(satir_frame, values=list(SORGU_ALAN_ADLARI), width=18, state="readonly")
+            islem = ttk.Combobox(satir_frame, width=20, state="readonly")
+            deger = ttk.Entry(satir_frame, width=36)
+
+            # İşlem listesi alanın türüne göre değişir (örn. sayılarda "içerir" yoktur)
+            def alan_secildi(event=None):
+                islemler = SORGU_ISLEMLERI[SORGU_ALANLARI[SORGU_ALAN_ADLARI[alan.get()]]]
+                islem.configure(values=[SORGU_ISLEM_ADLARI[i] for i in islemler])
+                if islem.get() not in islem.cget("values"):
+                    islem.set(SORGU_ISLEM_ADLARI[islemler[0]])
+
+            alan.bind("<<ComboboxSelected>>", alan_secildi)
+            satir = len(kosul_satirlari) + 1
+            for sutun, pencere in enumerate((grup, alan, islem, deger)):
+                pencere.grid(row=satir, column=sutun, padx=5, pady=2, sticky="w")
+            kosul_satirlari.append((grup, alan, islem, deger))
+
+        # {"ve"/"veya": [grup, ...]} ağacı; girilen tarihler tarih_iso ile, sayılar sorgu_derle'de doğrulanır
+        def kosul_agaci():
+            islem_anahtari = {ad: anahtar for anahtar, ad in SORGU_ISLEM_ADLARI.items()}
+            gruplar = {}
+            for grup, alan, islem, deger in kosul_satirlari:
+                if not alan.get() or not islem.get():
+                    continue
+                anahtar, metin = islem_anahtari[islem.get()], deger.get().strip()
+                if anahtar == "icinde":
+                    deger_ = [parca.strip() for parca in metin.split(",") if parca.strip()]
+                elif anahtar == "aralik":
+                    alt, _, ust = metin.partition("..")
+                    deger_ = [alt.strip(), ust.strip()]
+                else:
+                    deger_ = metin
+                if anahtar not in ("bos", "dolu") and not any(deger_ if isinstance(deger_, list) else [deger_]):
+                    continue
+                gruplar.setdefault(grup.get(), []).append(
+                    {"alan": SORGU_ALAN_ADLARI[alan.get()], "islem": anahtar, "deger": deger_})
+            ic = SORGU_BAGLACLARI[ic_baglac.get()]
+            return {SORGU_BAGLACLARI[dis_baglac.get()]: [{ic: kosullar} for _, kosullar in sorted(gruplar.items())]}
+
+        def form_filtreleri():
             filtreler = {
                 "barkod_no": barkod_entry.get(),
                 "cihaz_durumu": durum_combo.get() if durum_combo.get() else None
             }
-            sonuclar = self.db.advanced_search(filtreler)
-            self.tree.delete(*self.tree.get_children())
-            for cihaz in sonuclar:
-                item = self.tree.insert("", "end", values=(cihaz[0],) + cihaz[1:-1] + (len(cihaz[11]),))
-                self.tree.item(item, tags=(cihaz[9],))
+            try:
+                for anahtar, entry in tarih_alanlari.items():
+                    filtreler[anahtar] = tarih_iso(entry.get())
+            except ValueError:
+                messagebox.showwarning("Hata", "Tarihler gg.aa.yyyy biçiminde olmalı!", parent=search_win)
+                return None
+            if gun_entry.get().strip():
+                if not gun_entry.get().strip().isdigit():
+                    messagebox.showwarning("Hata", "Gün sayısı bir tam sayı olmalı!", parent=search_win)
+                    return None
+                filtreler["acik_gun_ustu"] = int(gun_entry.get())
+            try:
+                agac = kosul_agaci()
+                if sorgu_derle(agac):
+                    filtreler["sorgu"] = agac
+            except ValueError as e:
+                messagebox.showwarning("Hata", f"Koşullar geçersiz: {e}", parent=search_win)
+                return None
+            return filtreler
+
+        def perform_search():
+            filtreler = form_filtreleri()
+            if filtreler is None:
+                return
+            self.listeyi_yukle(filtreler=filtreler)
             search_win.destroy()
 
-        ttk.Button(filter_frame, text="Sorgula", command=perform_search).grid(row=2, columnspan=2, pady=10)
+        ttk.Button(kosul_frame, text="Koşul Ekle", command=kosul_ekle).pack(side="left", padx=5)
+        ttk.Button(kosul_frame, text="Sorgula", command=perform_search).pack(side="left", padx=5)
+        for _ in range(3):
+            kosul_ekle()
+
+        kayitli_frame = ttk.LabelFrame(search_win, text="Kayıtlı Sorgular", padding="10")
+        kayitli_frame.pack(fill="x", padx=10, pady=10)
+        kayitli_combo = ttk.Combobox(kayitli_frame, width=30, state="readonly")
+        kayitli_combo.pack(side="left", padx=5)
+
+        def kayitlilari_yukle(secili=None):
+            def yuklendi(adlar):
+                kayitli_combo.configure(values=adlar)
+                kayitli_combo.set(secili if secili in adlar else "")
+
+            self.yurutucu.db_gorevi(lambda gorev: self.db.kayitli_sorgulari_listele(), tamamlandi=yuklendi,
+                                    hata=lambda e: self.gorev_hatasi("Kayıtlı sorgular okunamadı", e))
+
+        # Seçili kayıtlı sorgu okunup devam fonksiyonuna liste sorgusu olarak verilir
+        def kayitli_ile(devam):
+            ad = kayitli_combo.get()
+            if not ad:
+                messagebox.showwarning("Uyarı", "Lütfen bir kayıtlı sorgu seçin!", parent=search_win)
+                return
+
+            def okundu(kayit):
+                filtreler, siralama = kayit
+                devam({"filtre": "", "filtreler": filtreler, "id_sirali": False, "siralama": siralama})
+
+            self.yurutucu.db_gorevi(lambda gorev: self.db.kayitli_sorgu(ad), tamamlandi=okundu,
+                                    hata=lambda e: self.gorev_hatasi("Kayıtlı sorgu okunamadı", e))
+
+        def kayitli_calistir():
+            def calistir(sorgu):
+                self.listeyi_yukle(**sorgu)
+                search_win.destroy()
 
-    def export_to_excel(self):
-        veriler = [self.tree.item(item)["values"] for item in self.tree.get_children()]
-        if not veriler:
-            messagebox.showinfo("Bilgi", "Dışa aktarılacak veri bulunamadı!")
+            kayitli_ile(calistir)
+
+        # Formdaki filtreler ve ana listenin o anki sütun sıralaması birlikte saklanır
+        def kaydet():
+            filtreler = form_filtreleri()
+            if filtreler is None:
+                return
+            ad = simpledialog.askstring("Sorguyu Kaydet", "Sorgu adı:", initialvalue=kayitli_combo.get(),
+                                        parent=search_win)
+            if not ad or not ad.strip():
+                return
+            siralama = self.siralama
+            self.yurutucu.db_gorevi(lambda gorev: self.db.sorguyu_kaydet(ad, filtreler, siralama),
+                                    tamamlandi=lambda _: kayitlilari_yukle(ad.strip()),
+                                    hata=lambda e: self.gorev_hatasi("Sorgu kaydedilemedi", e))
+
+        def sil():
+            ad = kayitli_combo.get()
+            if ad and messagebox.askyesno("Onay", f"'{ad}' sorgusu silinsin mi?", parent=search_win):
+                self.yurutucu.db_gorevi(lambda gorev: self.db.kayitli_sorguyu_sil(ad),
+                                        tamamlandi=lambda _: kayitlilari_yukle(),
+                                        hata=lambda e: self.gorev_hatasi("Sorgu silinemedi", e))
+
+        ttk.Button(kayitli_frame, text="Çalıştır", command=kayitli_calistir).pack(side="left", padx=5)
+        ttk.Button(kayitli_frame, text="Excel'e Aktar",
+                   command=lambda: kayitli_ile(self.export_to_excel)).pack(side="left", padx=5)
+        ttk.Button(kayitli_frame, text="Formu Kaydet", command=kaydet).pack(side="left", padx=5)
+        ttk.Button(kayitli_frame, text="Sil", command=sil).pack(side="left", padx=5)
+        kayitlilari_yukle()
+
+    # sorgu verilmezse listede görünen sorgu (liste_sorgusu) aktarılır
+    def export_to_excel(self, sorgu=None):
+        dosya_adi = filedialog.asksaveasfilename(defaultextension=".xlsx",
+                                                 filetypes=[("Excel Dosyaları", "*.xlsx"), ("CSV Dosyaları", "*.csv")],
+                                                 initialfile=f"servis_takip_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")
+        if not dosya_adi:
             return
+        sorgu = dict(sorgu or self.liste_sorgusu)
+        db_name = self.db_name
+        analizli = self.analizli_aktar.get()
 
-        df = pd.DataFrame(veriler, columns=["Kayıt ID", "Barkod No", "Bölge", "Personel Ad Soyad", "Personel Sicil No",
-                                            "Cihaz Tipi", "Cihaz Seri No", "Servis Gönderim Tarihi",
-                                            "Servis Gelme Tarihi", "Cihaz Durumu", "Açıklama", "Belge Sayısı"])
-        dosya_adi = f"servis_takip_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        try:
-            df.to_excel(dosya_adi, index=False)
-            messagebox.showinfo("Başarılı", f"Veriler {dosya_adi} dosyasına aktarıldı!")
-            if settings["log_enabled"]:
-                logging.info(f"Excel'e aktarma yapıldı: {dosya_adi}")
-        except Exception as e:
-            messagebox.showerror("Hata", f"Excel'e aktarma başarısız: {e}")
+        # Ayrı bir bağlantıyla dosya iş parçacığında çalışır; ana bağlantıdaki liste/kayıt işleri beklemez
+        def aktar(gorev):
+            db = DatabaseManager(db_name)
+            try:
+                # İstenirse .xlsx çıktısına aynı sorgu üzerinden hesaplanan analiz sayfaları da eklenir
+                def analiz_sayfalari(kitap):
+                    excel_sayfalari(kitap, analiz_raporu(db, sorgu["filtre"], sorgu["filtreler"], gorev))
+
+                sonuc = disa_aktar(db, dosya_adi, gorev=gorev, ek_sayfalar=analiz_sayfalari if analizli else None,
+                                   **sorgu)
+                if not sonuc[0]:
+                    os.remove(dosya_adi)
+                return sonuc
+            finally:
+                db.close()
+
+        def aktarildi(sonuc):
+            yazilan, sure = sonuc
+            if not yazilan:
+                messagebox.showinfo("Bilgi", "Dışa aktarılacak veri bulunamadı!")
+                return
+            messagebox.showinfo("Başarılı", f"Veriler {dosya_adi} dosyasına aktarıldı!\n\n"
+                                            f"{yazilan} kayıt, {sure:.1f} sn ({yazilan / max(sure, 1e-6):.0f} kayıt/sn)")
+            log.info("Excel'e aktarma yapıldı: %s", dosya_adi)
+
+        self.yurutucu.dosya_gorevi(aktar, tamamlandi=aktarildi,
+                                   hata=lambda e: self.gorev_hatasi("Excel'e aktarma başarısız", e),
+                                   ad="Dışa aktarılıyor", olcum="arayuz.export_to_excel")
+
+    # Analiz, dışa aktarma gibi ayrı bir bağlantıyla dosya iş parçacığında hesaplanır; liste beklemez
+    def istatistikleri_goster(self):
+        sorgu = dict(self.liste_sorgusu)
+        db_name = self.db_name
+
+        def hesapla(gorev):
+            db = DatabaseManager(db_name)
+            try:
+                return analiz_raporu(db, sorgu["filtre"], sorgu["filtreler"], gorev)
+            finally:
+                db.close()
 
+        self.yurutucu.dosya_gorevi(hesapla, tamamlandi=self._istatistik_penceresi,
+                                   hata=lambda e: self.gorev_hatasi("İstatistikler hesaplanamadı", e),
+                                   ad="Analiz hesaplanıyor")
+
+    def _istatistik_penceresi(self, rapor):
+        if not rapor["kayit"]:
+            messagebox.showinfo("Bilgi", "İstatistik için kayıt bulunamadı!")
+            return
+
+        stat_win = tk.Toplevel(self.root)
+        stat_win.title("İstatistikler")
+        stat_win.geometry("800x450")
+        stat_win.configure(bg="#f0f0f0")
+
+        tekrar = rapor["tekrarlayan"]
+        ttk.Label(stat_win, text=f"{rapor['kayit']} kayıt • {tekrar['tekrarlayan_cihaz']} cihaz tekrar servise gelmiş "
+                                 f"• {rapor['sure']:.1f} sn").pack(pady=5)
+
+        notebook = ttk.Notebook(stat_win)
+        notebook.pack(fill="both", expand=True, padx=10, pady=5)
+        for ad, basliklar, satirlar in rapor_tablolari(rapor):
+            sekme = ttk.Frame(notebook)
+            notebook.add(sekme, text=ad)
+            sutunlar = [str(i) for i in range(len(basliklar))]
+            tree = ttk.Treeview(sekme, columns=sutunlar, show="headings")
+            for sutun, baslik in zip(sutunlar, basliklar):
+                tree.heading(sutun, text=baslik)
+                tree.column(sutun, width=110, anchor="w" if sutun == "0" else "e")
+            scrollbar = ttk.Scrollbar(sekme, orient="vertical", command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side="right", fill="y")
+            tree.pack(fill="both", expand=True)
+            for satir in satirlar:
+                tree.insert("", "end", values=["" if deger is None else deger for deger in satir])
+
+        def excele_aktar():
+            dosya_adi = filedialog.asksaveasfilename(parent=stat_win, defaultextension=".xlsx",
+                                                     filetypes=[("Excel Dosyaları", "*.xlsx")],
+                                                     initialfile=f"servis_analiz_{rapor['tarih']}.xlsx")
+            if not dosya_adi:
+                return
+            try:
+                excel_raporu_yaz(rapor, dosya_adi)
+            except Exception as e:
+                log.error("Analiz raporu yazılamadı: %s", e)
+                messagebox.showerror("Hata", f"Analiz raporu yazılamadı: {e}", parent=stat_win)
+                return
+            messagebox.showinfo("Başarılı", f"Analiz {dosya_adi} dosyasına aktarıldı!", parent=stat_win)
+
+        btn_frame = ttk.Frame(stat_win)
+        btn_frame.pack(pady=5)
+        ttk.Button(btn_frame, text="Excel'e Aktar", command=excele_aktar).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Kapat", command=stat_win.destroy).pack(side="left", padx=5)
+
+    # Ölçümler süreç içinde tutulur; panel açıkken "Yenile" ile güncellenir
+    def performans_paneli(self):
+        panel_win = tk.Toplevel(self.root)
+        panel_win.title("Performans Paneli")
+        panel_win.geometry("900x450")
+        panel_win.configure(bg="#f0f0f0")
+
+        durum_label = ttk.Label(panel_win)
+        durum_label.pack(pady=5)
+        notebook = ttk.Notebook(panel_win)
+        notebook.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def tablo(baslik, sutunlar):
+            sekme = ttk.Frame(notebook)
+            notebook.add(sekme, text=baslik)
+            tree = ttk.Treeview(sekme, columns=[ad for ad, _ in sutunlar], show="headings")
+            for ad, genislik in sutunlar:
+                tree.heading(ad, text=ad)
+                tree.column(ad, width=genislik, anchor="w")
+            scrollbar = ttk.Scrollbar(sekme, orient="vertical", command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            scrollbar.pack(side="right", fill="y")
+            tree.pack(fill="both", expand=True)
+            return tree
+
+        sure_tree = tablo("Süreler", [("Ölçüm", 260), ("Sayı", 70), ("Ortalama (ms)", 90), ("P50 (ms)", 80),
+                                      ("P95 (ms)", 80), ("P99 (ms)", 80), ("En Büyük (ms)", 90), ("Toplam (ms)", 90)])
+        sorgu_tree = tablo("Yavaş Sorgular", [("Zaman", 130), ("Süre (ms)", 80), ("SQL", 430), ("Plan", 250)])
+
+        def yenile():
+            ozet = olcumler.ozet()
+            durum_label.config(text=f"Ölçüm {'açık' if ozet['etkin'] else 'kapalı'} • {ozet['baslangic']} "
+                                    f"tarihinden beri • yavaş sorgu eşiği {ozet['yavas_sorgu_ms']:g} ms")
+            sure_tree.delete(*sure_tree.get_children())
+            for ad, o in ozet["olcumler"].items():
+                sure_tree.insert("", "end", values=(ad, o["sayi"], o["ortalama_ms"], o["p50_ms"], o["p95_ms"],
+                                                    o["p99_ms"], o["en_buyuk_ms"], o["toplam_ms"]))
+            sorgu_tree.delete(*sorgu_tree.get_children())
+            for kayit in reversed(ozet["yavas_sorgular"]):
+                sorgu_tree.insert("", "end", values=(kayit["zaman"], kayit["sure_ms"], kayit["sql"],
+                                                     "; ".join(kayit["plan"])))
+
+        def sifirla():
+            olcumler.sifirla()
+            yenile()
+
+        def json_aktar():
+            dosya_adi = filedialog.asksaveasfilename(parent=panel_win, defaultextension=".json",
+                                                     filetypes=[("JSON Dosyaları", "*.json")],
+                                                     initialfile=f"performans_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            if not dosya_adi:
+                return
+            try:
+                olcumler.json_yaz(dosya_adi)
+            except OSError as e:
+                messagebox.showerror("Hata", f"Ölçümler yazılamadı: {e}", parent=panel_win)
+                return
+            messagebox.showinfo("Başarılı", f"Ölçümler {dosya_adi} dosyasına aktarıldı!", parent=panel_win)
+
+        btn_frame = ttk.Frame(panel_win)
+        btn_frame.pack(pady=5)
+        ttk.Button(btn_frame, text="Yenile", command=yenile).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Sıfırla", command=sifirla).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="JSON'a Aktar", command=json_aktar).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Kapat", command=panel_win.destroy).pack(side="left", padx=5)
+        yenile()
+
+    def import_from_excel(self):
+        dosya_adi = filedialog.askopenfilename(filetypes=[("Excel/CSV Dosyaları", "*.xlsx *.csv"),
+                                                          ("Excel Dosyaları", "*.xlsx"), ("CSV Dosyaları", "*.csv")])
+        if not dosya_adi:
+            return
+        kuru_calistirma = messagebox.askyesno("İçe Aktar", "Önce deneme yapılsın mı?\n\n"
+                                                            "Evet: satırlar yalnızca doğrulanır, veritabanına yazılmaz.\n"
+                                                            "Hayır: geçerli satırlar hemen eklenir.")
+        db_name = self.db_name
+
+        def aktar(gorev):
+            db = DatabaseManager(db_name)
+            try:
+                return ice_aktar(db, dosya_adi, kuru_calistirma=kuru_calistirma, gorev=gorev)
+            finally:
+                db.close()
+
+        def aktarildi(sonuc):
+            mesaj = (f"{sonuc['okunan']} satır okundu, {sonuc['sure']:.1f} sn ({sonuc['hiz']:.0f} satır/sn)\n"
+                     f"{'Eklenebilecek' if kuru_calistirma else 'Eklenen'}: {sonuc['eklenen']}\n"
+                     f"Reddedilen: {sonuc['reddedilen']}")
+            if sonuc["hata_raporu"]:
+                mesaj += f"\n\nHatalı satırlar: {sonuc['hata_raporu']}"
+            messagebox.showinfo("Deneme Sonucu" if kuru_calistirma else "İçe Aktarma Tamamlandı", mesaj)
+            if not kuru_calistirma:
+                self.listeyi_yukle(**self.liste_sorgusu)
+
+        self.yurutucu.dosya_gorevi(aktar, tamamlandi=aktarildi,
+                                   hata=lambda e: self.gorev_hatasi("İçe aktarma başarısız", e),
+                                   ad="İçe aktarılıyor")
+
+    # Yalnızca formu sıfırlar; arama kutusu ve liste (filtre, kaydırma konumu) kayıt işlemlerinden sonra korunur
     def temizle(self):
         for key, entry in self.entries.items():
             if key in ["servis_gonderim_tarihi", "servis_gelme_tarihi"]:
@@ -784,12 +1705,13 @@ class ServisTakipUygulamasi:
         self.secilen_dosyalar = []
         if hasattr(self, "selected_id"):
             delattr(self, "selected_id")
-        self.search_var.set("")
 
     def kapat(self):
-        self.db.close()
+        self.yurutucu.kapat()
         self.root.destroy()
 
 if __name__ == "__main__":
+    load_settings()
+    configure_logging()
     app = ServisTakipUygulamasi()
     app.root.mainloop()
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""Belge deposu ile veritabanı arasındaki tutarlılık taraması.
+
+Depo klasörü (belgeler/<ilk iki hane>/<sha256><uzantı>) 256 dilime ayrılır; her dilim ayrı bir iş parçacığında
+os.scandir ile okunur ve iş parçacığının salt okunur bağlantısıyla blobler tablosunun aynı anahtar aralığıyla
+karşılaştırılır. Böylece bellekte hiçbir zaman tüm anahtar listesi tutulmaz. Bu sırada ana iş parçacığı depoya
+taşınmamış eski belgeleri ve arşiv paketlerini denetler. Bulunanlar:
+
+- eksik: kayda bağlı olduğu halde dosyası (ya da arşiv paketi) olmayan belgeler
+- sahipsiz: veritabanında karşılığı olmayan dosyalar
+- sıfır bayt / bozuk: boyutu veritabanındakiyle uyuşmayan, derin taramada içeriği anahtarıyla uyuşmayan bloblar
+
+Referansı kalmamış ama henüz silinmemiş bloblar (cop_topla'nın işi) sorun sayılmaz.
+
+    tarama = belgeleri_tara(db, derin=True)
+    karantinaya_al(db, tarama)                      # sahipsiz ve bozuk dosyalar belgeler_karantina/ altına
+    yeniden_bagla(db, tarama)                       # eksik belgeler sahipsiz dosyalar arasında aranır
+"""
+import datetime
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.request import pathname2url
+
+from servis_core import (BELGE_KLASORU, BLOB_DILIMI_SORGUSU, COP_TOPLAMA_BEKLEMESI, BelgeDeposu, GorevIptalEdildi,
+                         log, on_ek_araligi)
+
+TARAMA_IS_PARCACIGI = 8  # Aynı anda taranan depo dilimi; iş çoğunlukla dizin okuma ve stat çağrısıdır
+KARANTINA_KLASORU = "belgeler_karantina"
+ONEKLER = [f"{i:02x}" for i in range(256)]
+
+
+def _anahtar_mi(ad):
+    return len(ad) >= 64 and all(c in "0123456789abcdef" for c in ad[:64])
+
+
+# Yeni eklenen blobun dosyası veritabanı kaydından önce yazılır; çöp toplayıcı gibi tarama da yakın zamanda
+# değişmiş dosyaları ve yazımı süren ".tmp" dosyalarını sahipsiz saymaz
+def _yeni_mi(bilgi, simdi):
+    return simdi - bilgi.st_mtime < COP_TOPLAMA_BEKLEMESI
+
+
+# Dilimler havuzdaki her iş parçacığının tek bir salt okunur bağlantısıyla okunur: 256 dilim için şema
+# denetimi ve bağlantı ayarları (DatabaseManager) yerine TARAMA_IS_PARCACIGI kadar yalın bağlantı açılır.
+# Bağlantılar havuz kapandıktan sonra ana iş parçacığından kapatılır.
+class _IsParcacigiBaglantilari:
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self.yerel = threading.local()
+        self.baglantilar = []
+        self.kilit = threading.Lock()
+
+    def al(self):
+        baglanti = getattr(self.yerel, "baglanti", None)
+        if baglanti is None:
+            baglanti = sqlite3.connect(f"file:{pathname2url(os.path.abspath(self.db_name))}?mode=ro", uri=True,
+                                       check_same_thread=False)
+            self.yerel.baglanti = baglanti
+            with self.kilit:
+                self.baglantilar.append(baglanti)
+        return baglanti
+
+    def kapat(self):
+        for baglanti in self.baglantilar:
+            baglanti.close()
+
+
+def _dilimi_tara(baglantilar, depo, onek, derin, gorev, simdi):
+    satirlar = baglantilar.al().execute(BLOB_DILIMI_SORGUSU, on_ek_araligi(onek)).fetchall()
+    return _dilimi_karsilastir(satirlar, depo, onek, derin, gorev, simdi)
+
+
+def _dilimi_karsilastir(satirlar, depo, onek, derin, gorev, simdi):
+    sonuc = {"dosya": 0, "bayt": 0, "blob": 0, "kullanilmayan": 0, "eksik": [], "sahipsiz": [], "sifir_bayt": [],
+             "bozuk": []}
+    diskte = {}
+    klasor = os.path.join(depo.kok, onek)
+    try:
+        with os.scandir(klasor) as girdiler:
+            for girdi in girdiler:
+                if girdi.is_file(follow_symlinks=False):
+                    diskte[girdi.name] = girdi.stat(follow_symlinks=False)
+                else:
+                    sonuc["sahipsiz"].append(girdi.path)
+    except FileNotFoundError:
+        pass
+    for anahtar, boyut, referans, paketli in satirlar:
+        if gorev:
+            gorev.iptal_kontrol()
+        sonuc["blob"] += 1
+        bilgi = diskte.pop(anahtar, None)
+        if bilgi is None:
+            if referans and not paketli:
+                sonuc["eksik"].append(anahtar)
+            continue
+        if not referans:
+            sonuc["kullanilmayan"] += 1
+        sonuc["dosya"] += 1
+        sonuc["bayt"] += bilgi.st_size
+        yol = os.path.join(klasor, anahtar)
+        if bilgi.st_size == 0 and boyut:
+            sonuc["sifir_bayt"].append(yol)
+        elif bilgi.st_size != boyut:
+            sonuc["bozuk"].append([yol, f"boyut {bilgi.st_size}, beklenen {boyut}"])
+        elif derin:
+            try:
+                if BelgeDeposu.sha256(yol, gorev) != anahtar[:64]:
+                    sonuc["bozuk"].append([yol, "sağlama toplamı uyuşmuyor"])
+            except FileNotFoundError:
+                pass
+    for ad, bilgi in diskte.items():
+        sonuc["dosya"] += 1
+        sonuc["bayt"] += bilgi.st_size
+        if not _yeni_mi(bilgi, simdi):
+            sonuc["sahipsiz"].append(os.path.join(klasor, ad))
+    return sonuc
+
+
+# Depo kökündeki dosyalar ve bilinmeyen klasörler: eski (depoya taşınmamış) belgelerin yolları hariç sahipsizdir
+def _kok_girdileri(depo, eski_yollar, simdi):
+    sahipsiz, dosya, bayt = [], 0, 0
+    with os.scandir(depo.kok) as girdiler:
+        for girdi in girdiler:
+            if girdi.is_dir(follow_symlinks=False):
+                if girdi.name not in ONEKLER and girdi.name != "paketler":
+                    sahipsiz.append(girdi.path)
+                continue
+            bilgi = girdi.stat(follow_symlinks=False)
+            dosya += 1
+            bayt += bilgi.st_size
+            if os.path.normcase(os.path.abspath(girdi.path)) not in eski_yollar and not _yeni_mi(bilgi, simdi):
+                sahipsiz.append(girdi.path)
+    return sahipsiz, dosya, bayt
+
+
+def _paketleri_denetle(db, depo, simdi):
+    eksik, sahipsiz = [], []
+    kayitli = dict(db.fetch_paket_dosyalari())
+    for dosya in kayitli:
+        if not os.path.exists(depo.paket_yolu(dosya)):
+            eksik.append(dosya)
+    klasor = depo.paket_yolu("")
+    if os.path.isdir(klasor):
+        with os.scandir(klasor) as girdiler:
+            for girdi in girdiler:
+                if girdi.name not in kayitli and not _yeni_mi(girdi.stat(follow_symlinks=False), simdi):
+                    sahipsiz.append(girdi.path)
+    return eksik, sahipsiz
+
+
+# Depo dilimleri iş parçacıklarında taranırken ana iş parçacığı eski belgeleri ve paketleri denetler. Sonuç JSON'a
+# yazılabilir bir sözlüktür; eksik belgeler ilgili belge/kayıt numaralarıyla birlikte verilir.
+def belgeleri_tara(db, kok=BELGE_KLASORU, derin=False, gorev=None):
+    baslangic = time.perf_counter()
+    simdi = time.time()
+    depo = BelgeDeposu(kok)
+    tarama = {"kok": kok, "derin": derin, "dosya": 0, "bayt": 0, "blob": 0, "kullanilmayan": 0, "eksik": [],
+              "sahipsiz": [], "sifir_bayt": [], "bozuk": []}
+    eksik_anahtarlar = []
+    baglantilar = _IsParcacigiBaglantilari(db.db_name)
+    try:
+        with ThreadPoolExecutor(max_workers=TARAMA_IS_PARCACIGI, thread_name_prefix="servis-tarama") as havuz:
+            isler = [havuz.submit(_dilimi_tara, baglantilar, depo, onek, derin, gorev, simdi) for onek in ONEKLER]
+            try:
+                eski_yollar = set()
+                for belge_id, cihaz_id, yol in db.iter_eski_belgeler():
+                    eski_yollar.add(os.path.normcase(os.path.abspath(yol)))
+                    if not os.path.exists(yol):
+                        tarama["eksik"].append({"anahtar": None, "dosya_yolu": yol,
+                                                "belgeler": [[belge_id, cihaz_id, os.path.basename(yol)]]})
+                if os.path.isdir(kok):
+                    sahipsiz, dosya, bayt = _kok_girdileri(depo, eski_yollar, simdi)
+                    tarama["sahipsiz"] += sahipsiz
+                    tarama["dosya"] += dosya
+                    tarama["bayt"] += bayt
+                eksik_paketler, sahipsiz_paketler = _paketleri_denetle(db, depo, simdi)
+                tarama["sahipsiz"] += sahipsiz_paketler
+                for biten, is_ in enumerate(as_completed(isler), 1):
+                    dilim = is_.result()
+                    for alan in ("dosya", "bayt", "blob", "kullanilmayan"):
+                        tarama[alan] += dilim[alan]
+                    for alan in ("sahipsiz", "sifir_bayt", "bozuk"):
+                        tarama[alan] += dilim[alan]
+                    eksik_anahtarlar += dilim["eksik"]
+                    if gorev:
+                        hiz = tarama["dosya"] / max(time.perf_counter() - baslangic, 1e-6)
+                        gorev.ilerleme(biten / len(isler), f"{tarama['dosya']} dosya tarandı ({hiz:.0f} dosya/sn)")
+            except GorevIptalEdildi:
+                for bekleyen in isler:
+                    bekleyen.cancel()
+                raise
+    finally:
+        baglantilar.kapat()
+    if eksik_paketler:
+        eksik_paket_kumesi = set(eksik_paketler)
+        eksik_anahtarlar += [satir[0] for satir in db.iter_paket_girdileri() if satir[1] in eksik_paket_kumesi]
+    belgeleri = {}
+    for anahtar, belge_id, cihaz_id, dosya_adi in db.fetch_blob_belgeleri(eksik_anahtarlar):
+        belgeleri.setdefault(anahtar, []).append([belge_id, cihaz_id, dosya_adi])
+    tarama["eksik"] += [{"anahtar": anahtar, "dosya_yolu": depo.blob_yolu(anahtar), "belgeler": belgeleri.get(anahtar, [])}
+                        for anahtar in eksik_anahtarlar]
+    tarama["eksik_paketler"] = eksik_paketler
+    tarama["sure"] = round(time.perf_counter() - baslangic, 3)
+    tarama["dosya_sn"] = round(tarama["dosya"] / max(tarama["sure"], 1e-6))
+    log.info("Belge taraması: %d dosya, %d eksik, %d sahipsiz, %d sıfır bayt, %d bozuk (%.1f sn)", tarama["dosya"],
+             len(tarama["eksik"]), len(tarama["sahipsiz"]), len(tarama["sifir_bayt"]), len(tarama["bozuk"]),
+             tarama["sure"])
+    return tarama
+
+
+def tarama_ozeti(tarama):
+    return {alan: len(deger) if isinstance(deger, list) else deger for alan, deger in tarama.items()}
+
+
+# Sahipsiz, sıfır baytlık ve bozuk dosyaları belgeler_karantina/<tarih>/ altına, depodaki göreli yollarıyla taşır;
+# karantina.json nereden ve neden taşındıklarını listeler. Tarama ile taşıma arasında veritabanına kaydedilmiş
+# sahipsiz dosyalar atlanır. Bozuk dosyası karantinaya alınan belge eksik olur ve yedekten geri yüklenebilir.
+def karantinaya_al(db, tarama, hedef_kok=KARANTINA_KLASORU):
+    hedef = os.path.join(hedef_kok, datetime.datetime.now().strftime("%Y%m%d_%H%M%S"))
+    adaylar = [(yol, "sahipsiz") for yol in tarama["sahipsiz"]]
+    adaylar += [(yol, "sıfır bayt") for yol in tarama["sifir_bayt"]]
+    adaylar += [(yol, neden) for yol, neden in tarama["bozuk"]]
+    tasinanlar = []
+    for yol, neden in adaylar:
+        ad = os.path.basename(yol)
+        if neden == "sahipsiz" and _anahtar_mi(ad) and db.blob_var_mi(ad):
+            continue
+        yeni_yol = os.path.join(hedef, os.path.relpath(yol, tarama["kok"]))
+        try:
+            os.makedirs(os.path.dirname(yeni_yol), exist_ok=True)
+            shutil.move(yol, yeni_yol)
+        except FileNotFoundError:
+            continue
+        tasinanlar.append({"dosya": yol, "karantina": yeni_yol, "neden": neden})
+    if tasinanlar:
+        with open(os.path.join(hedef, "karantina.json"), "w", encoding="utf-8") as f:
+            json.dump(tasinanlar, f, ensure_ascii=False, indent=1)
+    log.warning("%d dosya karantinaya alındı: %s", len(tasinanlar), hedef)
+    return {"karantina": hedef, "tasinan": len(tasinanlar)}
+
+
+# Eksik belgeler sahipsiz dosyalar arasında aranır: içerik özeti eksik bir blobun anahtarını veren dosya yerine
+# taşınır; depoya taşınmamış eski bir belgeyle aynı adı taşıyan dosya depoya alınıp o belgeye bağlanır.
+def yeniden_bagla(db, tarama, gorev=None):
+    depo = BelgeDeposu(tarama["kok"])
+    eksik_bloblar = {e["anahtar"] for e in tarama["eksik"] if e["anahtar"]}
+    eksik_eskiler = {}
+    for eksik in tarama["eksik"]:
+        if eksik["anahtar"] is None:
+            eksik_eskiler.setdefault(os.path.basename(eksik["dosya_yolu"]), []).extend(eksik["belgeler"])
+    baglanan = 0
+    for yol in tarama["sahipsiz"]:
+        if gorev:
+            gorev.iptal_kontrol()
+        if not os.path.isfile(yol):
+            continue
+        uzanti = os.path.splitext(os.path.basename(yol))[1]
+        if _anahtar_mi(os.path.basename(yol)):
+            uzanti = os.path.basename(yol)[64:]
+        anahtar = BelgeDeposu.sha256(yol, gorev) + uzanti
+        if anahtar in eksik_bloblar:
+            hedef = depo.blob_yolu(anahtar)
+            os.makedirs(os.path.dirname(hedef), exist_ok=True)
+            os.replace(yol, hedef)
+            eksik_bloblar.discard(anahtar)
+            baglanan += 1
+            log.info("Eksik belge yeniden bağlandı: %s <- %s", anahtar, yol)
+        elif os.path.basename(yol) in eksik_eskiler:
+            belgeler = eksik_eskiler.pop(os.path.basename(yol))
+            belge = depo.ekle(yol, gorev, depoda=True)
+            for belge_id, _, dosya_adi in belgeler:
+                db.belgeyi_depoya_bagla(belge_id, {**belge, "dosya_adi": dosya_adi})
+            os.remove(yol)
+            baglanan += len(belgeler)
+            log.info("Eski belge yeniden bağlandı: %s (%d belge)", yol, len(belgeler))
+    kalan = len(eksik_bloblar) + sum(len(b) for b in eksik_eskiler.values())
+    return {"baglanan": baglanan, "eksik_kalan": kalan}
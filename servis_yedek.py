@@ -0,0 +1,287 @@
+"""Veritabanı ve belge deposunun çevrimiçi, artımlı yedeği.
+
+Veritabanı uygulama açıkken SQLite yedekleme API'siyle sayfa sayfa kopyalanır; adımlar arasında kilit bırakıldığı
+için kayıt ekleme/güncelleme beklemez. Belgeler klasörü her yedekte tam görünür, ama önceki yedekten beri
+değişmeyen dosyalar (boyut ve değiştirilme zamanı aynı, ya da sağlama toplamı aynı) yeniden kopyalanmaz, önceki
+yedekteki dosyaya sabit bağlantıyla (hardlink) bağlanır. Her yedek klasörü bir yedek.json içerir: veritabanı ve
+tüm belgelerin boyut, zaman ve SHA-256 değerleri. Geri yükleme bu değerlerle yedeği doğrulamadan başlamaz.
+
+    ozet = yedek_al(db)                                  # yedekler/20240131_120000_000/
+    yedegi_dogrula("yedekler/20240131_120000_000")
+    geri_yukle(db, "yedekler/20240131_120000_000")
+"""
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from urllib.request import pathname2url
+
+from servis_core import BELGE_KLASORU, DEFAULT_SETTINGS, OKUMA_PARCASI, BelgeDeposu, log, settings
+
+YEDEK_BILGISI = "yedek.json"
+YEDEK_VERITABANI = "servis_takip.db"
+YEDEK_BELGELERI = "belgeler"
+# Başka bağlantıların yazmaları adımlı kopyayı baştan başlatır; bu kadar yeniden başlamadan sonra kopya tek adımda
+# alınır (WAL kipinde yalnızca okuma anlık görüntüsü tutulur, yazmalar yine beklemez)
+YEDEK_YENIDEN_BASLAMA = 3
+
+
+class _YenidenBasladi(Exception):
+    pass
+
+
+def yedek_ayarlari():
+    return {**DEFAULT_SETTINGS["yedek"], **settings.get("yedek", {})}
+
+
+# Tamamlanmış yedekler, en yeniden eskiye. Yarım kalan yedekler ".tmp" uzantılı olduğu için listelenmez.
+def yedekleri_listele(kok=None):
+    kok = kok or yedek_ayarlari()["klasor"]
+    if not os.path.isdir(kok):
+        return []
+    adlar = [ad for ad in os.listdir(kok) if os.path.exists(os.path.join(kok, ad, YEDEK_BILGISI))]
+    return [os.path.join(kok, ad) for ad in sorted(adlar, reverse=True)]
+
+
+def yedek_bilgisi(yedek):
+    with open(os.path.join(yedek, YEDEK_BILGISI), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _salt_okunur(yol):
+    return sqlite3.connect(f"file:{pathname2url(os.path.abspath(yol))}?mode=ro", uri=True)
+
+
+# Sayfa adımlı kopya; kaynak başka bir bağlantıdan değişince SQLite kopyayı baştan başlatır (kalan sayfa sayısı
+# artar). YEDEK_YENIDEN_BASLAMA aşılınca tek adımlı kopyaya geçilir.
+def _veritabanini_kopyala(kaynak, hedef_yol, sayfa_adimi, gorev=None):
+    durum = {"kalan": None, "yeniden": 0}
+
+    def ilerleme(_, kalan, toplam):
+        if gorev:
+            gorev.iptal_kontrol()
+            gorev.ilerleme((toplam - kalan) / toplam if toplam else 1.0, f"Veritabanı: {toplam - kalan}/{toplam} sayfa")
+        if durum["kalan"] is not None and kalan > durum["kalan"]:
+            durum["yeniden"] += 1
+            if durum["yeniden"] > YEDEK_YENIDEN_BASLAMA:
+                raise _YenidenBasladi()
+        durum["kalan"] = kalan
+
+    hedef = sqlite3.connect(hedef_yol)
+    try:
+        try:
+            kaynak.backup(hedef, pages=sayfa_adimi, progress=ilerleme)
+        except _YenidenBasladi:
+            log.warning("Veritabanı yedeği %d kez yeniden başladı, tek adımda kopyalanıyor", durum["yeniden"])
+            kaynak.backup(hedef)
+        # Yedek, -wal/-shm dosyası olmadan tek başına açılabilsin
+        hedef.execute("PRAGMA journal_mode = DELETE")
+        sonuc = hedef.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        hedef.close()
+    if sonuc != "ok":
+        raise sqlite3.DatabaseError(f"Yedeklenen veritabanı bozuk: {sonuc}")
+    return durum["yeniden"]
+
+
+def _dosyalar(kok):
+    for klasor, _, adlar in os.walk(kok):
+        for ad in adlar:
+            if not ad.endswith(".tmp"):
+                yol = os.path.join(klasor, ad)
+                yield os.path.relpath(yol, kok).replace(os.sep, "/"), yol
+
+
+# Kopyalanan içeriğin özeti kopyalarken çıkarılır; yedek.json yedekteki baytları anlatır, kopya sırasında değişen
+# kaynağı değil
+def _kopyala_ve_ozetle(kaynak, hedef, gorev=None):
+    ozet = hashlib.sha256()
+    with open(kaynak, "rb") as k, open(hedef, "wb") as h:
+        for parca in iter(lambda: k.read(OKUMA_PARCASI), b""):
+            if gorev:
+                gorev.iptal_kontrol()
+            ozet.update(parca)
+            h.write(parca)
+    shutil.copystat(kaynak, hedef)
+    return ozet.hexdigest()
+
+
+# Önceki yedekteki dosyaya sabit bağlantı kurulamıyorsa (ör. dosya sistemi desteklemiyor) kopyalanır
+def _bagla_ya_da_kopyala(onceki, hedef):
+    try:
+        os.link(onceki, hedef)
+        return True
+    except OSError:
+        shutil.copy2(onceki, hedef)
+        return False
+
+
+# Belgeler klasörünü yedek klasörüne aktarır; değişmeyen dosyalar önceki yedeğe bağlanır. Boyutu ya da zamanı
+# değişmiş ama içeriği aynı kalmış dosyalar sağlama toplamıyla yakalanır. {göreli yol: [boyut, mtime_ns, sha256]}
+# döndürür.
+def _belgeleri_yedekle(belge_kok, hedef_kok, onceki, onceki_belgeler, ozet, gorev=None):
+    belgeler = {}
+    klasorler = set()
+    for goreli, yol in _dosyalar(belge_kok):
+        if gorev:
+            gorev.iptal_kontrol()
+        hedef = os.path.join(hedef_kok, *goreli.split("/"))
+        klasor = os.path.dirname(hedef)
+        if klasor not in klasorler:
+            os.makedirs(klasor, exist_ok=True)
+            klasorler.add(klasor)
+        try:
+            bilgi = os.stat(yol)
+            eski = onceki_belgeler.get(goreli)
+            if eski and (eski[0], eski[1]) != (bilgi.st_size, bilgi.st_mtime_ns):
+                ozet["taranan_bayt"] += bilgi.st_size
+                if BelgeDeposu.sha256(yol, gorev) != eski[2]:
+                    eski = None
+            if eski:
+                ozet_degeri = eski[2]
+                _bagla_ya_da_kopyala(os.path.join(onceki, YEDEK_BELGELERI, *goreli.split("/")), hedef)
+                ozet["bagli_belge"] += 1
+            else:
+                ozet_degeri = _kopyala_ve_ozetle(yol, hedef, gorev)
+                ozet["kopyalanan_belge"] += 1
+                ozet["kopyalanan_bayt"] += bilgi.st_size
+        except FileNotFoundError:
+            continue  # Yedek sırasında silinen dosya (ör. çöp toplama)
+        belgeler[goreli] = [bilgi.st_size, bilgi.st_mtime_ns, ozet_degeri]
+        if gorev and len(belgeler) % 500 == 0:
+            gorev.ilerleme(None, f"{len(belgeler)} belge yedeklendi")
+    return belgeler
+
+
+# Yeni yedek klasörü önce "<ad>.tmp" olarak yazılır ve ancak her şey bitince adı verilir; yarıda kesilen yedek
+# listelenmez ve bir sonraki yedekte silinir. Saklama sınırını aşan eski yedekler en son silinir.
+def yedek_al(db, kok=None, belge_kok=BELGE_KLASORU, gorev=None):
+    ayarlar = yedek_ayarlari()
+    kok = kok or ayarlar["klasor"]
+    baslangic = time.perf_counter()
+    onceki = next(iter(yedekleri_listele(kok)), None)
+    onceki_belgeler = yedek_bilgisi(onceki)["belgeler"] if onceki else {}
+    # Ad oluşturma zamanıdır; ad sırası yedeklerin sırasıdır
+    hedef = os.path.join(kok, datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3])
+    gecici = hedef + ".tmp"
+    if os.path.isdir(kok):
+        for yarim in os.listdir(kok):
+            if yarim.endswith(".tmp"):
+                shutil.rmtree(os.path.join(kok, yarim), ignore_errors=True)
+    os.makedirs(gecici)
+    ozet = {"yedek": hedef, "onceki": onceki, "kopyalanan_belge": 0, "bagli_belge": 0, "kopyalanan_bayt": 0,
+            "taranan_bayt": 0}
+    try:
+        veritabani_yolu = os.path.join(gecici, YEDEK_VERITABANI)
+        ozet["yeniden_baslama"] = _veritabanini_kopyala(db.conn, veritabani_yolu, ayarlar["sayfa_adimi"], gorev)
+        ozet["veritabani_sure"] = round(time.perf_counter() - baslangic, 3)
+        belgeler = {}
+        if os.path.isdir(belge_kok):
+            belgeler = _belgeleri_yedekle(belge_kok, os.path.join(gecici, YEDEK_BELGELERI), onceki, onceki_belgeler,
+                                          ozet, gorev)
+        bilgi = {"olusturma": datetime.datetime.now().isoformat(timespec="seconds"), "onceki": onceki,
+                 "veritabani": {"boyut": os.path.getsize(veritabani_yolu),
+                                "sha256": BelgeDeposu.sha256(veritabani_yolu)},
+                 "belgeler": belgeler}
+        with open(os.path.join(gecici, YEDEK_BILGISI), "w", encoding="utf-8") as f:
+            json.dump(bilgi, f)
+        os.replace(gecici, hedef)
+    except BaseException:
+        shutil.rmtree(gecici, ignore_errors=True)
+        raise
+    ozet["silinen_yedekler"] = eski_yedekleri_sil(kok, ayarlar["saklanan"])
+    ozet["veritabani_bayt"] = bilgi["veritabani"]["boyut"]
+    ozet["belge"] = len(belgeler)
+    ozet["sure"] = round(time.perf_counter() - baslangic, 3)
+    ozet["hiz_mb_sn"] = round((ozet["veritabani_bayt"] + ozet["kopyalanan_bayt"]) / max(ozet["sure"], 1e-6)
+                              / 1024 / 1024, 1)
+    log.info("Yedek alındı: %s (%d belge, %d kopyalandı, %d bağlandı, %.1f sn)", hedef, ozet["belge"],
+             ozet["kopyalanan_belge"], ozet["bagli_belge"], ozet["sure"], extra={"yedek": ozet})
+    return ozet
+
+
+def eski_yedekleri_sil(kok, saklanan):
+    silinenler = yedekleri_listele(kok)[max(saklanan, 1):]
+    for yedek in silinenler:
+        shutil.rmtree(yedek)
+        log.info("Eski yedek silindi: %s", yedek)
+    return silinenler
+
+
+# Veritabanının ve tüm belgelerin sağlama toplamını yedek.json ile karşılaştırır, veritabanı bütünlüğünü denetler
+def yedegi_dogrula(yedek, gorev=None):
+    baslangic = time.perf_counter()
+    bilgi = yedek_bilgisi(yedek)
+    hatalar = []
+    veritabani_yolu = os.path.join(yedek, YEDEK_VERITABANI)
+    try:
+        if BelgeDeposu.sha256(veritabani_yolu, gorev) != bilgi["veritabani"]["sha256"]:
+            hatalar.append((YEDEK_VERITABANI, "sağlama toplamı uyuşmuyor"))
+        else:
+            baglanti = _salt_okunur(veritabani_yolu)
+            try:
+                sonuc = baglanti.execute("PRAGMA integrity_check").fetchone()[0]
+            finally:
+                baglanti.close()
+            if sonuc != "ok":
+                hatalar.append((YEDEK_VERITABANI, sonuc))
+    except (OSError, sqlite3.Error) as e:
+        hatalar.append((YEDEK_VERITABANI, str(e)))
+    for i, (goreli, (_, _, ozet_degeri)) in enumerate(bilgi["belgeler"].items(), 1):
+        try:
+            if BelgeDeposu.sha256(os.path.join(yedek, YEDEK_BELGELERI, *goreli.split("/")), gorev) != ozet_degeri:
+                hatalar.append((goreli, "sağlama toplamı uyuşmuyor"))
+        except OSError as e:
+            hatalar.append((goreli, str(e)))
+        if gorev and i % 500 == 0:
+            gorev.ilerleme(i / len(bilgi["belgeler"]), f"{i} belge doğrulandı")
+    sonuc = {"yedek": yedek, "belge": len(bilgi["belgeler"]), "hatalar": hatalar,
+             "sure": round(time.perf_counter() - baslangic, 3)}
+    log.info("Yedek doğrulandı: %s (%d belge, %d hata)", yedek, sonuc["belge"], len(hatalar))
+    return sonuc
+
+
+# Doğrulanmış yedeği geri yükler. Mevcut veritabanı önce "<db>.geri_yukleme_oncesi" olarak kopyalanır; yedek
+# yedekleme API'siyle açık bağlantının üzerine yazılır (diğer bağlantılar kilitleri bekler). Belgeler klasöründe
+# yalnızca eksik ya da farklı olan dosyalar yazılır, yedekte olmayan dosyalara dokunulmaz.
+def geri_yukle(db, yedek, belge_kok=BELGE_KLASORU, gorev=None):
+    dogrulama = yedegi_dogrula(yedek, gorev)
+    if dogrulama["hatalar"]:
+        raise ValueError(f"Yedek doğrulanamadı, geri yüklenmedi: {len(dogrulama['hatalar'])} hata "
+                         f"(ilk: {dogrulama['hatalar'][0][0]}: {dogrulama['hatalar'][0][1]})")
+    baslangic = time.perf_counter()
+    bilgi = yedek_bilgisi(yedek)
+    onceki_kopya = f"{db.db_name}.geri_yukleme_oncesi"
+    if os.path.exists(onceki_kopya):
+        os.remove(onceki_kopya)
+    _veritabanini_kopyala(db.conn, onceki_kopya, yedek_ayarlari()["sayfa_adimi"])
+    kaynak = _salt_okunur(os.path.join(yedek, YEDEK_VERITABANI))
+    try:
+        kaynak.backup(db.conn)
+        beklenen = kaynak.execute("SELECT COUNT(*) FROM cihazlar").fetchone()[0]
+    finally:
+        kaynak.close()
+    sonuc = db.conn.execute("PRAGMA integrity_check").fetchone()[0]
+    kayit = db.conn.execute("SELECT COUNT(*) FROM cihazlar").fetchone()[0]
+    if sonuc != "ok" or kayit != beklenen:
+        raise sqlite3.DatabaseError(f"Geri yüklenen veritabanı doğrulanamadı ({sonuc}, {kayit}/{beklenen} kayıt); "
+                                    f"önceki hali: {onceki_kopya}")
+    db.onbellek.temizle()
+    yazilan = 0
+    for goreli, (boyut, _, ozet_degeri) in bilgi["belgeler"].items():
+        if gorev:
+            gorev.iptal_kontrol()
+        hedef = os.path.join(belge_kok, *goreli.split("/"))
+        if os.path.exists(hedef) and os.path.getsize(hedef) == boyut and BelgeDeposu.sha256(hedef) == ozet_degeri:
+            continue
+        os.makedirs(os.path.dirname(hedef), exist_ok=True)
+        shutil.copy2(os.path.join(yedek, YEDEK_BELGELERI, *goreli.split("/")), hedef + ".tmp")
+        os.replace(hedef + ".tmp", hedef)
+        yazilan += 1
+    ozet = {"yedek": yedek, "kayit": kayit, "belge": len(bilgi["belgeler"]), "yazilan_belge": yazilan,
+            "onceki_veritabani": onceki_kopya, "sure": round(time.perf_counter() - baslangic, 3)}
+    log.warning("Yedek geri yüklendi: %s (%d kayıt, %d belge yazıldı)", yedek, kayit, yazilan, extra={"yedek": ozet})
+    return ozet
@@ -0,0 +1,127 @@
+"""Aynı veritabanı dosyasını paylaşan çok sayıda istemciyi ayrı süreçlerle taklit eden yük testi.
+
+Her süreç kendi DatabaseManager bağlantısını açar ve belirlenen süre boyunca okuma (sayfa ve tekil kayıt)
+ile yazma (ekleme ve güncelleme) işlemlerini karıştırarak çalıştırır. Sonuçta saniyedeki okuma/yazma sayısı,
+gecikme yüzdelikleri ve işlemi tamamen başarısız olan (kilit hatası veren) yazma sayısı raporlanır.
+
+    python stres_testi.py --istemci 8 --sure 10
+    python stres_testi.py --journal-mode DELETE   # karşılaştırma için WAL'sız profil
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import servis_core
+
+BASLANGIC_KAYDI = 5000
+
+
+def ornek_kayit(i):
+    return {
+        "barkod_no": f"B{i:07d}", "bolge": random.choice(["Merkez", "Kuzey", "Güney"]),
+        "personel_ad_soyad": f"Personel {i}", "personel_sicil_no": f"{10000 + i}",
+        "cihaz_tipi": random.choice(["Yazıcı", "Tarayıcı", "Terminal"]), "cihaz_seri_no": f"SN{i:08d}",
+        "servis_gonderim_tarihi": "2024-01-01", "servis_gelme_tarihi": "2024-01-15",
+        "cihaz_durumu": random.choice(["Serviste", "Tamir Edildi"]), "aciklama": "yük testi",
+    }
+
+
+def yuzdelik(degerler, oran):
+    if not degerler:
+        return 0.0
+    degerler = sorted(degerler)
+    return degerler[min(len(degerler) - 1, int(len(degerler) * oran))]
+
+
+def istemci(db_yolu, profil, sure, yazma_orani, baslangic, sonuclar):
+    random.seed(os.getpid())
+    db = servis_core.DatabaseManager(db_yolu, profil)
+    okuma, yazma, basarisiz = [], [], 0
+    baslangic.wait()
+    bitis = time.perf_counter() + sure
+    while time.perf_counter() < bitis:
+        t0 = time.perf_counter()
+        if random.random() < yazma_orani:
+            try:
+                if random.random() < 0.5:
+                    db._yazma_islemi(lambda: db.cursor.execute(
+                        "UPDATE cihazlar SET cihaz_durumu = ? WHERE id = ?",
+                        (random.choice(["Serviste", "Tamir Edildi"]), random.randint(1, BASLANGIC_KAYDI))))
+                else:
+                    db._yazma_islemi(lambda: db.cursor.execute(
+                        f"INSERT INTO cihazlar ({', '.join(servis_core.KAYIT_ALANLARI)}) VALUES ({', '.join('?' * 10)})",
+                        tuple(ornek_kayit(random.randint(0, 10 ** 6)).values())))
+                yazma.append(time.perf_counter() - t0)
+            except sqlite3.OperationalError:
+                basarisiz += 1
+        else:
+            if random.random() < 0.5:
+                db.fetch_cihaz_by_id(random.randint(1, BASLANGIC_KAYDI))
+            else:
+                db.fetch_page(limit=servis_core.SAYFA_BOYUTU, filtre=random.choice(["", "merkez", "yazici", "b00012"]))
+            okuma.append(time.perf_counter() - t0)
+    db.close()
+    sonuclar.put((okuma, yazma, basarisiz))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Çok süreçli veritabanı yük testi")
+    parser.add_argument("--istemci", type=int, default=8)
+    parser.add_argument("--sure", type=float, default=10.0, help="saniye")
+    parser.add_argument("--yazma-orani", type=float, default=0.2)
+    parser.add_argument("--journal-mode", help="ayar dosyasındaki profili geçersiz kılar (ör. WAL, DELETE)")
+    parser.add_argument("--synchronous")
+    parser.add_argument("--db", help="varsayılan: geçici dizinde yeni bir veritabanı")
+    args = parser.parse_args()
+    servis_core.load_settings()
+
+    profil = {}
+    if args.journal_mode:
+        profil["journal_mode"] = args.journal_mode
+    if args.synchronous:
+        profil["synchronous"] = args.synchronous
+
+    gecici = None
+    db_yolu = args.db
+    if not db_yolu:
+        gecici = tempfile.TemporaryDirectory()
+        db_yolu = os.path.join(gecici.name, "stres.db")
+    db = servis_core.DatabaseManager(db_yolu, profil)
+    profil = db.profil  # alt süreçler ayar dosyasını yeniden okumadan aynı profille bağlanır
+    if not db.count_cihazlar():
+        db.insert_cihazlar_toplu([ornek_kayit(i) for i in range(BASLANGIC_KAYDI)])
+    print(f"Profil: {db.profil}")
+    db.close()
+
+    baslangic = multiprocessing.Event()
+    sonuclar = multiprocessing.Queue()
+    surecler = [multiprocessing.Process(target=istemci, args=(db_yolu, profil, args.sure, args.yazma_orani, baslangic, sonuclar))
+                for _ in range(args.istemci)]
+    for p in surecler:
+        p.start()
+    baslangic.set()
+    okuma, yazma, basarisiz = [], [], 0
+    for _ in surecler:
+        o, y, b = sonuclar.get()
+        okuma += o
+        yazma += y
+        basarisiz += b
+    for p in surecler:
+        p.join()
+
+    print(f"{args.istemci} istemci, {args.sure:.0f} sn, yazma oranı {args.yazma_orani:.0%}")
+    print(f"Okuma: {len(okuma) / args.sure:8.0f} işlem/sn  p50 {yuzdelik(okuma, 0.5) * 1000:6.1f} ms  "
+          f"p99 {yuzdelik(okuma, 0.99) * 1000:6.1f} ms")
+    print(f"Yazma: {len(yazma) / args.sure:8.0f} işlem/sn  p50 {yuzdelik(yazma, 0.5) * 1000:6.1f} ms  "
+          f"p99 {yuzdelik(yazma, 0.99) * 1000:6.1f} ms")
+    print(f"Kilit nedeniyle başarısız yazma: {basarisiz}")
+    if gecici:
+        gecici.cleanup()
+
+
+if __name__ == "__main__":
+    main()
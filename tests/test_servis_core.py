@@ -0,0 +1,159 @@
+import json
+import sqlite3
+
+import pytest
+
+from servis_core import MIGRATIONS, SIRALAMA_SUTUNLARI, DatabaseManager, siralama_anahtari, sorgu_derle
+from ornek_veri import veri_uret
+
+# İlk sürümün (sema_surumu tablosundan önceki) şeması: belgeler JSON listesi, tarihler gg.aa.yyyy
+ESKI_SEMA = '''
+    CREATE TABLE cihazlar (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        barkod_no TEXT NOT NULL,
+        bolge TEXT, personel_ad_soyad TEXT, personel_sicil_no TEXT,
+        cihaz_tipi TEXT, cihaz_seri_no TEXT, servis_gonderim_tarihi TEXT,
+        servis_gelme_tarihi TEXT, cihaz_durumu TEXT, aciklama TEXT,
+        cihaz_belgeleri TEXT
+    )
+'''
+ESKI_KAYITLAR = [
+    ("BRK001", "Kuzey", "Işıl Öztürk", "12345", "Laptop", "SN1", "05.01.2024", "20.01.2024", "Tamir edildi", "ekran",
+     json.dumps(["belgeler/a.pdf", "belgeler/b.jpg"])),
+    ("BRK002", None, None, None, None, None, "31.12.2023", None, "Serviste", None, None),
+    ("BRK003", "Güney", "Ahmet Çelik", "67890", "Tablet", "SN2", None, None, "Hurda", "", "[]"),
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "servis.db"))
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope="module")
+def ornek_db(tmp_path_factory):
+    db = DatabaseManager(str(tmp_path_factory.mktemp("ornek") / "servis.db"))
+    veri_uret(db, 3000, 7)
+    yield db
+    db.close()
+
+
+def _kayit(**alanlar):
+    return {"barkod_no": "B1", "bolge": "", "personel_ad_soyad": "", "personel_sicil_no": "", "cihaz_tipi": "",
+            "cihaz_seri_no": "", "servis_gonderim_tarihi": "", "servis_gelme_tarihi": "", "cihaz_durumu": "Serviste",
+            "aciklama": "", "cihaz_belgeleri": [], **alanlar}
+
+
+def _arama_idleri(db, filtre):
+    satirlar, _ = db.fetch_page(None, 1000, filtre)
+    return sorted(satir[0] for satir in satirlar)
+
+
+def test_eski_sema_tasinir(tmp_path):
+    yol = str(tmp_path / "eski.db")
+    conn = sqlite3.connect(yol)
+    conn.execute(ESKI_SEMA)
+    conn.executemany("INSERT INTO cihazlar (barkod_no, bolge, personel_ad_soyad, personel_sicil_no, cihaz_tipi, "
+                     "cihaz_seri_no, servis_gonderim_tarihi, servis_gelme_tarihi, cihaz_durumu, aciklama, "
+                     "cihaz_belgeleri) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", ESKI_KAYITLAR)
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(yol)
+    try:
+        db.cursor.execute("SELECT MAX(surum) FROM sema_surumu")
+        assert db.cursor.fetchone()[0] == MIGRATIONS[-1][0]
+
+        # v4: JSON belge listesi belgeler tablosuna taşınır, sayaç doldurulur
+        birinci = db.fetch_cihaz_by_id(1)
+        assert [yol for yol, _ in birinci[11]] == ["belgeler/a.pdf", "belgeler/b.jpg"]
+        assert [ad for _, ad in birinci[11]] == ["a.pdf", "b.jpg"]
+        db.cursor.execute("SELECT id, belge_sayisi FROM cihazlar ORDER BY id")
+        assert db.cursor.fetchall() == [(1, 2), (2, 0), (3, 0)]
+
+        # v6: gg.aa.yyyy ISO olur, NULL tarihler "" olur
+        db.cursor.execute("SELECT servis_gonderim_tarihi, servis_gelme_tarihi FROM cihazlar ORDER BY id")
+        assert db.cursor.fetchall() == [("2024-01-05", "2024-01-20"), ("2023-12-31", ""), ("", "")]
+        assert [s[0] for s in db.advanced_search({"acik_gun_ustu": 0})] == [2]
+
+        # Taşınan kayıtlar aranabilir ve NULL alanlar aramayı bozmaz
+        assert _arama_idleri(db, "isil ozturk") == [1]
+        assert _arama_idleri(db, "brk002") == [2]
+        db.check_query_plans()
+    finally:
+        db.close()
+
+
+def test_turkce_arama_katlamasi(db):
+    for ad, aciklama in [("IŞIK YILMAZ", "Çağrı merkezi"), ("ılgın şahin", "İSTANBUL ŞUBESİ"),
+                         ("Irmak Güneş", "ölçüm cihazı")]:
+        db.insert_cihaz(_kayit(personel_ad_soyad=ad, aciklama=aciklama))
+
+    assert _arama_idleri(db, "isik") == [1]
+    assert _arama_idleri(db, "IŞIK") == [1]
+    assert _arama_idleri(db, "cagri") == [1]
+    assert _arama_idleri(db, "ilgin") == [2]
+    assert _arama_idleri(db, "istanbul subesi") == [2]
+    assert _arama_idleri(db, "İstanbul") == [2]
+    assert _arama_idleri(db, "irmak olcum") == [3]
+    assert _arama_idleri(db, "ir") == [3]
+
+    # Tetikleyiciler uygulamanın işlevlerine bağlı değildir: dış araçla yazılan kayıt da aynı katlamayla bulunur
+    conn = sqlite3.connect(db.db_name)
+    conn.execute("INSERT INTO cihazlar (barkod_no, personel_ad_soyad, servis_gonderim_tarihi, servis_gelme_tarihi) "
+                 "VALUES ('DIS1', 'ŞIRIN IŞILDAK', '', '')")
+    conn.commit()
+    conn.close()
+    assert _arama_idleri(db, "sirin isildak") == [4]
+
+    db.insert_cihaz(_kayit(aciklama="Kırık EKRAN"))
+    assert [s[0] for s in db.advanced_search({"sorgu": {"alan": "aciklama", "islem": "icerir", "deger": "KIRIK"}})] == [5]
+
+
+@pytest.mark.parametrize("dugum, mesaj", [
+    ({"alan": "yok", "islem": "=", "deger": 1}, "Sorgulanamayan alan"),
+    ({"alan": "bolge", "islem": "~", "deger": "a"}, "geçersiz işlem"),
+    ({"alan": "servis_gonderim_tarihi", "islem": "icerir", "deger": "a"}, "geçersiz işlem"),
+    ({"alan": "bolge", "islem": "aralik", "deger": ["a"]}, r"\[alt, üst\]"),
+    ({"alan": "bolge", "islem": "icinde", "deger": "a"}, "liste olmalı"),
+    ({"alan": "bolge", "islem": "icinde", "deger": list(range(5000))}, "en fazla"),
+    ({"alan": "belge_sayisi", "islem": "=", "deger": "abc"}, "Sayı bekleniyordu"),
+    ({"alan": "servis_gonderim_tarihi", "islem": "=", "deger": "32.13.2024"}, "does not match format"),
+    ({"ve": "x"}, "Geçersiz sorgu düğümü"),
+    ([1], "Geçersiz sorgu düğümü"),
+])
+def test_sorgu_derle_hatalari(dugum, mesaj):
+    with pytest.raises(ValueError, match=mesaj):
+        sorgu_derle(dugum)
+
+
+def test_sorgu_derle_bos_dugumler():
+    assert sorgu_derle({"ve": []}) is None
+    assert sorgu_derle({"alan": "bolge", "islem": "icinde", "deger": []}) == ("1 = 0", [])
+
+
+@pytest.mark.parametrize("filtreler", [None, {"cihaz_durumu": "Serviste"}, {"barkod_on_eki": "brk000001"}])
+@pytest.mark.parametrize("sutun", list(SIRALAMA_SUTUNLARI))
+def test_sirali_sayfalar_order_by_ile_ayni(ornek_db, sutun, filtreler):
+    for azalan in (False, True):
+        anahtar, _, _ = siralama_anahtari((sutun, azalan))
+        yon = "DESC" if azalan else "ASC"
+        kosullar, params = ornek_db._filtre_kosullari(filtreler or {})
+        ornek_db.cursor.execute(f"SELECT id FROM cihazlar WHERE {' AND '.join(kosullar) or '1 = 1'} "
+                                f"ORDER BY {', '.join(f'{s} {yon}' for s in anahtar + ('id',))}", params)
+        beklenen = [satir[0] for satir in ornek_db.cursor.fetchall()]
+
+        alinan, son = [], None
+        while True:
+            satirlar, son = ornek_db.fetch_page(son, 37, filtreler=filtreler, siralama=(sutun, azalan))
+            alinan += [satir[0] for satir in satirlar]
+            if son is None:
+                break
+        assert alinan == beklenen
+
+
+def test_sorgu_planlari_indeks_kullanir(ornek_db):
+    planlar = ornek_db.check_query_plans()
+    assert any(ad.startswith("siralama_") for ad in planlar)